@@ -6,6 +6,7 @@ from fastapi.security import HTTPBearer
 from app.core.security import ACCESS_TOKEN_TYPE, decode_token
 from app.crud.crud import UserCRUD
 from app.models.models import User, UserRole
+from app.services.role_cache import RoleMembership
 
 security = HTTPBearer()
 
@@ -91,11 +92,23 @@ async def require_admin_with_wallet(
     or otherwise touches on-chain credential state, because the on-chain
     UNIVERSITY_ROLE is only granted once the wallet is linked. SUPERADMIN is
     still exempt.
+
+    A wallet whose role the indexer has seen revoked is rejected too; this is
+    a Mongo lookup in the role cache, not an RPC call. A wallet the cache
+    knows nothing about yet (grant still pending) is let through and the
+    contract has the final say.
     """
-    if current_user.role == UserRole.ADMIN and not getattr(current_user, "wallet_address", None):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Connect a wallet before issuing or revoking degrees (UNIVERSITY_ROLE required)",
-        )
+    if current_user.role == UserRole.ADMIN:
+        wallet = getattr(current_user, "wallet_address", None)
+        if not wallet:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Connect a wallet before issuing or revoking degrees (UNIVERSITY_ROLE required)",
+            )
+        if await RoleMembership.has_role(wallet) is False:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="UNIVERSITY_ROLE has been revoked for this wallet",
+            )
     return current_user
 
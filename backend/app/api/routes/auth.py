@@ -81,9 +81,9 @@ async def change_password(
 
 
 from fastapi import UploadFile, File, Form, HTTPException, status
-import os
 from uuid import UUID
 from app.models.models import User
+from app.services.degree_service import document_store
 from app.services.pdf_validation import validate_pdf_upload
 
 @router.post("/{user_id}/verification-document")
@@ -103,15 +103,13 @@ async def upload_verification_document(
     if not user:
          raise HTTPException(status_code=404, detail="User not found")
 
-    pdf_bytes = await validate_pdf_upload(file)
-
-    os.makedirs("uploads", exist_ok=True)
-    file_path = f"uploads/verification_{user_id}.pdf"
-    with open(file_path, "wb") as buffer:
-        buffer.write(pdf_bytes)
-
-    user.verification_document_path = file_path
-    await user.save()
+    previous_path = user.verification_document_path
+    async with await validate_pdf_upload(file, document_store.spool_dir) as upload:
+        async with document_store.lock(upload.sha256):
+            user.verification_document_path = str(await document_store.put(upload))
+            await user.save()
+    if previous_path != user.verification_document_path:
+        await document_store.release(previous_path)
     return {"detail": "Document uploaded successfully"}
 
 
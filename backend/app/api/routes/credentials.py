@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, Request
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request
+from typing import List, Optional
 from uuid import UUID
 from app.schemas.schemas import CredentialCreate, CredentialResponse, CredentialStatus, CredentialUpdate
-from app.models.models import User, UserRole
+from app.models.models import CredentialView, User, UserRole
 from app.api.deps.auth import (
     get_current_user,
     require_admin_with_wallet,
     require_role,
 )
 from app.core.config import settings
+from app.core.http_cache import is_not_modified
 from app.core.limiter import limiter
+from app.core.pagination import batched, ndjson_response, set_next_page, wants_ndjson
+from app.core.serialization import json_list_response
 from app.services.degree_service import DegreeService
 
 router = APIRouter(prefix=f"{settings.API_V1_STR}/credentials", tags=["credentials"])
 
+LIST_CACHE_CONTROL = "private, no-cache"
+PUBLIC_CACHE_CONTROL = "public, no-cache"
+
 
 def _to_response(cred) -> dict:
     """Convert a Credential document to a CredentialResponse-compatible dict,
@@ -33,16 +39,40 @@ async def create_credential(
 
 @router.get("/", response_model=List[CredentialResponse])
 async def get_credentials(
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    creds = await DegreeService.list_for_user(current_user)
-    return [_to_response(c) for c in creds]
+    """Conditional like GET /degrees/."""
+    validator = await DegreeService.list_validator(current_user)
+    if is_not_modified(request, validator):
+        return validator.not_modified(LIST_CACHE_CONTROL)
+    views = await DegreeService.list_for_user(current_user)
+    return json_list_response(CredentialView, views, validator.headers(LIST_CACHE_CONTROL))
+
+async def _public_lines(query):
+    async for views in batched(query, settings.PUBLIC_PAGE_SIZE):
+        yield [view.model_dump_json() for view in views]
 
 @router.get("/public", response_model=List[CredentialResponse])
 @limiter.limit("30/minute")
-async def get_public_credentials(request: Request, prn_number: str):
-    creds = await DegreeService.get_public_by_prn(prn_number)
-    return [_to_response(c) for c in creds]
+async def get_public_credentials(
+    request: Request,
+    prn_number: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PUBLIC_PAGE_MAX_SIZE),
+):
+    """Keyset-paged like /degrees/public, and streamed as NDJSON on request."""
+    query = await DegreeService.public_query(prn_number=prn_number, cursor=cursor)
+    if wants_ndjson(request):
+        return ndjson_response(_public_lines(query.limit(limit) if limit else query))
+    page_size = limit or settings.PUBLIC_PAGE_SIZE
+    validator = await DegreeService.public_validator(query, page_size)
+    if is_not_modified(request, validator):
+        return validator.not_modified(PUBLIC_CACHE_CONTROL)
+    views, next_cursor = await DegreeService.public_page(query, page_size)
+    response = json_list_response(CredentialView, views, validator.headers(PUBLIC_CACHE_CONTROL))
+    set_next_page(request, response, next_cursor)
+    return response
 
 @router.get("/{credential_id}", response_model=CredentialResponse)
 async def get_credential(
@@ -1,22 +1,36 @@
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import UUID
 import asyncio
 
-import io
-
-from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Path, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.api.deps.auth import (
     get_current_user,
     require_admin_with_wallet,
     require_role,
+    require_verified_admin,
 )
 from app.core.config import settings
+from app.core.http_cache import Validator, etag_matches, file_response, is_not_modified, not_modified, weak_etag
 from app.core.limiter import limiter
-from app.models.models import User, UserRole
-from app.schemas.schemas import CredentialCreate, CredentialResponse, CredentialStatus, CredentialUpdate
+from app.core.pagination import batched, ndjson_response, set_next_page, wants_ndjson
+from app.core.serialization import json_list_response, json_response
+from app.models.models import CredentialView, User, UserRole
+from app.schemas.schemas import (
+    CredentialCreate,
+    CredentialResponse,
+    CredentialStatus,
+    CredentialUpdate,
+    PublicBatchRequest,
+    PublicBatchResponse,
+    PublicVerificationResponse,
+    TxVerificationRequest,
+    TxVerificationResult,
+)
 from app.services.degree_service import DegreeService
+from app.services.public_cache import public_lookup_cache
 # Telegram notification service used below via local import
 
 router = APIRouter(prefix=f"{settings.API_V1_STR}/degrees", tags=["degrees"])
@@ -37,22 +51,196 @@ async def create_degree(
     return _to_response(cred)
 
 
+LIST_CACHE_CONTROL = "private, no-cache"
+PUBLIC_CACHE_CONTROL = "public, no-cache"
+
+
 @router.get("/", response_model=List[CredentialResponse])
-async def get_degrees(current_user: User = Depends(get_current_user)):
-    creds = await DegreeService.list_for_user(current_user)
-    return [_to_response(c) for c in creds]
+async def get_degrees(request: Request, current_user: User = Depends(get_current_user)):
+    """The caller's degrees; re-polls with If-None-Match / If-Modified-Since
+    get a 304 while nothing in the listing changed."""
+    validator = await DegreeService.list_validator(current_user)
+    if is_not_modified(request, validator):
+        return validator.not_modified(LIST_CACHE_CONTROL)
+    views = await DegreeService.list_for_user(current_user)
+    return json_list_response(CredentialView, views, validator.headers(LIST_CACHE_CONTROL))
+
+
+async def _with_onchain_state(views: List[CredentialView]) -> List[CredentialView]:
+    onchain = await DegreeService.onchain_states(views)
+    for view in views:
+        if view.id in onchain:
+            view.onchain_revoked = onchain[view.id].revoked
+    return views
+
+
+async def _public_lines(query):
+    if query is None:
+        return
+    async for views in batched(query, settings.PUBLIC_PAGE_SIZE):
+        yield [view.model_dump_json() for view in await _with_onchain_state(views)]
+
+
+async def _first_page(prn_number: Optional[str], email: Optional[str]) -> dict:
+    query = await DegreeService.public_query(prn_number=prn_number, email=email)
+    views, next_cursor = await DegreeService.public_page(query, settings.PUBLIC_PAGE_SIZE)
+    rows = [view.model_dump(mode="json") for view in await _with_onchain_state(views)]
+    return {"rows": rows, "next_cursor": next_cursor, **_page_validator(rows)}
+
+
+def _page_validator(rows: List[dict]) -> dict:
+    # Cached with the page, so a matching re-poll needs neither Mongo nor
+    # the rows' serialization.
+    return {
+        "etag": weak_etag("public", rows),
+        "last_modified": max((row["updated_at"] for row in rows), default=None),
+    }
 
 
 @router.get("/public", response_model=List[CredentialResponse])
 @limiter.limit("30/minute")
-async def get_public_degrees(request: Request, prn_number: str = None, email: str = None):
-    if prn_number:
-        creds = await DegreeService.get_public_by_prn(prn_number)
-    elif email:
-        creds = await DegreeService.get_public_by_email(email)
-    else:
-        creds = await DegreeService.get_all_public()
-    return [_to_response(c) for c in creds]
+async def get_public_degrees(
+    request: Request,
+    prn_number: str = None,
+    email: str = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PUBLIC_PAGE_MAX_SIZE),
+):
+    """Approved degrees, newest first, one keyset page at a time (the next
+    page's URL is in the `Link` header). With `Accept: application/x-ndjson`
+    the whole listing from `cursor` on is streamed instead, one per line.
+    Pages are weakly validated like the dashboard list: a re-poll that
+    matches gets a 304."""
+    if (prn_number or email) and not cursor and not limit and not wants_ndjson(request):
+        # The common employer check; served from the public lookup cache.
+        kind, value = ("prn", prn_number) if prn_number else ("email", email)
+        page = await public_lookup_cache.fetch(kind, value, lambda: _first_page(prn_number, email))
+        stamp = page if "etag" in page else _page_validator(page["rows"])
+        last_modified = stamp["last_modified"]
+        validator = Validator(stamp["etag"], datetime.fromisoformat(last_modified) if last_modified else None)
+        if is_not_modified(request, validator):
+            return validator.not_modified(PUBLIC_CACHE_CONTROL)
+        response = JSONResponse(page["rows"], headers=validator.headers(PUBLIC_CACHE_CONTROL))
+        set_next_page(request, response, page["next_cursor"])
+        return response
+
+    query = await DegreeService.public_query(prn_number=prn_number, email=email, cursor=cursor)
+    if wants_ndjson(request):
+        if query is not None and limit:
+            query = query.limit(limit)
+        return ndjson_response(_public_lines(query))
+    page_size = limit or settings.PUBLIC_PAGE_SIZE
+    validator = await DegreeService.public_validator(query, page_size)
+    if is_not_modified(request, validator):
+        return validator.not_modified(PUBLIC_CACHE_CONTROL)
+    views, next_cursor = await DegreeService.public_page(query, page_size)
+    response = json_list_response(
+        CredentialView, await _with_onchain_state(views), validator.headers(PUBLIC_CACHE_CONTROL)
+    )
+    set_next_page(request, response, next_cursor)
+    return response
+
+
+def _public_batch_cost(request: Request) -> int:
+    return getattr(request.state, "public_batch_cost", 1)
+
+
+async def _public_batch(request: Request, batch: PublicBatchRequest) -> PublicBatchRequest:
+    # Resolved before the endpoint (and so before the limiter) runs, which
+    # lets the rate-limit cost depend on the size of the batch.
+    size = len(batch.prn_numbers) + len(batch.emails)
+    request.state.public_batch_cost = -(-size // settings.PUBLIC_BATCH_COST_UNIT)
+    return batch
+
+
+@router.post("/public/batch", response_model=PublicBatchResponse)
+@limiter.limit(settings.PUBLIC_BATCH_RATE_LIMIT, cost=_public_batch_cost)
+async def verify_public_batch(request: Request, batch: PublicBatchRequest = Depends(_public_batch)):
+    """Verify a cohort in one request: approved degrees for up to 500 PRNs
+    and/or emails, grouped by identifier."""
+    by_prn, by_email = await DegreeService.public_batch(batch.prn_numbers, batch.emails)
+    views = [view for group in (*by_prn.values(), *by_email.values()) for view in group]
+    await _with_onchain_state(views)
+    return json_response(
+        Dict[str, Dict[str, List[CredentialView]]], {"by_prn": by_prn, "by_email": by_email}
+    )
+
+
+@router.get("/public/uid/{document_uid}", response_model=PublicVerificationResponse)
+@limiter.limit("30/minute")
+async def verify_document_uid(
+    request: Request,
+    document_uid: str = Path(..., pattern=r"^DOC-[A-Za-z0-9-]{1,64}$"),
+):
+    """Verify the degree a PDF footer / QR code names by its document_uid: a
+    compact payload with a server-signed receipt over it. The ETag derives
+    from the receipt, so a scanner holding one revalidates it with
+    If-None-Match (304 = the receipt still describes the degree)."""
+    payload = await public_lookup_cache.fetch(
+        "uid", document_uid, lambda: DegreeService.public_verification(document_uid)
+    )
+    etag = f'"{payload["receipt"]["signature"][:32]}"'
+    cache_control = f"public, max-age={settings.PUBLIC_UID_MAX_AGE_SECONDS}"
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return JSONResponse(payload, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+@router.get("/by-hash/{college_id_hash}", response_model=CredentialResponse)
+@limiter.limit("30/minute")
+async def get_degree_by_college_id_hash(
+    request: Request,
+    college_id_hash: str = Path(..., pattern=r"^0x[a-fA-F0-9]{64}$"),
+):
+    """Approved degree registered on-chain under `college_id_hash` (e.g. from
+    a QR code or a DegreeMinted event); an indexed lookup."""
+    cred = await DegreeService.get_public_by_college_id_hash(college_id_hash)
+    onchain = await DegreeService.onchain_states([cred])
+    data = _to_response(cred)
+    if cred.id in onchain:
+        data["onchain_revoked"] = onchain[cred.id].revoked
+    return data
+
+
+@router.get("/export")
+@limiter.limit("5/minute")
+async def export_degrees(
+    request: Request,
+    college_name: Optional[str] = None,
+    status: CredentialStatus = CredentialStatus.APPROVED,
+    prn_prefix: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: User = Depends(require_verified_admin),
+):
+    """Stream a ZIP of a college's degree PDFs (stamped when approved)."""
+    filename, archive = await DegreeService.export_documents(
+        current_user,
+        college_name=college_name,
+        status_value=status,
+        prn_prefix=prn_prefix,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return StreamingResponse(
+        archive,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "private, no-store",
+        },
+    )
+
+
+@router.post("/verify-transactions", response_model=List[TxVerificationResult])
+@limiter.limit("10/minute")
+async def verify_degree_transactions(
+    request: Request,
+    body: TxVerificationRequest,
+    current_user: User = Depends(require_verified_admin),
+):
+    """Re-check the on-chain uploadDegree transaction of up to 500 credentials."""
+    return await DegreeService.verify_transactions(body.credential_ids, current_user)
 
 
 @router.get("/{credential_id}", response_model=CredentialResponse)
@@ -164,6 +352,10 @@ async def revoke_degree(
     cred.revoked_at = datetime.utcnow()
     cred.updated_at = datetime.utcnow()
     await cred.save()
+    DegreeService.invalidate_stamped_document(cred.id)
+    await public_lookup_cache.invalidate_credentials([cred])
+    if cred.status == CredentialStatus.APPROVED:
+        DegreeService.schedule_prerender(cred.id)
     return _to_response(cred)
 
 
@@ -194,23 +386,35 @@ async def upload_document(
 
 @router.get("/{credential_id}/document")
 async def download_document(
+    request: Request,
     credential_id: UUID,
     current_user: User = Depends(get_current_user),
 ):
-    """Download / view the PDF document for a degree submission."""
+    """Download / view the PDF document for a degree submission.
+
+    Streams from disk with a strong ETag (304 on If-None-Match) and single
+    byte-range support so PDF viewers can fetch incrementally.
+    """
     try:
-        pdf_bytes = await DegreeService.get_document_with_footer(credential_id, current_user)
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"inline; filename=degree_{credential_id}.pdf"},
-        )
+        stamped = await DegreeService.get_stamped_document(credential_id, current_user)
     except HTTPException as exc:
         if exc.status_code == 403:
-            file_path = await DegreeService.get_document_path(credential_id, current_user)
-            return FileResponse(
-                path=file_path,
-                media_type="application/pdf",
+            original = await DegreeService.get_original_document(credential_id, current_user)
+            return file_response(
+                request,
+                original.path,
+                etag=original.etag,
                 filename=f"degree_{credential_id}.pdf",
+                disposition="attachment",
             )
         raise
+
+    if etag_matches(request, stamped.etag):
+        return not_modified(stamped.etag, "private, no-cache")
+    stamped_path = await DegreeService.render_stamped_document(stamped)
+    return file_response(
+        request,
+        str(stamped_path),
+        etag=stamped.etag,
+        filename=f"degree_{credential_id}.pdf",
+    )
@@ -4,15 +4,25 @@ from uuid import UUID
 import asyncio
 import os
 from web3 import Web3
-from app.schemas.schemas import UserResponse, WalletPatchRequest
-from app.models.models import User, UserRole
+from app.schemas.schemas import AdminRoleStatus, ChainTxJobResponse, UserResponse, WalletPatchRequest
+from app.models.models import ChainTxJob, User, UserRole
 from app.crud.crud import UserCRUD
 from app.api.deps.auth import get_current_user, require_role, require_verified_admin
 from app.core.config import settings
+from app.services.public_cache import public_lookup_cache
+from app.services.role_cache import RoleMembership
+from app.services.tx_queue import tx_queue
 # Telegram notification service used below via local import
 
 router = APIRouter(prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 
+
+def _with_job(user: User, job) -> UserResponse:
+    response = UserResponse.model_validate(user)
+    if job is not None:
+        response.chain_job_id = job.id
+    return response
+
 @router.get("/universities", response_model=List[str])
 async def get_registered_universities():
     """Return a unique list of college names from all registered and verified admins."""
@@ -37,28 +47,6 @@ async def get_all_users(
 ):
     return await UserCRUD.get_all()
 
-REGISTRY_ABI = [
-    {
-        "type": "function",
-        "name": "addUniversity",
-        "inputs": [
-            {"name": "universityAdmin", "type": "address"}
-        ],
-        "outputs": [],
-        "stateMutability": "nonpayable"
-    },
-    {
-        "type": "function",
-        "name": "hasRole",
-        "inputs": [
-            {"name": "role", "type": "bytes32"},
-            {"name": "account", "type": "address"}
-        ],
-        "outputs": [{"name": "", "type": "bool"}],
-        "stateMutability": "view"
-    }
-]
-
 @router.post("/verify-admin/{user_id}", response_model=UserResponse)
 async def verify_admin(
     user_id: UUID,
@@ -73,36 +61,17 @@ async def verify_admin(
         
     try:
         # If Web3 environment is configured AND the admin has already connected a wallet,
-        # grant the on-chain role via the deploying wallet.
+        # queue the on-chain role grant from the deploying wallet and return its job id.
         # If the admin has no wallet yet, we skip the on-chain step — they can connect
         # their wallet later in the admin dashboard before minting degrees.
-        if settings.PRIVATE_KEY and settings.CONTRACT_REGISTRY_ADDRESS and user.wallet_address:
-            w3 = Web3(Web3.HTTPProvider(settings.WEB3_PROVIDER_URI))
-            if w3.is_connected():
-                account = w3.eth.account.from_key(settings.PRIVATE_KEY)
-                registry_contract = w3.eth.contract(address=settings.CONTRACT_REGISTRY_ADDRESS, abi=REGISTRY_ABI)
-                admin_wallet = w3.to_checksum_address(user.wallet_address)
-                UNIVERSITY_ROLE = Web3.keccak(text="UNIVERSITY_ROLE")
-                
-                # Check if they already have the role.
-                has_role = registry_contract.functions.hasRole(UNIVERSITY_ROLE, admin_wallet).call()
-                if not has_role:
-                    tx = registry_contract.functions.grantRole(
-                        UNIVERSITY_ROLE, 
-                        admin_wallet
-                    ).build_transaction({
-                        'from': account.address,
-                        'nonce': w3.eth.get_transaction_count(account.address),
-                        'gas': 200000,
-                        'gasPrice': w3.eth.gas_price
-                    })
-                    signed_tx = w3.eth.account.sign_transaction(tx, private_key=settings.PRIVATE_KEY)
-                    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                    
-                    # Wait for transaction confirmation
-                    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-                    if receipt.status != 1:
-                        raise HTTPException(status_code=500, detail="On-chain role grant transaction failed.")
+        job = None
+        if tx_queue.configured and user.wallet_address:
+            job = await tx_queue.enqueue(
+                "grantRole",
+                user.wallet_address,
+                requested_by_id=current_user.id,
+                subject_user_id=user.id,
+            )
         
         user.is_legal_admin_verified = True
         from datetime import datetime
@@ -119,7 +88,7 @@ async def verify_admin(
             )
         )
 
-        return user
+        return _with_job(user, job)
     except HTTPException:
         raise
     except Exception as e:
@@ -131,7 +100,8 @@ async def update_wallet_address(
     current_user: User = Depends(require_verified_admin),
 ):
     """
-    Saves the verified admin's wallet address and grants UNIVERSITY_ROLE on-chain.
+    Saves the verified admin's wallet address and queues the on-chain
+    addUniversity call (UNIVERSITY_ROLE); the response carries its job id.
 
     The request schema's `pattern=WALLET_ADDRESS_PATTERN` rejects anything that
     is not an EVM / Ethereum 0x-prefixed 20-byte hex address (so Solana,
@@ -150,39 +120,63 @@ async def update_wallet_address(
     current_user.updated_at = datetime.utcnow()
     await current_user.save()
 
-    if (
-        current_user.is_legal_admin_verified
-        and settings.PRIVATE_KEY
-        and settings.CONTRACT_REGISTRY_ADDRESS
-    ):
+    job = None
+    if current_user.is_legal_admin_verified and tx_queue.configured:
         try:
-            w3 = Web3(Web3.HTTPProvider(settings.WEB3_PROVIDER_URI))
-            if w3.is_connected():
-                account = w3.eth.account.from_key(settings.PRIVATE_KEY)
-                registry_contract = w3.eth.contract(
-                    address=settings.CONTRACT_REGISTRY_ADDRESS, abi=REGISTRY_ABI
-                )
-                admin_wallet = w3.to_checksum_address(wallet_address)
-                UNIVERSITY_ROLE = Web3.keccak(text="UNIVERSITY_ROLE")
-
-                has_role = registry_contract.functions.hasRole(UNIVERSITY_ROLE, admin_wallet).call()
-                if not has_role:
-                    tx = registry_contract.functions.addUniversity(
-                        admin_wallet
-                    ).build_transaction({
-                        'from': account.address,
-                        'nonce': w3.eth.get_transaction_count(account.address),
-                        'gas': 200000,
-                        'gasPrice': w3.eth.gas_price
-                    })
-                    signed_tx = w3.eth.account.sign_transaction(tx, private_key=settings.PRIVATE_KEY)
-                    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                    w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            job = await tx_queue.enqueue(
+                "addUniversity",
+                wallet_address,
+                requested_by_id=current_user.id,
+                subject_user_id=current_user.id,
+            )
         except Exception as e:
             import logging
-            logging.getLogger(__name__).warning(f"addUniversity on-chain failed after wallet save: {e}")
+            logging.getLogger(__name__).warning(f"Queueing addUniversity failed after wallet save: {e}")
 
-    return current_user
+    return _with_job(current_user, job)
+
+
+@router.get("/chain-jobs/{job_id}", response_model=ChainTxJobResponse)
+async def get_chain_job(
+    job_id: UUID,
+    current_user: User = Depends(require_verified_admin),
+):
+    """Progress of a queued on-chain transaction (QUEUED -> SUBMITTED ->
+    CONFIRMED / FAILED, through STALLED while a slow one is being re-sent, or
+    SKIPPED when the wallet already has the role)."""
+    job = await ChainTxJob.get(job_id)
+    if not job or (
+        current_user.role != UserRole.SUPERADMIN
+        and current_user.id not in (job.subject_user_id, job.requested_by_id)
+    ):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/chain-roles", response_model=List[AdminRoleStatus])
+async def get_admin_chain_roles(
+    current_user: User = Depends(require_verified_admin),
+):
+    """Whether each admin's wallet holds UNIVERSITY_ROLE on-chain, from the
+    role cache (one Mongo query, no RPC). Superadmins see every admin; an
+    admin sees only themselves."""
+    if current_user.role == UserRole.SUPERADMIN:
+        admins = await User.find(User.role == UserRole.ADMIN).to_list()
+    else:
+        admins = [current_user]
+    roles = await RoleMembership.lookup(admin.wallet_address for admin in admins)
+    statuses = []
+    for admin in admins:
+        record = roles.get(Web3.to_checksum_address(admin.wallet_address)) if admin.wallet_address else None
+        statuses.append(AdminRoleStatus(
+            user_id=admin.id,
+            email=admin.email,
+            full_name=admin.full_name,
+            college_name=admin.college_name,
+            wallet_address=admin.wallet_address,
+            has_university_role=record.member if record else None,
+            role_block=record.last_block if record else None,
+        ))
+    return statuses
 
 @router.get("/my-students", response_model=List[UserResponse])
 async def get_my_students(
@@ -209,4 +203,7 @@ async def delete_user(
     success = await UserCRUD.delete(user_id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete user")
+    from app.services.degree_service import document_store
+    await document_store.release(user.verification_document_path)
+    await public_lookup_cache.invalidate(emails=[user.email])
     return None
@@ -0,0 +1,39 @@
+"""GZip middleware that leaves binary downloads alone.
+
+Starlette's GZipMiddleware compresses every response over `minimum_size`.
+For PDFs / archives that burns CPU on the event loop for no size win, and for
+206 partial responses it breaks the byte offsets in Content-Range. This
+variant passes those responses through untouched.
+"""
+
+from __future__ import annotations
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware as _GZipMiddleware
+from starlette.middleware.gzip import GZipResponder as _GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+_UNCOMPRESSED_TYPES = ("application/pdf", "application/zip")
+
+
+class _SelectiveGZipResponder(_GZipResponder):
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if message["status"] == 206 or content_type.startswith(_UNCOMPRESSED_TYPES):
+                # Reuse the "already encoded" pass-through path.
+                self.content_encoding_set = True
+
+
+class GZipMiddleware(_GZipMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = _SelectiveGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
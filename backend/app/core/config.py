@@ -38,6 +38,78 @@ class Settings(BaseSettings):
     CONTRACT_SBT_ADDRESS: str = ""
     CONTRACT_REGISTRY_ADDRESS: str = ""
     PRIVATE_KEY: Optional[str] = None
+    WEB3_POOL_SIZE: int = 10
+    WEB3_CALL_TIMEOUT_SECONDS: float = 10.0
+    # JSON-RPC calls per batch HTTP request
+    WEB3_MAX_BATCH_SIZE: int = 100
+    # Chain backend: "rpc" (WEB3_PROVIDER_URI), "anvil" (local node) or
+    # "fake" (in-process, for load tests; never in production)
+    CHAIN_BACKEND: str = "rpc"
+    ANVIL_URI: str = "http://127.0.0.1:8545"
+    CHAIN_FAKE_FIXTURES: str = ""
+    CHAIN_FAKE_LATENCY_MS: float = 0.0
+    # Verified transactions are cached once this deep (reorgs can't undo them)
+    TX_CACHE_MIN_CONFIRMATIONS: int = 12
+    TX_CACHE_MAX_ENTRIES: int = 10000
+    # Event indexer: blocks are indexed once INDEXER_CONFIRMATIONS deep, so
+    # shallower reorgs never reach the projection. Start at the deployment block.
+    INDEXER_ENABLED: bool = True
+    INDEXER_START_BLOCK: int = 0
+    INDEXER_BLOCK_RANGE: int = 2000
+    INDEXER_CONFIRMATIONS: int = 12
+    INDEXER_POLL_SECONDS: float = 15.0
+    # Transaction queue: one writer process signs and sends Registry
+    # transactions with a locally tracked nonce (TX_QUEUE_WRITER=false on the
+    # other workers; they only enqueue).
+    TX_QUEUE_WRITER: bool = True
+    TX_GAS_LIMIT: int = 200000
+    TX_FEE_CACHE_SECONDS: float = 30.0
+    TX_QUEUE_POLL_SECONDS: float = 5.0
+    TX_CONFIRM_TIMEOUT_SECONDS: float = 600.0
+    # A job not mined within the timeout is STALLED and re-sent at its nonce
+    # with fees raised by at least TX_FEE_BUMP_PERCENT (nodes want +10%), up
+    # to TX_MAX_REPLACEMENTS times; it stays tracked either way
+    TX_FEE_BUMP_PERCENT: int = 25
+    TX_MAX_REPLACEMENTS: int = 5
+    # Chain reconciliation: credentials read from Mongo per batch of eth_calls
+    RECONCILE_BATCH_SIZE: int = 500
+
+    # Footer-stamped PDF cache (stored under UPLOAD_DIR/stamped_cache)
+    STAMPED_PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Process pool for PDF stamping / validation (0 workers = run in a thread)
+    RENDER_POOL_WORKERS: int = 2
+    RENDER_POOL_MAX_PENDING: int = 32
+    RENDER_JOB_TIMEOUT_SECONDS: float = 30.0
+
+    # Upload persistence: "none" | "file" (fsync before rename) | "full" (also
+    # fsync the directory after the rename)
+    STORAGE_FSYNC_POLICY: str = "file"
+    STORAGE_IO_THREADS: int = 4
+
+    # Bulk ZIP export: stamped PDFs prepared concurrently per request
+    BULK_EXPORT_CONCURRENCY: int = 4
+
+    # Public listings: keyset page size when the client gives no `limit`, and
+    # its ceiling (NDJSON streams are unpaged and read in batches of the default)
+    PUBLIC_PAGE_SIZE: int = 100
+    PUBLIC_PAGE_MAX_SIZE: int = 500
+    # Public PRN / email lookups: in-process LRU in front of Redis (REDIS_URL)
+    # or a process-local stand-in. The LRU TTL bounds how long another worker
+    # can serve an answer invalidated elsewhere.
+    PUBLIC_CACHE_MAX_ENTRIES: int = 10000
+    PUBLIC_CACHE_LOCAL_TTL_SECONDS: float = 10.0
+    PUBLIC_CACHE_TTL_SECONDS: float = 300.0
+    # POST /degrees/public/batch: its own limit, charged one unit per started
+    # block of PUBLIC_BATCH_COST_UNIT identifiers (a 200-candidate check is
+    # one request, like a single lookup)
+    PUBLIC_BATCH_RATE_LIMIT: str = "30/minute"
+    PUBLIC_BATCH_COST_UNIT: int = 250
+    # GET /degrees/public/uid/{document_uid}: how long clients and proxies may
+    # reuse an answer, and the HMAC key of its verification receipts (unset =
+    # derived from SECRET_KEY)
+    PUBLIC_UID_MAX_AGE_SECONDS: int = 60
+    VERIFICATION_RECEIPT_KEY: Optional[str] = None
 
     # Superadmin seeding — dev defaults only. In production, these MUST be
     # overridden via environment variables / a secrets manager. The prod-
@@ -0,0 +1,190 @@
+"""Conditional and ranged responses.
+
+Used for the degree PDF download. Files are streamed from disk in chunks
+(never buffered whole), tagged with a caller-supplied strong ETag, answer
+`If-None-Match` with 304 and serve a single `Range: bytes=...` request with
+206 so browser PDF viewers can fetch incrementally. Multi-range requests get
+the full body, which RFC 9110 allows.
+
+Credential listings carry a weak `Validator` (ETag plus Last-Modified) worked
+out from a cheap summary of what they would return, so a re-poll that
+matches is answered with 304 before the listing is loaded.
+"""
+
+from __future__ import annotations
+
+import calendar
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, NamedTuple, Optional, Tuple
+
+import anyio
+import anyio.to_thread
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+_CHUNK = 64 * 1024
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match covers `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return Response(status_code=304, headers=headers)
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak ETag over `parts` (anything with a stable repr)."""
+    return 'W/"%s"' % hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate of a naive UTC datetime (how the models store them)."""
+    return formatdate(calendar.timegm(value.timetuple()), usegmt=True)
+
+
+class Validator(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    def headers(self, cache_control: str) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+    def not_modified(self, cache_control: str) -> Response:
+        return not_modified(self.etag, cache_control, self.last_modified)
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    """Whether the client's copy is current. If-None-Match decides when
+    present (RFC 9110 13.2.2); If-Modified-Since is only consulted without
+    it, and cannot see deletions, which leave Last-Modified where it was."""
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, validator.etag)
+    header = request.headers.get("if-modified-since")
+    if not header or validator.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return validator.last_modified.replace(microsecond=0) <= since
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=` range into an inclusive (start, end).
+
+    Returns None when the header should be ignored (malformed or multi-range)
+    and raises ValueError when it is well-formed but unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.strip().partition("-"))
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes.
+        if last == "":
+            return None
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("range not satisfiable")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+async def _iter_file(fh: BinaryIO, start: int, length: int) -> AsyncIterator[bytes]:
+    try:
+        await anyio.to_thread.run_sync(fh.seek, start)
+        remaining = length
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(fh.read, min(_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def file_response(
+    request: Request,
+    path: str,
+    *,
+    etag: str,
+    filename: str,
+    media_type: str = "application/pdf",
+    disposition: str = "inline",
+    cache_control: str = "private, no-cache",
+) -> Response:
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    # Open up front: the handle keeps the bytes readable even if the cache
+    # evicts or invalidates the file while the body is still streaming.
+    fh = open(path, "rb")
+    size = os.fstat(fh.fileno()).st_size
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'{disposition}; filename="{filename}"',
+    }
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            fh.close()
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(_iter_file(fh, 0, size), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(fh, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
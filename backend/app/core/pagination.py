@@ -0,0 +1,80 @@
+"""Keyset pagination and NDJSON streaming for public listings.
+
+A page ends with a cursor naming the (created_at, id) of its last row; the
+next page is the rows strictly after it in (-created_at, -id) order, which an
+index on that key serves with one seek however deep the client has paged,
+and without skipping or repeating rows when new ones are inserted meanwhile.
+The cursor is opaque to clients (urlsafe base64) so the key can change.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+NDJSON = "application/x-ndjson"
+
+Cursor = Tuple[datetime, UUID]
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def set_next_page(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Advertise the next page (RFC 8288 Link plus a plain header for clients
+    that would rather not parse one); absent on the last page."""
+    if next_cursor is None:
+        return
+    url = request.url.include_query_params(cursor=next_cursor)
+    response.headers["Link"] = f'<{url}>; rel="next"'
+    response.headers["X-Next-Cursor"] = next_cursor
+
+
+async def batched(rows: AsyncIterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    batch: List[Any] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_response(lines: AsyncIterator[Iterable[str]]) -> StreamingResponse:
+    """Stream batches of pre-serialized JSON objects, one per line."""
+
+    async def body() -> AsyncIterator[bytes]:
+        async for batch in lines:
+            chunk = "".join(f"{line}\n" for line in batch)
+            if chunk:
+                yield chunk.encode()
+
+    return StreamingResponse(body(), media_type=NDJSON)
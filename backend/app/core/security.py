@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import hmac
+import json
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -62,3 +65,24 @@ def get_token_exp(token: str) -> Optional[datetime]:
         return datetime.utcfromtimestamp(int(exp))
     except (TypeError, ValueError):
         return None
+
+
+def _receipt_key() -> bytes:
+    if settings.VERIFICATION_RECEIPT_KEY:
+        return settings.VERIFICATION_RECEIPT_KEY.encode()
+    return hmac.new(settings.SECRET_KEY.encode(), b"verification-receipt", hashlib.sha256).digest()
+
+
+def receipt_key_id() -> str:
+    """Short fingerprint of the receipt key, so holders notice a rotation."""
+    return hashlib.sha256(_receipt_key()).hexdigest()[:16]
+
+
+def sign_receipt(claims: dict) -> str:
+    """HMAC-SHA256 (hex) over the canonical JSON of `claims`."""
+    canonical = json.dumps(claims, sort_keys=True, separators=(",", ":"), default=str)
+    return hmac.new(_receipt_key(), canonical.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_receipt(claims: dict, signature: str) -> bool:
+    return hmac.compare_digest(sign_receipt(claims), signature)
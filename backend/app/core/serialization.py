@@ -0,0 +1,37 @@
+"""JSON responses for models that were validated when they were loaded.
+
+Returning model instances from a route with a `response_model` makes FastAPI
+validate them against that model a second time and then encode the result
+field by field; on list endpoints over projection models (see
+`models.CredentialView`) that pass costs more than the query. These helpers
+dump straight to JSON with pydantic-core instead. Routes keep their
+`response_model` for the OpenAPI schema.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def json_response(type_: Any, value: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """`value` (an instance of `type_`, e.g. Dict[str, List[View]]) as JSON."""
+    return Response(
+        content=_adapter(type_).dump_json(value),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def json_list_response(
+    model: Type[BaseModel], items: Sequence[Any], headers: Optional[Dict[str, str]] = None
+) -> Response:
+    return json_response(List[model], list(items), headers)
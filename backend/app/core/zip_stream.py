@@ -0,0 +1,78 @@
+"""Write a ZIP archive straight into a streaming response.
+
+`zipfile` can target a non-seekable stream: it then emits a data descriptor
+after each member instead of seeking back to patch the local header. We hand
+it a sink that only collects the bytes written since the last drain, so the
+archive goes out chunk by chunk and is never held in memory as a whole.
+Members are stored, not deflated - PDFs are already compressed and deflating
+them would only burn CPU on the event loop.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from typing import AsyncIterator, BinaryIO, List, Optional
+
+import anyio.to_thread
+
+_CHUNK = 64 * 1024
+
+
+class _Sink:
+    """Minimal write-only file object; deliberately has no tell()/seek()."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class ZipStream:
+    """Incrementally build a ZIP; every method returns the bytes to send."""
+
+    def __init__(self) -> None:
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    async def add_file(self, arcname: str, fh: BinaryIO) -> AsyncIterator[bytes]:
+        """Copy an open file into the archive, yielding output as it is produced.
+
+        The caller owns `fh`; it is read in chunks off the event loop.
+        """
+        with self._zip.open(arcname, mode="w") as member:
+            while True:
+                chunk = await anyio.to_thread.run_sync(fh.read, _CHUNK)
+                if not chunk:
+                    break
+                member.write(chunk)
+                out = self._sink.drain()
+                if out:
+                    yield out
+        out = self._sink.drain()
+        if out:
+            yield out
+
+    def add_bytes(self, arcname: str, data: bytes) -> bytes:
+        self._zip.writestr(arcname, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Write the central directory and return the final bytes."""
+        self._zip.close()
+        return self._sink.drain()
+
+
+def safe_arcname(name: str, fallback: Optional[str] = None) -> str:
+    """Restrict an archive member / download name to a portable character set."""
+    cleaned = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in name).strip("._")
+    return cleaned or (fallback or "file")
@@ -1,9 +1,14 @@
+import re
 from uuid import UUID, uuid4
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple, Type
 from datetime import datetime
+from beanie.odm.queries.find import FindMany
+from beanie.operators import And, In, Or, RegEx
+from pydantic import BaseModel
 from app.models.models import User, Credential, UserRole, CredentialStatus
 from app.schemas.schemas import UserCreate, UserUpdate, CredentialCreate, CredentialUpdate
 from app.core.security import hash_password, verify_password
+from app.services.chain import compute_college_id_hash
 
 # all methods are async now because beanie operations are async
 class UserCRUD:
@@ -32,13 +37,17 @@ class UserCRUD:
     async def get_by_email(email: str) -> Optional[User]:
         return await User.find_one(User.email == UserCRUD._norm_email(email))
 
+    @staticmethod
+    async def get_many_by_email(emails: List[str]) -> List[User]:
+        return await User.find(In(User.email, [UserCRUD._norm_email(e) for e in emails])).to_list()
+
     @staticmethod
     async def get_by_id(user_id: UUID) -> Optional[User]:
         return await User.get(user_id)
 
     @staticmethod
     async def get_all(skip: int = 0, limit: int = 100) -> List[User]:
-        return await User.find_all().skip(skip).limit(limit).to_list()
+        return await User.find_all().sort("+_id").skip(skip).limit(limit).to_list()
 
     @staticmethod
     async def update(user_id: UUID, user_update: UserUpdate) -> Optional[User]:
@@ -84,6 +93,7 @@ class CredentialCRUD:
             tx_hash=credential_create.tx_hash,
             prn_number=credential_create.prn_number,
             college_name=credential_create.college_name,
+            college_id_hash=compute_college_id_hash(credential_create.prn_number, credential_create.college_name),
             document_uid=f"DOC-{uuid4().hex[:12].upper()}"
         )
         await credential.insert()
@@ -94,16 +104,55 @@ class CredentialCRUD:
         return await Credential.get(credential_id)
 
     @staticmethod
-    async def get_all(skip: int = 0, limit: int = 100) -> List[Credential]:
-        return await Credential.find_all().skip(skip).limit(limit).to_list()
+    async def get_many(credential_ids: List[UUID]) -> List[Credential]:
+        return await Credential.find(In(Credential.id, credential_ids)).to_list()
+
+    @staticmethod
+    def query_all(skip: int = 0, limit: int = 100, projection: Optional[Type[BaseModel]] = None) -> FindMany[Credential]:
+        return Credential.find_all(projection_model=projection).sort("+_id").skip(skip).limit(limit)
+
+    @staticmethod
+    async def get_all(skip: int = 0, limit: int = 100, projection: Optional[Type[BaseModel]] = None) -> List[Credential]:
+        return await CredentialCRUD.query_all(skip, limit, projection).to_list()
+
+    @staticmethod
+    def query_by_user(user_id: UUID, projection: Optional[Type[BaseModel]] = None) -> FindMany[Credential]:
+        return Credential.find(Credential.issued_to_id == user_id, projection_model=projection)
+
+    @staticmethod
+    async def get_by_user(user_id: UUID, projection: Optional[Type[BaseModel]] = None) -> List[Credential]:
+        return await CredentialCRUD.query_by_user(user_id, projection).to_list()
 
     @staticmethod
-    async def get_by_user(user_id: UUID) -> List[Credential]:
-        return await Credential.find(Credential.issued_to_id == user_id).to_list()
+    def query_by_college(
+        college_name: str, skip: int = 0, limit: int = 100, projection: Optional[Type[BaseModel]] = None
+    ) -> FindMany[Credential]:
+        return Credential.find(
+            Credential.college_name == college_name, projection_model=projection
+        ).skip(skip).limit(limit)
 
     @staticmethod
-    async def get_by_college(college_name: str, skip: int = 0, limit: int = 100) -> List[Credential]:
-        return await Credential.find(Credential.college_name == college_name).skip(skip).limit(limit).to_list()
+    async def get_by_college(
+        college_name: str, skip: int = 0, limit: int = 100, projection: Optional[Type[BaseModel]] = None
+    ) -> List[Credential]:
+        return await CredentialCRUD.query_by_college(college_name, skip, limit, projection).to_list()
+
+    @staticmethod
+    async def get_stamps(
+        query: FindMany[Credential], fields: Iterable[str] = (), limit: Optional[int] = None
+    ) -> List[dict]:
+        """_id, updated_at and `fields` of each document `query` (or its first
+        `limit`) would return, in its order, as raw dicts: nothing else is
+        read and no model is validated."""
+        projection = dict.fromkeys(("updated_at", *fields), 1)
+        cursor = Credential.get_motor_collection().find(
+            query.get_filter_query(),
+            projection,
+            sort=query.sort_expressions or None,
+            skip=query.skip_number or 0,
+            limit=limit if limit is not None else query.limit_number or 0,
+        )
+        return await cursor.to_list(None)
 
     @staticmethod
     async def update_status(credential_id: UUID, status: CredentialStatus) -> Optional[Credential]:
@@ -124,30 +173,89 @@ class CredentialCRUD:
         update_data = credential_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(credential, field, value)
+        if credential.college_id_hash is None or update_data.keys() & {"prn_number", "college_name"}:
+            credential.college_id_hash = compute_college_id_hash(credential.prn_number, credential.college_name)
 
         credential.updated_at = datetime.utcnow()
         await credential.save()
         return credential
 
     @staticmethod
-    async def get_approved_by_prn(prn_number: str) -> List[Credential]:
+    async def get_approved_by_college_id_hash(college_id_hash: str) -> Optional[Credential]:
+        # Several off-chain approvals may share a hash; prefer the one
+        # registered on-chain (strings sort before nulls descending).
         return await Credential.find(
-            Credential.prn_number == prn_number,
-            Credential.status == CredentialStatus.APPROVED
-        ).to_list()
+            Credential.college_id_hash == college_id_hash.lower(),
+            Credential.status == CredentialStatus.APPROVED,
+        ).sort(-Credential.tx_hash).first_or_none()
 
     @staticmethod
-    async def get_approved_by_user_id(user_id: UUID) -> List[Credential]:
-        return await Credential.find(
-            Credential.issued_to_id == user_id,
-            Credential.status == CredentialStatus.APPROVED
-        ).to_list()
+    async def get_approved_by_document_uid(document_uid: str) -> Optional[Credential]:
+        return await Credential.find_one(
+            Credential.document_uid == document_uid,
+            Credential.status == CredentialStatus.APPROVED,
+        )
 
     @staticmethod
-    async def get_all_approved() -> List[Credential]:
+    def query_approved(
+        prn_number: Optional[str] = None,
+        issued_to_id: Optional[UUID] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        projection: Optional[Type[BaseModel]] = None,
+    ) -> FindMany[Credential]:
+        """Unexecuted query over approved credentials, newest first, starting
+        after the keyset cursor `after` (see app/core/pagination.py)."""
+        conditions = [Credential.status == CredentialStatus.APPROVED]
+        if prn_number is not None:
+            conditions.append(Credential.prn_number == prn_number)
+        if issued_to_id is not None:
+            conditions.append(Credential.issued_to_id == issued_to_id)
+        if after is not None:
+            created_at, id = after
+            conditions.append(Or(
+                Credential.created_at < created_at,
+                And(Credential.created_at == created_at, Credential.id < id),
+            ))
+        return Credential.find(*conditions, projection_model=projection).sort(
+            -Credential.created_at, -Credential.id
+        )
+
+    @staticmethod
+    async def get_approved_in(
+        prn_numbers: Optional[List[str]] = None,
+        issued_to_ids: Optional[List[UUID]] = None,
+        projection: Optional[Type[BaseModel]] = None,
+    ) -> List[Credential]:
+        """Approved credentials of any of `prn_numbers` or of any student in
+        `issued_to_ids` (one $in query), newest first."""
+        if prn_numbers is not None:
+            condition = In(Credential.prn_number, prn_numbers)
+        else:
+            condition = In(Credential.issued_to_id, issued_to_ids)
         return await Credential.find(
-            (Credential.status == CredentialStatus.APPROVED)
-        ).to_list()
+            condition, Credential.status == CredentialStatus.APPROVED, projection_model=projection
+        ).sort(-Credential.created_at, -Credential.id).to_list()
+
+    @staticmethod
+    def query_for_export(
+        college_name: str,
+        status: CredentialStatus,
+        prn_prefix: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> FindMany[Credential]:
+        """Unexecuted query so bulk exports can iterate the cursor lazily."""
+        conditions = [
+            Credential.college_name == college_name,
+            Credential.status == status,
+        ]
+        if prn_prefix:
+            conditions.append(RegEx(Credential.prn_number, f"^{re.escape(prn_prefix)}"))
+        if created_from:
+            conditions.append(Credential.created_at >= created_from)
+        if created_to:
+            conditions.append(Credential.created_at <= created_to)
+        return Credential.find(*conditions).sort(+Credential.prn_number, +Credential.created_at)
 
     @staticmethod
     async def delete(credential_id: UUID) -> bool:
@@ -2,6 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
+from beanie.exceptions import RevisionIdWasChanged
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
 
 from app.core.config import settings
 from app.core.errors import register_exception_handlers
@@ -17,9 +20,17 @@ from app.api.routes import auth, users, credentials, degrees, telegram
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.core.limiter import limiter
-from fastapi.middleware.gzip import GZipMiddleware
+from app.core.compression import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from app.core.security_headers import SecurityHeadersMiddleware
+from app.services.render_pool import render_pool
+from app.services.storage import storage
+from app.services.chain import chain, compute_college_id_hash
+from app.services.chain_indexer import chain_indexer
+from app.services.public_cache import public_lookup_cache
+from app.services.role_cache import role_indexer
+from app.services.tx_queue import tx_queue
+from app.services.degree_service import DegreeService
 
 configure_logging()
 
@@ -48,6 +59,8 @@ def _enforce_production_security() -> None:
             "ALLOW_SELF_SERVE_PASSWORD_RESET must be false in production "
             "(wire up email-token-based reset instead)"
         )
+    if settings.CHAIN_BACKEND != "rpc":
+        problems.append("CHAIN_BACKEND must be 'rpc' in production")
     if problems:
         raise RuntimeError(
             "Refusing to start in production with insecure config: "
@@ -55,30 +68,87 @@ def _enforce_production_security() -> None:
         )
 
 
-async def _reconcile_blacklist_indexes(db) -> None:
-    """Drop any pre-existing `expires_at` index on blacklisted_tokens that was
-    created before we switched to a TTL index. Mongo refuses to redefine an
-    index with different options, so we must drop-then-recreate. Safe to run
-    on every boot — Beanie will (re)create the correct TTL index immediately
-    after init_beanie() runs.
+DOCUMENT_MODELS = [
+    models.User,
+    models.Credential,
+    models.BlacklistedToken,
+    models.VerifiedTransaction,
+    models.OnChainDegree,
+    models.OnChainRole,
+    models.IndexerCheckpoint,
+    models.ChainTxJob,
+]
+
+_INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _index_shape(key, options) -> tuple:
+    key = tuple((field, int(d) if isinstance(d, (int, float)) else d) for field, d in key)
+    opts = tuple(
+        (opt, dict(options[opt]) if opt == "partialFilterExpression" else options[opt])
+        for opt in _INDEX_OPTIONS
+        if options.get(opt) not in (None, False)
+    )
+    return key, opts
+
+
+async def _reconcile_indexes(db, document_models) -> None:
+    """Drop existing indexes that clash with the ones the models declare -
+    same name or same key pattern, different definition (e.g. the old non-TTL
+    `expires_at` index on blacklisted_tokens, or an index that has since become
+    unique). Mongo refuses to redefine an index in place, so we drop-then-
+    recreate: init_beanie() creates every declared index right after this.
+    Indexes the models don't mention are left alone. Safe to run on every boot.
     """
-    try:
-        existing = await db["blacklisted_tokens"].index_information()
-    except Exception as exc:  # collection may not exist yet on a fresh DB
-        logger.debug("blacklisted_tokens index_information skipped: %s", exc)
-        return
-
-    for name, spec in existing.items():
-        if name == "_id_":
+    for model in document_models:
+        declared = [
+            index.document for index in getattr(model.Settings, "indexes", [])
+            if isinstance(index, IndexModel)
+        ]
+        if not declared:
             continue
-        keys = spec.get("key", [])
-        # Drop any `expires_at` index that is NOT already a TTL index.
-        if any(k[0] == "expires_at" for k in keys) and "expireAfterSeconds" not in spec:
-            try:
-                await db["blacklisted_tokens"].drop_index(name)
-                logger.info("Dropped stale non-TTL index '%s' on blacklisted_tokens", name)
-            except Exception as exc:
-                logger.warning("Could not drop index '%s': %s", name, exc)
+        collection = db[model.Settings.name]
+        try:
+            existing = await collection.index_information()
+        except Exception as exc:  # collection may not exist yet on a fresh DB
+            logger.debug("%s index_information skipped: %s", model.Settings.name, exc)
+            continue
+
+        for name, spec in existing.items():
+            if name == "_id_":
+                continue
+            shape = _index_shape(spec["key"], spec)
+            for index in declared:
+                wanted = _index_shape(index["key"].items(), index)
+                if (name == index["name"] or shape[0] == wanted[0]) and (name, shape) != (index["name"], wanted):
+                    try:
+                        await collection.drop_index(name)
+                        logger.info("Dropped index '%s' on %s; it is recreated as declared", name, model.Settings.name)
+                    except Exception as exc:
+                        logger.warning("Could not drop index '%s': %s", name, exc)
+                    break
+
+
+async def _backfill_college_id_hashes() -> None:
+    """Store college_id_hash on credentials created before the field existed.
+    Only touches rows without one, so it is a no-op after the first boot."""
+    filled = 0
+    async for cred in models.Credential.find(
+        models.Credential.college_id_hash == None,  # noqa: E711
+        models.Credential.prn_number != None,  # noqa: E711
+        models.Credential.college_name != None,  # noqa: E711
+    ):
+        cred.college_id_hash = compute_college_id_hash(cred.prn_number, cred.college_name)
+        try:
+            await cred.save()
+            filled += 1
+        except (DuplicateKeyError, RevisionIdWasChanged):
+            logger.warning(
+                "Credential %s shares collegeIdHash %s with another registered credential; left unset",
+                cred.id, cred.college_id_hash,
+            )
+    if filled:
+        logger.info("Backfilled college_id_hash on %d credential(s)", filled)
 
 
 import asyncio as _asyncio
@@ -134,11 +204,13 @@ async def lifespan(app: FastAPI):
     session.init_db()
     client: AsyncIOMotorClient = session.client  # type: ignore
     db = client[settings.MONGODB_DB]
-    # Drop legacy non-TTL indexes BEFORE Beanie tries to (re)create them.
-    await _reconcile_blacklist_indexes(db)
+    # Drop clashing legacy indexes BEFORE Beanie tries to (re)create them.
+    await _reconcile_indexes(db, DOCUMENT_MODELS)
     # initialize beanie with our document models
-    await init_beanie(database=db, document_models=[models.User, models.Credential, models.BlacklistedToken])
+    await init_beanie(database=db, document_models=DOCUMENT_MODELS)
+
 
+    await _backfill_college_id_hashes()
 
     # Seed a generic Superadmin
     try:
@@ -161,6 +233,17 @@ async def lifespan(app: FastAPI):
         # Don't crash startup if seeding fails (e.g., transient DB issues)
         logger.error("Admin seeding failed: %s", str(e))
 
+    # Warm the PDF render pool so the first download doesn't pay for spawning workers
+    render_pool.start()
+
+    # One pooled async Web3 client for the app's lifetime
+    await chain.start()
+    # Follow degree and role events into the on-chain projections
+    chain_indexer.start()
+    role_indexer.start()
+    # Single writer for Registry transactions sent from the backend wallet
+    tx_queue.start()
+
     # Start the weekly reminder background task
     _reminder_task = _asyncio.create_task(_weekly_pending_reminder_loop())
     logger.info("📱 Notification service initialized (Telegram %s)",
@@ -180,6 +263,18 @@ async def lifespan(app: FastAPI):
             await _reminder_task
         except _asyncio.CancelledError:
             pass
+    # Let in-flight stamped-PDF pre-renders land before the pool goes away
+    try:
+        await _asyncio.wait_for(DegreeService.drain_prerenders(), timeout=settings.RENDER_JOB_TIMEOUT_SECONDS)
+    except _asyncio.TimeoutError:
+        logger.warning("Stamped PDF pre-renders still pending at shutdown")
+    render_pool.shutdown()
+    storage.shutdown()
+    await chain_indexer.stop()
+    await role_indexer.stop()
+    await public_lookup_cache.close()
+    await tx_queue.stop()
+    await chain.close()
     logger.info("Shutting down application...")
 
 app = FastAPI(
@@ -240,7 +335,13 @@ async def health_check():
             "status": "healthy",
             "database": "mongodb",
             "connection": "active",
-            "users_count": test_count
+            "users_count": test_count,
+            "render_pool": render_pool.stats(),
+            "storage": storage.stats(),
+            "chain_indexer": chain_indexer.stats(),
+            "role_indexer": role_indexer.stats(),
+            "public_cache": public_lookup_cache.stats(),
+            "tx_queue": tx_queue.stats(),
         }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
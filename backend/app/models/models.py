@@ -1,11 +1,11 @@
 from enum import Enum as PyEnum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID, uuid4
 from datetime import datetime
 
 from beanie import Document, Indexed
-from pydantic import Field
-from pymongo import IndexModel, ASCENDING
+from pydantic import BaseModel, Field, computed_field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 # we keep the same enums so they can be reused in schemas
 class UserRole(str, PyEnum):
@@ -19,6 +19,16 @@ class CredentialStatus(str, PyEnum):
     APPROVED = "APPROVED"
     REJECTED = "REJECTED"
 
+class ChainTxStatus(str, PyEnum):
+    QUEUED = "QUEUED"
+    SUBMITTED = "SUBMITTED"
+    # Not mined within TX_CONFIRM_TIMEOUT_SECONDS: still tracked, and re-sent
+    # at the same nonce with higher fees
+    STALLED = "STALLED"
+    CONFIRMED = "CONFIRMED"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
+
 class User(Document):
     id: UUID = Field(default_factory=uuid4)
     email: str = Indexed(unique=True)
@@ -39,6 +49,13 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            # Every incoming Telegram message resolves its sender
+            IndexModel([("telegram_id", ASCENDING)]),
+            # Admin / student listings per college (/users/my-students,
+            # /users/universities, the pending-degree reminder)
+            IndexModel([("role", ASCENDING), ("college_name", ASCENDING)]),
+        ]
 
 class Credential(Document):
     id: UUID = Field(default_factory=uuid4)
@@ -49,11 +66,23 @@ class Credential(Document):
     status: CredentialStatus = CredentialStatus.PENDING
     metadata_json: Optional[dict] = None
     document_path: Optional[str] = None
+    # Digests of the uploaded PDF; document_path is the content-addressed blob
+    # named after document_sha256.
+    document_sha256: Optional[str] = None
+    document_keccak256: Optional[str] = None
     document_uid: Optional[str] = None
+    # Footer-stamped copy rendered ahead of time on approval; only served while
+    # stamped_document_key matches the credential's current render key.
+    stamped_document_path: Optional[str] = None
+    stamped_document_hash: Optional[str] = None
+    stamped_document_key: Optional[str] = None
     token_id: Optional[int] = None
     tx_hash: Optional[str] = None
     prn_number: Optional[str] = None
     college_name: Optional[str] = None
+    # keccak256("{prn_number}-{college_name}"), the degree's on-chain key;
+    # kept in step with prn_number / college_name by CredentialCRUD.
+    college_id_hash: Optional[str] = None
     revoked: bool = False
     revoked_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -61,6 +90,75 @@ class Credential(Document):
 
     class Settings:
         name = "credentials"
+        indexes = [
+            IndexModel([("college_id_hash", ASCENDING), ("status", ASCENDING)]),
+            # Keyset order of the public listing (app/core/pagination.py),
+            # overall, per PRN and per student; the student one also serves
+            # dashboards and the Telegram bot
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("prn_number", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("issued_to_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            # Admin listing and reminder counts per college; the trailing
+            # fields are the bulk export's filter and sort
+            IndexModel([("college_name", ASCENDING), ("status", ASCENDING), ("prn_number", ASCENDING), ("created_at", ASCENDING)]),
+            # document_uid is printed on the PDF footer / QR code and looked
+            # up by GET /degrees/public/uid/{document_uid}
+            IndexModel(
+                [("document_uid", ASCENDING)],
+                name="document_uid_unique",
+                unique=True,
+                partialFilterExpression={"document_uid": {"$type": "string"}},
+            ),
+            # A collegeIdHash is registered on-chain once, so at most one
+            # credential carrying a tx_hash may have it; resubmissions and
+            # off-chain approvals of the same PRN are unaffected.
+            IndexModel(
+                [("college_id_hash", ASCENDING)],
+                name="college_id_hash_registered",
+                unique=True,
+                partialFilterExpression={
+                    "college_id_hash": {"$type": "string"},
+                    "tx_hash": {"$type": "string"},
+                },
+            ),
+        ]
+
+
+class CredentialView(BaseModel):
+    """Projection of Credential for the dashboard lists and public
+    verification: exactly what CredentialResponse shows, so it is loaded with a
+    Mongo projection (stamped-copy bookkeeping and the revision id stay on the
+    server) and serialized to JSON directly, without a second validation pass.
+    Keep the two in step (tests/test_credential_view.py checks)."""
+
+    id: UUID = Field(alias="_id")
+    title: str
+    description: Optional[str] = None
+    metadata_json: Optional[dict] = None
+    issued_to_id: UUID
+    issued_by_id: UUID
+    status: CredentialStatus
+    token_id: Optional[int] = None
+    tx_hash: Optional[str] = None
+    prn_number: Optional[str] = None
+    college_name: Optional[str] = None
+    college_id_hash: Optional[str] = None
+    document_uid: Optional[str] = None
+    document_path: Optional[str] = Field(None, exclude=True)
+    document_sha256: Optional[str] = None
+    document_keccak256: Optional[str] = None
+    revoked: bool = False
+    revoked_at: Optional[datetime] = None
+    # Not stored: filled in from the event indexer by the public endpoints.
+    onchain_revoked: Optional[bool] = None
+    created_at: datetime
+    updated_at: datetime
+
+    @computed_field
+    @property
+    def has_document(self) -> bool:
+        return bool(self.document_path)
+
 
 class BlacklistedToken(Document):
     token: str
@@ -72,3 +170,115 @@ class BlacklistedToken(Document):
             IndexModel([("token", ASCENDING)], unique=True),
             IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
         ]
+
+class VerifiedTransaction(Document):
+    """A mined transaction as verified from the chain. Immutable once it has
+    enough confirmations, so it is cached instead of re-fetched."""
+    tx_hash: str
+    status: int
+    to_address: Optional[str] = None
+    block_number: int
+    function_name: Optional[str] = None
+    # Decoded uploadDegree(collegeIdHash, degreeHash, degreeURI) arguments
+    college_id_hash: Optional[str] = None
+    degree_hash: Optional[str] = None
+    degree_uri: Optional[str] = None
+    verified_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "verified_transactions"
+        indexes = [
+            IndexModel([("tx_hash", ASCENDING)], unique=True),
+        ]
+
+
+class OnChainDegree(Document):
+    """A degree's on-chain state, projected from DegreeMinted / DegreeVerified /
+    DegreeRevoked / StudentWalletLinked events by the chain indexer."""
+    college_id_hash: str
+    token_id: Optional[int] = None
+    issued_by: Optional[str] = None
+    degree_hash: Optional[str] = None
+    token_uri: Optional[str] = None
+    minted_block: Optional[int] = None
+    verified: bool = False
+    revoked: bool = False
+    revoked_at: Optional[datetime] = None
+    revoked_by: Optional[str] = None
+    student_wallet: Optional[str] = None
+    # Position of the last event applied; older events are skipped so a
+    # replayed block range changes nothing.
+    last_block: int = 0
+    last_log_index: int = -1
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "onchain_degrees"
+        indexes = [
+            IndexModel([("college_id_hash", ASCENDING)], unique=True),
+            IndexModel([("token_id", ASCENDING)]),
+        ]
+
+
+class OnChainRole(Document):
+    """Whether `account` currently holds a Registry role, projected from
+    RoleGranted / RoleRevoked events by the role indexer."""
+    role: str
+    account: str
+    member: bool = False
+    changed_by: Optional[str] = None
+    last_block: int = 0
+    last_log_index: int = -1
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "onchain_roles"
+        indexes = [
+            IndexModel([("account", ASCENDING), ("role", ASCENDING)], unique=True),
+        ]
+
+
+class IndexerCheckpoint(Document):
+    """Progress of a resumable chain job: the last block the event indexer has
+    fully processed, or the last credential the reconciliation walked."""
+    name: str
+    block: int = 0
+    last_id: Optional[UUID] = None
+    processed: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "indexer_checkpoints"
+        indexes = [
+            IndexModel([("name", ASCENDING)], unique=True),
+        ]
+
+
+class ChainTxJob(Document):
+    """A Registry transaction sent from the backend wallet by the transaction
+    queue (grantRole / addUniversity for an admin's wallet)."""
+    id: UUID = Field(default_factory=uuid4)
+    action: str
+    wallet_address: str
+    requested_by_id: Optional[UUID] = None
+    subject_user_id: Optional[UUID] = None
+    status: ChainTxStatus = ChainTxStatus.QUEUED
+    nonce: Optional[int] = None
+    tx_hash: Optional[str] = None
+    max_fee_per_gas: Optional[int] = None
+    max_priority_fee_per_gas: Optional[int] = None
+    # Earlier sends at the same nonce, replaced by tx_hash; any of them may
+    # be the one that gets mined
+    replaced_tx_hashes: List[str] = Field(default_factory=list)
+    block_number: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    submitted_at: Optional[datetime] = None
+    confirmed_at: Optional[datetime] = None
+
+    class Settings:
+        name = "chain_tx_jobs"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+        ]
@@ -1,10 +1,10 @@
 import re
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class UserRole(str, Enum):
@@ -118,6 +118,9 @@ class UserResponse(BaseModel):
     is_active: bool
     is_legal_admin_verified: bool = False
     created_at: datetime
+    # Set when the request queued an on-chain transaction; poll
+    # GET /users/chain-jobs/{chain_job_id} for its progress.
+    chain_job_id: Optional[UUID] = None
 
     class Config:
         from_attributes = True
@@ -127,6 +130,35 @@ class WalletPatchRequest(BaseModel):
     wallet_address: str = Field(..., pattern=WALLET_ADDRESS_PATTERN)
 
 
+class ChainTxJobResponse(BaseModel):
+    id: UUID
+    action: str
+    wallet_address: str
+    status: str
+    nonce: Optional[int] = None
+    tx_hash: Optional[str] = None
+    block_number: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    submitted_at: Optional[datetime] = None
+    confirmed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AdminRoleStatus(BaseModel):
+    user_id: UUID
+    email: str
+    full_name: Optional[str] = None
+    college_name: Optional[str] = None
+    wallet_address: Optional[str] = None
+    # From the role cache: None until the indexer has seen a grant or
+    # revocation for the wallet.
+    has_university_role: Optional[bool] = None
+    role_block: Optional[int] = None
+
+
 # ---------------------------------------------------------------------------
 # Credential schemas
 # ---------------------------------------------------------------------------
@@ -178,10 +210,16 @@ class CredentialResponse(CredentialBase):
     tx_hash: Optional[str] = Field(None, pattern=TX_HASH_PATTERN)
     prn_number: Optional[str] = None
     college_name: Optional[str] = None
+    college_id_hash: Optional[str] = None
     document_uid: Optional[str] = None
     has_document: bool = False
+    document_sha256: Optional[str] = None
+    document_keccak256: Optional[str] = None
     revoked: bool = False
     revoked_at: Optional[datetime] = None
+    # Revocation as recorded on-chain (from the event indexer); None when the
+    # indexer has not seen this degree.
+    onchain_revoked: Optional[bool] = None
     created_at: datetime
     updated_at: datetime
 
@@ -189,6 +227,72 @@ class CredentialResponse(CredentialBase):
         from_attributes = True
 
 
+class TxVerificationRequest(BaseModel):
+    credential_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+
+
+class TxVerificationResult(BaseModel):
+    credential_id: UUID
+    tx_hash: Optional[str] = None
+    verified: bool
+    detail: Optional[str] = None
+
+
+PUBLIC_BATCH_MAX_IDENTIFIERS = 500
+
+
+class PublicBatchRequest(BaseModel):
+    prn_numbers: List[str] = Field(default_factory=list, max_length=PUBLIC_BATCH_MAX_IDENTIFIERS)
+    emails: List[str] = Field(default_factory=list, max_length=PUBLIC_BATCH_MAX_IDENTIFIERS)
+
+    @model_validator(mode="after")
+    def _bounded(self):
+        size = len(self.prn_numbers) + len(self.emails)
+        if size == 0:
+            raise ValueError("Give at least one prn_number or email")
+        if size > PUBLIC_BATCH_MAX_IDENTIFIERS:
+            raise ValueError(f"At most {PUBLIC_BATCH_MAX_IDENTIFIERS} identifiers per batch")
+        return self
+
+
+class PublicBatchResponse(BaseModel):
+    """Approved degrees per requested identifier (PRNs as given but trimmed,
+    emails lower-cased); an identifier with none maps to an empty list."""
+    by_prn: Dict[str, List[CredentialResponse]] = {}
+    by_email: Dict[str, List[CredentialResponse]] = {}
+
+
+class PublicVerification(BaseModel):
+    """What a scan of a degree's document_uid attests: the fields a verifier
+    compares against the printed PDF and the chain, and nothing else."""
+    document_uid: str
+    credential_id: UUID
+    title: str
+    prn_number: Optional[str] = None
+    college_name: Optional[str] = None
+    college_id_hash: Optional[str] = None
+    token_id: Optional[int] = None
+    tx_hash: Optional[str] = None
+    document_sha256: Optional[str] = None
+    document_keccak256: Optional[str] = None
+    revoked: bool = False
+    revoked_at: Optional[datetime] = None
+    onchain_revoked: Optional[bool] = None
+    updated_at: datetime
+
+
+class VerificationReceipt(BaseModel):
+    """HMAC-SHA256 by the server over the canonical JSON (sorted keys, no
+    whitespace) of the PublicVerification fields it accompanies."""
+    alg: str = "HMAC-SHA256"
+    key_id: str
+    signature: str
+
+
+class PublicVerificationResponse(PublicVerification):
+    receipt: VerificationReceipt
+
+
 # ---------------------------------------------------------------------------
 # Auth schemas
 # ---------------------------------------------------------------------------
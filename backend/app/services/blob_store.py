@@ -0,0 +1,112 @@
+"""Content-addressed store for uploaded PDFs.
+
+Every uploaded document (degree PDFs and admin verification documents) is
+stored once under its SHA-256:
+
+    {root}/ab/cd/abcd...ef.pdf
+
+The two-level fan-out keeps directories small on large deployments. Blobs are
+immutable, so identical uploads share one file and the stored hash doubles as
+a cache key. There is no counter to drift: a blob's references are the
+`Credential.document_path` / `User.verification_document_path` fields that
+point at it, and `release()` deletes it once none are left.
+
+Uploads are spooled into `{root}/tmp` so committing one is a rename on the
+same filesystem.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import weakref
+from pathlib import Path
+from typing import Optional, Union
+
+from app.models.models import Credential, User
+from app.services.pdf_cache import discard, prime_source_digest
+from app.services.pdf_validation import ValidatedUpload
+from app.services.storage import storage
+
+
+def _make_parent(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+
+class BlobStore:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.spool_dir = self.root / "tmp"
+        # One lock per digest so a dedupe hit can't race the release of the
+        # same blob. Weak values: locks disappear when nobody holds them.
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}.pdf"
+
+    def contains(self, path: Union[str, Path, None]) -> bool:
+        if not path:
+            return False
+        try:
+            Path(path).resolve().relative_to(self.root.resolve())
+        except ValueError:
+            return False
+        return True
+
+    def lock(self, sha256: str) -> asyncio.Lock:
+        lock = self._locks.get(sha256)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[sha256] = lock
+        return lock
+
+    async def put(self, upload: ValidatedUpload) -> Path:
+        """Store a validated upload, reusing the existing blob if identical."""
+        dest = self.path_for(upload.sha256)
+        if await storage.run("stat", dest.is_file, record=False):
+            await upload.discard()
+            return dest
+        await storage.run("mkdir", _make_parent, dest, record=False)
+        return await upload.commit(dest)
+
+    def put_file(self, source: Union[str, Path], sha256: str) -> Path:
+        """Store an existing file (used by the migration script). The source
+        is left in place; callers delete it once the records are updated."""
+        dest = self.path_for(sha256)
+        if dest.is_file():
+            return dest
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copyfile(source, tmp)
+        os.replace(tmp, dest)
+        prime_source_digest(str(dest), sha256)
+        return dest
+
+    @staticmethod
+    def digest_of(path: Union[str, Path]) -> str:
+        return Path(path).stem
+
+    async def reference_count(self, path: Union[str, Path]) -> int:
+        path = str(path)
+        return (
+            await Credential.find(Credential.document_path == path).count()
+            + await User.find(User.verification_document_path == path).count()
+        )
+
+    async def release(self, path: Optional[str]) -> bool:
+        """Delete the blob at `path` if no record references it any more.
+
+        Call after the referencing record has been updated or deleted.
+        Paths outside the store (pre-migration uploads) are left alone.
+        """
+        if not self.contains(path):
+            return False
+        async with self.lock(self.digest_of(path)):
+            if await self.reference_count(path) > 0:
+                return False
+            await storage.run("unlink", discard, path, record=False)
+            return True
@@ -0,0 +1,406 @@
+"""App-lifetime async Web3 client.
+
+Every on-chain call used to build its own `Web3(Web3.HTTPProvider(...))` and
+make blocking RPC calls inside async handlers, so approving a degree froze the
+whole worker for an RPC round trip (and opened a fresh HTTPS connection to do
+it). Instead there is one `AsyncWeb3` for the life of the app:
+
+  * one pooled aiohttp session (keep-alive, at most WEB3_POOL_SIZE sockets)
+  * every call bounded by WEB3_CALL_TIMEOUT_SECONDS (surfaced as a 504)
+  * Registry / SBT contract objects and the signer account built once
+  * `batch()` sends many JSON-RPC calls in one HTTP round trip (chunked at
+    WEB3_MAX_BATCH_SIZE calls), with a result or error per call
+
+`start()` / `close()` are called from the lifespan; the client also starts
+lazily on first use so scripts and tests that skip the lifespan still work.
+
+Where the JSON-RPC goes is a ChainBackend, picked by CHAIN_BACKEND:
+
+  * rpc    — WEB3_PROVIDER_URI over the pooled session (the default)
+  * anvil  — a local anvil / hardhat node at ANVIL_URI
+  * fake   — the in-process FakeChain (app/services/chain_fake.py), seeded
+             from CHAIN_FAKE_FIXTURES with CHAIN_FAKE_LATENCY_MS per request,
+             so approvals can be load-tested with verification turned on
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+from typing import Any, Awaitable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+import aiohttp
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from fastapi import HTTPException, status
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.contract import AsyncContract
+from web3.providers.async_base import AsyncBaseProvider
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+UNIVERSITY_ROLE = Web3.keccak(text="UNIVERSITY_ROLE")
+
+
+def compute_college_id_hash(prn_number: Optional[str], college_name: Optional[str]) -> Optional[str]:
+    """collegeIdHash = keccak256(utf8(prn_number + "-" + universityName)), the
+    key a degree is registered under on-chain; None without both parts."""
+    if not prn_number or not college_name:
+        return None
+    return "0x" + Web3.keccak(text=f"{prn_number}-{college_name}").hex().removeprefix("0x")
+
+# Only the parts of the Registry / SBT ABIs the backend calls, decodes or indexes.
+REGISTRY_ABI = [
+    {
+        "type": "function",
+        "name": "uploadDegree",
+        "inputs": [
+            {"name": "collegeIdHash", "type": "bytes32"},
+            {"name": "degreeHash", "type": "bytes32"},
+            {"name": "degreeURI", "type": "string"},
+        ],
+        "outputs": [{"name": "tokenId", "type": "uint256"}],
+        "stateMutability": "nonpayable",
+    },
+    {
+        "type": "function",
+        "name": "addUniversity",
+        "inputs": [{"name": "universityAdmin", "type": "address"}],
+        "outputs": [],
+        "stateMutability": "nonpayable",
+    },
+    {
+        "type": "function",
+        "name": "grantRole",
+        "inputs": [
+            {"name": "role", "type": "bytes32"},
+            {"name": "account", "type": "address"},
+        ],
+        "outputs": [],
+        "stateMutability": "nonpayable",
+    },
+    {
+        "type": "function",
+        "name": "hasRole",
+        "inputs": [
+            {"name": "role", "type": "bytes32"},
+            {"name": "account", "type": "address"},
+        ],
+        "outputs": [{"name": "", "type": "bool"}],
+        "stateMutability": "view",
+    },
+    {
+        "type": "function",
+        "name": "isDegreeRevoked",
+        "inputs": [{"name": "collegeIdHash", "type": "bytes32"}],
+        "outputs": [{"name": "", "type": "bool"}],
+        "stateMutability": "view",
+    },
+    {
+        "type": "function",
+        "name": "getDegree",
+        "inputs": [{"name": "collegeIdHash", "type": "bytes32"}],
+        "outputs": [
+            {"name": "exists", "type": "bool"},
+            {"name": "tokenId", "type": "uint256"},
+            {
+                "name": "record",
+                "type": "tuple",
+                "components": [
+                    {"name": "collegeIdHash", "type": "bytes32"},
+                    {"name": "issuedBy", "type": "address"},
+                    {"name": "issuedAt", "type": "uint64"},
+                    {"name": "verified", "type": "bool"},
+                    {"name": "degreeHash", "type": "bytes32"},
+                    {"name": "revoked", "type": "bool"},
+                    {"name": "revokedAt", "type": "uint64"},
+                    {"name": "revokedBy", "type": "address"},
+                ],
+            },
+            {"name": "degreeURI", "type": "string"},
+        ],
+        "stateMutability": "view",
+    },
+    {
+        "type": "event",
+        "name": "StudentWalletLinked",
+        "anonymous": False,
+        "inputs": [
+            {"name": "collegeIdHash", "type": "bytes32", "indexed": True},
+            {"name": "studentWallet", "type": "address", "indexed": True},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "RoleGranted",
+        "anonymous": False,
+        "inputs": [
+            {"name": "role", "type": "bytes32", "indexed": True},
+            {"name": "account", "type": "address", "indexed": True},
+            {"name": "sender", "type": "address", "indexed": True},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "RoleRevoked",
+        "anonymous": False,
+        "inputs": [
+            {"name": "role", "type": "bytes32", "indexed": True},
+            {"name": "account", "type": "address", "indexed": True},
+            {"name": "sender", "type": "address", "indexed": True},
+        ],
+    },
+]
+
+SBT_ABI = [
+    {
+        "type": "function",
+        "name": "tokenIdByCollegeIdHash",
+        "inputs": [{"name": "collegeIdHash", "type": "bytes32"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+        "stateMutability": "view",
+    },
+    {
+        "type": "function",
+        "name": "isRevoked",
+        "inputs": [{"name": "collegeIdHash", "type": "bytes32"}],
+        "outputs": [{"name": "revoked", "type": "bool"}],
+        "stateMutability": "view",
+    },
+    {
+        "type": "event",
+        "name": "DegreeMinted",
+        "anonymous": False,
+        "inputs": [
+            {"name": "tokenId", "type": "uint256", "indexed": True},
+            {"name": "collegeIdHash", "type": "bytes32", "indexed": True},
+            {"name": "issuedBy", "type": "address", "indexed": True},
+            {"name": "degreeHash", "type": "bytes32", "indexed": False},
+            {"name": "tokenURI", "type": "string", "indexed": False},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "DegreeVerified",
+        "anonymous": False,
+        "inputs": [
+            {"name": "tokenId", "type": "uint256", "indexed": True},
+            {"name": "verified", "type": "bool", "indexed": False},
+            {"name": "verifier", "type": "address", "indexed": True},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "DegreeRevoked",
+        "anonymous": False,
+        "inputs": [
+            {"name": "tokenId", "type": "uint256", "indexed": True},
+            {"name": "collegeIdHash", "type": "bytes32", "indexed": True},
+            {"name": "revokedBy", "type": "address", "indexed": True},
+            {"name": "revokedAt", "type": "uint64", "indexed": False},
+        ],
+    },
+]
+
+
+class RpcResult(NamedTuple):
+    result: Any = None
+    error: Optional[str] = None
+
+
+class ChainBackend(abc.ABC):
+    """Transport for a ChainClient: the provider AsyncWeb3 talks through and
+    the raw JSON-RPC `post` used for batches."""
+
+    name = "rpc"
+
+    @property
+    @abc.abstractmethod
+    def enabled(self) -> bool:
+        ...
+
+    @abc.abstractmethod
+    async def start(self, timeout: float) -> AsyncBaseProvider:
+        ...
+
+    @abc.abstractmethod
+    async def post(self, payload: Any) -> Any:
+        """Send a JSON-RPC request or batch and return the decoded body."""
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpBackend(ChainBackend):
+    def __init__(self, uri: str, pool_size: int) -> None:
+        self.uri = uri
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.uri)
+
+    async def start(self, timeout: float) -> AsyncBaseProvider:
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+        provider = AsyncHTTPProvider(self.uri)
+        await provider.cache_async_session(self._session)
+        return provider
+
+    async def post(self, payload: Any) -> Any:
+        async with self._session.post(self.uri, json=payload) as response:
+            return await response.json(content_type=None)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+
+class AnvilBackend(HttpBackend):
+    """A local development node (anvil / hardhat) at ANVIL_URI."""
+
+    name = "anvil"
+
+
+def backend_from_settings() -> ChainBackend:
+    if settings.CHAIN_BACKEND == "fake":
+        from app.services.chain_fake import FakeBackend, FakeChain
+
+        fake = FakeChain()
+        if settings.CHAIN_FAKE_FIXTURES:
+            fake.load_fixtures(settings.CHAIN_FAKE_FIXTURES)
+        return FakeBackend(fake, latency=settings.CHAIN_FAKE_LATENCY_MS / 1000)
+    if settings.CHAIN_BACKEND == "anvil":
+        return AnvilBackend(settings.ANVIL_URI, settings.WEB3_POOL_SIZE)
+    if settings.CHAIN_BACKEND != "rpc":
+        raise ValueError(f"Unknown CHAIN_BACKEND: {settings.CHAIN_BACKEND}")
+    return HttpBackend(settings.WEB3_PROVIDER_URI, settings.WEB3_POOL_SIZE)
+
+
+class ChainClient:
+    def __init__(self, backend: ChainBackend, call_timeout: float, max_batch_size: int = 100) -> None:
+        self.backend = backend
+        self.call_timeout = call_timeout
+        self.max_batch_size = max(1, max_batch_size)
+        self._w3: Optional[AsyncWeb3] = None
+        self._registry: Optional[AsyncContract] = None
+        self._sbt: Optional[AsyncContract] = None
+        self._account: Optional[LocalAccount] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend.enabled
+
+    async def start(self) -> None:
+        if self._w3 is not None or not self.enabled:
+            return
+        self._w3 = AsyncWeb3(await self.backend.start(self.call_timeout))
+        logger.info("Web3 client ready (backend=%s, timeout=%.1fs)", self.backend.name, self.call_timeout)
+
+    async def close(self) -> None:
+        await self.backend.close()
+        self._w3 = None
+        self._registry = self._sbt = None
+
+    async def w3(self) -> AsyncWeb3:
+        await self.start()
+        if self._w3 is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Blockchain provider is not configured",
+            )
+        return self._w3
+
+    async def registry(self) -> AsyncContract:
+        if self._registry is None:
+            w3 = await self.w3()
+            address = settings.CONTRACT_REGISTRY_ADDRESS
+            self._registry = w3.eth.contract(
+                address=Web3.to_checksum_address(address) if address else None,
+                abi=REGISTRY_ABI,
+            )
+        return self._registry
+
+    async def sbt(self) -> AsyncContract:
+        if self._sbt is None:
+            w3 = await self.w3()
+            self._sbt = w3.eth.contract(
+                address=Web3.to_checksum_address(settings.CONTRACT_SBT_ADDRESS),
+                abi=SBT_ABI,
+            )
+        return self._sbt
+
+    @property
+    def account(self) -> LocalAccount:
+        if self._account is None:
+            self._account = Account.from_key(settings.PRIVATE_KEY)
+        return self._account
+
+    async def call(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Await one RPC call under the per-call timeout."""
+        try:
+            return await asyncio.wait_for(awaitable, timeout or self.call_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Blockchain provider timed out",
+            )
+
+    async def batch(self, calls: Sequence[Tuple[str, list]]) -> List[RpcResult]:
+        """Send raw JSON-RPC `(method, params)` calls as batch requests.
+
+        Results come back undecoded (hex strings / dicts as the node sent
+        them), one RpcResult per call and in order. Unlike web3's own
+        batching, one failing call doesn't fail its neighbours.
+        """
+        await self.w3()
+        chunks = [calls[i:i + self.max_batch_size] for i in range(0, len(calls), self.max_batch_size)]
+        answered = await asyncio.gather(*(self.call(self._post_batch(chunk)) for chunk in chunks))
+        return [result for chunk in answered for result in chunk]
+
+    async def _post_batch(self, calls: Sequence[Tuple[str, list]]) -> List[RpcResult]:
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        body = await self.backend.post(payload)
+        if not isinstance(body, list):
+            # Providers answer a rejected batch with a single error object.
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Blockchain provider rejected batch request: {body.get('error') if isinstance(body, dict) else body}",
+            )
+        by_id = {item.get("id"): item for item in body}
+        results = []
+        for i in range(len(calls)):
+            item = by_id.get(i)
+            if item is None:
+                results.append(RpcResult(error="no response from provider"))
+            elif item.get("error") is not None:
+                error = item["error"]
+                results.append(RpcResult(error=error.get("message") if isinstance(error, dict) else str(error)))
+            else:
+                results.append(RpcResult(result=item.get("result")))
+        return results
+
+    async def is_connected(self) -> bool:
+        try:
+            return await self.call((await self.w3()).is_connected())
+        except HTTPException:
+            return False
+
+
+chain = ChainClient(
+    backend=backend_from_settings(),
+    call_timeout=settings.WEB3_CALL_TIMEOUT_SECONDS,
+    max_batch_size=settings.WEB3_MAX_BATCH_SIZE,
+)
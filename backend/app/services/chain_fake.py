@@ -0,0 +1,360 @@
+"""In-process, deterministic stand-in for the Registry / SBT chain.
+
+`FakeChain` answers the JSON-RPC methods the backend uses from plain Python
+state: mined uploadDegree transactions (`add_upload_degree`), degree records
+for getDegree (`set_degree`), event logs for the indexers (`emit`), UNIVERSITY_ROLE
+membership for hasRole, and the sending side of the transaction queue (nonce,
+EIP-1559 fees, eth_sendRawTransaction, mined immediately unless `auto_mine`
+is off). Transaction hashes are sequential, so two runs with the same inputs
+see the same chain. State can be saved to and replayed from a JSON fixture
+file (`dump_fixtures` / `load_fixtures`) so a load test can run against canned
+receipts.
+
+`FakeBackend` plugs it into ChainClient (CHAIN_BACKEND=fake) with no sockets
+at all; `latency` is added to every request to model a remote provider.
+The test suite's RpcStub serves the same FakeChain over HTTP.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from eth_abi import encode
+from eth_account.typed_transactions import TypedTransaction
+from eth_utils.abi import get_abi_output_types
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from app.services.chain import REGISTRY_ABI, SBT_ABI, UNIVERSITY_ROLE, ChainBackend
+
+_REGISTRY = Web3().eth.contract(abi=REGISTRY_ABI)
+_EVENTS = {
+    entry["name"]: entry
+    for entry in REGISTRY_ABI + SBT_ABI
+    if entry["type"] == "event"
+}
+SENDER = "0x" + "aa" * 20
+CHAIN_ID = "0xaa36a7"
+
+
+def _hex(n: int) -> str:
+    return hex(n)
+
+
+class FakeChain:
+    def __init__(self) -> None:
+        self.rpc_calls = 0
+        self.methods: List[str] = []
+        self.block_number = 100
+        self.receipts: Dict[str, dict] = {}
+        self.transactions: Dict[str, dict] = {}
+        self.logs: List[dict] = []
+        self.degrees: Dict[bytes, dict] = {}
+        # (role, account) pairs, both lower-case hex
+        self.roles: Set[Tuple[str, str]] = set()
+        self.sent: List[dict] = []
+        # Next nonce of the (single) sending account, counting pending
+        # transactions; mined_nonce counts only mined ones ("latest")
+        self.nonce = 0
+        self.mined_nonce = 0
+        self.auto_mine = True
+        self.reject_sends = 0
+
+    # ---- Seeding ----
+
+    def add_upload_degree(
+        self,
+        college_id_hash: str,
+        *,
+        to: str,
+        status: int = 1,
+        degree_hash: bytes = b"\x22" * 32,
+        block_number: Optional[int] = None,
+    ) -> str:
+        """Record a mined uploadDegree transaction and return its hash."""
+        index = len(self.transactions) + 1
+        tx_hash = "0x" + f"{index:064x}"
+        block = block_number if block_number is not None else self.block_number - 20
+        data = _REGISTRY.functions.uploadDegree(
+            bytes.fromhex(college_id_hash[2:]), degree_hash, f"ipfs://degree/{index}"
+        )._encode_transaction_data()
+        block_hash = "0x" + f"{block:064x}"
+        common = {
+            "blockHash": block_hash,
+            "blockNumber": _hex(block),
+            "transactionIndex": "0x0",
+            "from": SENDER,
+            "to": to,
+        }
+        self.transactions[tx_hash] = {
+            **common,
+            "hash": tx_hash,
+            "input": data,
+            "nonce": _hex(index),
+            "gas": _hex(300000),
+            "gasPrice": _hex(10**9),
+            "value": "0x0",
+            "type": "0x0",
+            "chainId": CHAIN_ID,
+            "v": "0x1b",
+            "r": "0x" + "01" * 32,
+            "s": "0x" + "02" * 32,
+        }
+        self.receipts[tx_hash] = {
+            **common,
+            "transactionHash": tx_hash,
+            "status": _hex(status),
+            "gasUsed": _hex(150000),
+            "cumulativeGasUsed": _hex(150000),
+            "effectiveGasPrice": _hex(10**9),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "type": "0x0",
+        }
+        return tx_hash
+
+    def emit(self, address: str, event: str, block: int, **args) -> dict:
+        """Record a log for `event` (a Registry or SBT event) at `block`."""
+        abi = _EVENTS[event]
+        topic0 = Web3.keccak(text=f"{event}({','.join(i['type'] for i in abi['inputs'])})").hex()
+        topics = ["0x" + topic0.removeprefix("0x")]
+        data_types, data_values = [], []
+        for arg in abi["inputs"]:
+            if arg["indexed"]:
+                topics.append("0x" + encode([arg["type"]], [args[arg["name"]]]).hex())
+            else:
+                data_types.append(arg["type"])
+                data_values.append(args[arg["name"]])
+        log = {
+            "address": address,
+            "topics": topics,
+            "data": "0x" + encode(data_types, data_values).hex(),
+            "blockNumber": _hex(block),
+            "blockHash": "0x" + f"{block:064x}",
+            "transactionHash": "0x" + f"{len(self.logs) + 1:064x}",
+            "transactionIndex": "0x0",
+            "logIndex": _hex(sum(1 for entry in self.logs if entry["blockNumber"] == _hex(block))),
+            "removed": False,
+        }
+        self.logs.append(log)
+        return log
+
+    def set_degree(self, college_id_hash: str, token_id: int, revoked: bool = False, revoked_at: int = 0) -> None:
+        """Record the on-chain degree getDegree() reports for a collegeIdHash."""
+        self.degrees[bytes.fromhex(college_id_hash[2:])] = {
+            "token_id": token_id,
+            "revoked": revoked,
+            "revoked_at": revoked_at,
+        }
+
+    def mine(self, tx_hash: str, status: int = 1) -> None:
+        """Mine a sent transaction: store its receipt and apply (and log) role grants."""
+        tx = next(t for t in self.sent if t["hash"] == tx_hash)
+        self.mined_nonce = max(self.mined_nonce, tx["nonce"] + 1)
+        func, args = _REGISTRY.decode_function_input("0x" + bytes(tx["data"]).hex())
+        if status == 1 and func.fn_name in ("grantRole", "addUniversity"):
+            account = args.get("account") or args.get("universityAdmin")
+            self.roles.add(("0x" + UNIVERSITY_ROLE.hex().removeprefix("0x"), account.lower()))
+            self.emit(
+                "0x" + bytes(tx["to"]).hex(), "RoleGranted", self.block_number,
+                role=UNIVERSITY_ROLE, account=account, sender=SENDER,
+            )
+        self.receipts[tx_hash] = {
+            "blockHash": "0x" + f"{self.block_number:064x}",
+            "blockNumber": _hex(self.block_number),
+            "transactionIndex": "0x0",
+            "from": SENDER,
+            "to": "0x" + bytes(tx["to"]).hex(),
+            "transactionHash": tx_hash,
+            "status": _hex(status),
+            "gasUsed": _hex(50000),
+            "cumulativeGasUsed": _hex(50000),
+            "effectiveGasPrice": _hex(10**9),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "type": "0x2",
+        }
+
+    # ---- Fixtures ----
+
+    def dump_fixtures(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({
+                "block_number": self.block_number,
+                "receipts": self.receipts,
+                "transactions": self.transactions,
+                "logs": self.logs,
+                "degrees": {"0x" + key.hex(): degree for key, degree in self.degrees.items()},
+            }, f)
+
+    def load_fixtures(self, path: str) -> None:
+        with open(path) as f:
+            data = json.load(f)
+        self.block_number = data.get("block_number", self.block_number)
+        self.receipts.update(data.get("receipts", {}))
+        self.transactions.update(data.get("transactions", {}))
+        self.logs.extend(data.get("logs", []))
+        for key, degree in data.get("degrees", {}).items():
+            self.degrees[bytes.fromhex(key[2:])] = degree
+
+    # ---- JSON-RPC ----
+
+    def _eth_call(self, call: dict) -> str:
+        func, args = _REGISTRY.decode_function_input(call["data"])
+        if func.fn_name == "hasRole":
+            member = ("0x" + args["role"].hex(), args["account"].lower()) in self.roles
+            return "0x" + encode(["bool"], [member]).hex()
+        if func.fn_name != "getDegree":
+            raise ValueError(f"{func.fn_name} not supported")
+        key = args["collegeIdHash"]
+        degree = self.degrees.get(key)
+        if degree is None:
+            values = [False, 0, (b"\x00" * 32, "0x" + "00" * 20, 0, False, b"\x00" * 32, False, 0, "0x" + "00" * 20), ""]
+        else:
+            record = (
+                key, SENDER, 1_600_000_000, not degree["revoked"], b"\x22" * 32,
+                degree["revoked"], degree["revoked_at"], SENDER if degree["revoked"] else "0x" + "00" * 20,
+            )
+            values = [True, degree["token_id"], record, f"ipfs://degree/{degree['token_id']}"]
+        abi = _REGISTRY.get_function_by_name("getDegree").abi
+        return "0x" + encode(get_abi_output_types(abi), values).hex()
+
+    def _send_raw_transaction(self, raw: str) -> str:
+        if self.reject_sends:
+            self.reject_sends -= 1
+            raise ValueError("nonce too low")
+        tx = dict(TypedTransaction.from_bytes(HexBytes(raw)).as_dict())
+        tx_hash = "0x" + Web3.keccak(hexstr=raw).hex().removeprefix("0x")
+        if tx["nonce"] < self.mined_nonce:
+            raise ValueError("nonce too low")
+        for pending in self.sent:
+            if pending["nonce"] == tx["nonce"] and pending["hash"] not in self.receipts and not (
+                tx["maxFeePerGas"] * 10 >= pending["maxFeePerGas"] * 11
+                and tx["maxPriorityFeePerGas"] * 10 >= pending["maxPriorityFeePerGas"] * 11
+            ):
+                # Like geth: replacing a pending transaction takes +10% fees.
+                raise ValueError("replacement transaction underpriced")
+        self.nonce = max(self.nonce, tx["nonce"] + 1)
+        self.sent.append({**tx, "hash": tx_hash})
+        if self.auto_mine:
+            self.mine(tx_hash)
+        return tx_hash
+
+    def _block(self) -> dict:
+        return {
+            "number": _hex(self.block_number),
+            "hash": "0x" + f"{self.block_number:064x}",
+            "parentHash": "0x" + f"{self.block_number - 1:064x}",
+            "timestamp": _hex(1_700_000_000 + self.block_number * 12),
+            "baseFeePerGas": _hex(10**9),
+            "gasLimit": _hex(30_000_000),
+            "gasUsed": "0x0",
+            "miner": SENDER,
+            "difficulty": "0x0",
+            "extraData": "0x",
+            "logsBloom": "0x" + "00" * 256,
+            "nonce": "0x0000000000000000",
+            "sha3Uncles": "0x" + "00" * 32,
+            "stateRoot": "0x" + "00" * 32,
+            "receiptsRoot": "0x" + "00" * 32,
+            "transactionsRoot": "0x" + "00" * 32,
+            "size": "0x0",
+            "transactions": [],
+            "uncles": [],
+        }
+
+    def _get_logs(self, query: dict) -> List[dict]:
+        from_block = int(query.get("fromBlock", "0x0"), 16)
+        to_block = int(query.get("toBlock", _hex(self.block_number)), 16)
+        addresses = query.get("address") or []
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {a.lower() for a in addresses}
+        topic0 = (query.get("topics") or [None])[0]
+        if isinstance(topic0, str):
+            topic0 = [topic0]
+        return [
+            log for log in self.logs
+            if from_block <= int(log["blockNumber"], 16) <= to_block
+            and (not addresses or log["address"].lower() in addresses)
+            and (not topic0 or log["topics"][0] in topic0)
+        ]
+
+    def _answer(self, call: dict) -> dict:
+        self.rpc_calls += 1
+        method, params = call.get("method"), call.get("params") or []
+        self.methods.append(method)
+        if method == "eth_getTransactionReceipt":
+            result = self.receipts.get(params[0])
+        elif method == "eth_getTransactionByHash":
+            result = self.transactions.get(params[0])
+        elif method == "eth_call":
+            result = self._eth_call(params[0])
+        elif method == "eth_getTransactionCount":
+            result = _hex(self.mined_nonce if params[1:] == ["latest"] else self.nonce)
+        elif method == "eth_maxPriorityFeePerGas":
+            result = _hex(10**8)
+        elif method == "eth_getBlockByNumber":
+            result = self._block()
+        elif method == "eth_sendRawTransaction":
+            try:
+                result = self._send_raw_transaction(params[0])
+            except ValueError as exc:
+                return {"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": -32000, "message": str(exc)}}
+        elif method == "eth_getLogs":
+            result = self._get_logs(params[0])
+        elif method == "eth_chainId":
+            result = CHAIN_ID
+        elif method == "eth_blockNumber":
+            result = _hex(self.block_number)
+        elif method == "web3_clientVersion":
+            result = "altrium-fake-chain"
+        else:
+            return {"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": -32601, "message": f"{method} not supported"}}
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+
+    def answer(self, body: Any) -> Any:
+        """Answer a decoded JSON-RPC request or batch."""
+        if isinstance(body, list):
+            return [self._answer(call) for call in body]
+        return self._answer(body)
+
+
+class _FakeProvider(AsyncJSONBaseProvider):
+    def __init__(self, backend: "FakeBackend") -> None:
+        super().__init__()
+        self.backend = backend
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        # Round-trip through JSON so the fake sees exactly what a node would.
+        request = json.loads(self.encode_rpc_request(method, params))
+        return await self.backend.post(request)
+
+
+class FakeBackend(ChainBackend):
+    name = "fake"
+
+    def __init__(self, fake: Optional[FakeChain] = None, latency: float = 0.0) -> None:
+        self.fake = fake or FakeChain()
+        self.latency = latency
+        self.requests = 0
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    async def start(self, timeout: float) -> AsyncJSONBaseProvider:
+        return _FakeProvider(self)
+
+    async def post(self, payload: Any) -> Any:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # Serialise the answer too: callers get fresh objects, as off the wire.
+        return json.loads(json.dumps(self.fake.answer(payload)))
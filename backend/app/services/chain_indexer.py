@@ -0,0 +1,260 @@
+"""Background indexer for degree events.
+
+`AltriumDegreeSBT` / `AltriumRegistry` emit DegreeMinted, DegreeVerified,
+DegreeRevoked and StudentWalletLinked; this pulls them with `eth_getLogs` in
+INDEXER_BLOCK_RANGE chunks and folds them into the `onchain_degrees`
+projection (one document per collegeIdHash), so reading a degree's on-chain
+revocation is a Mongo lookup rather than an RPC call.
+
+  * Progress is an IndexerCheckpoint, saved after every chunk; a restart
+    resumes from it (first run starts at INDEXER_START_BLOCK).
+  * Only blocks INDEXER_CONFIRMATIONS below the head are indexed, so a reorg
+    shallower than that never reaches the projection.
+  * Every projection remembers the (block, logIndex) of the last event it
+    applied and ignores older ones, so re-processing a chunk after a crash
+    between writing projections and saving the checkpoint is harmless.
+
+Run one indexer per deployment (INDEXER_ENABLED=false on the other workers).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from web3 import Web3
+from web3.contract import AsyncContract
+
+from app.core.config import settings
+from app.models.models import Credential, IndexerCheckpoint, OnChainDegree
+from app.services.chain import ChainClient, chain
+from app.services.public_cache import public_lookup_cache
+
+logger = logging.getLogger(__name__)
+
+SBT_EVENTS = ("DegreeMinted", "DegreeVerified", "DegreeRevoked")
+REGISTRY_EVENTS = ("StudentWalletLinked",)
+
+
+def _hex32(value: bytes) -> str:
+    return "0x" + bytes(value).hex()
+
+
+class ChainIndexer:
+    name = "degree_events"
+
+    def __init__(
+        self,
+        client: ChainClient,
+        start_block: int,
+        block_range: int,
+        confirmations: int,
+        poll_seconds: float,
+    ) -> None:
+        self.client = client
+        self.start_block = start_block
+        self.block_range = max(1, block_range)
+        self.confirmations = confirmations
+        self.poll_seconds = poll_seconds
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._events: Optional[Dict[str, Any]] = None
+        self.last_block: Optional[int] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.applied = 0
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            settings.INDEXER_ENABLED
+            and self.client.enabled
+            and bool(settings.CONTRACT_SBT_ADDRESS)
+            and bool(settings.CONTRACT_REGISTRY_ADDRESS)
+        )
+
+    async def _event_types(self) -> Dict[str, Any]:
+        """topic0 -> contract event, for every event the projection uses."""
+        if self._events is None:
+            events: Dict[str, Any] = {}
+            contracts: Tuple[Tuple[AsyncContract, Tuple[str, ...]], ...] = (
+                (await self.client.sbt(), SBT_EVENTS),
+                (await self.client.registry(), REGISTRY_EVENTS),
+            )
+            for contract, names in contracts:
+                for name in names:
+                    event = contract.events[name]()
+                    events[event.topic] = event
+            self._events = events
+        return self._events
+
+    def _addresses(self) -> List[str]:
+        return [
+            Web3.to_checksum_address(settings.CONTRACT_SBT_ADDRESS),
+            Web3.to_checksum_address(settings.CONTRACT_REGISTRY_ADDRESS),
+        ]
+
+    # ---- Checkpoint ----
+
+    async def checkpoint(self) -> Optional[int]:
+        record = await IndexerCheckpoint.find_one(IndexerCheckpoint.name == self.name)
+        return record.block if record else None
+
+    async def _save_checkpoint(self, block: int) -> None:
+        record = await IndexerCheckpoint.find_one(IndexerCheckpoint.name == self.name)
+        if record is None:
+            record = IndexerCheckpoint(name=self.name, block=block)
+        record.block = block
+        record.updated_at = datetime.utcnow()
+        await record.save()
+        self.last_block = block
+
+    # ---- Indexing ----
+
+    async def run_once(self) -> int:
+        """Index every confirmed block past the checkpoint. Returns the number
+        of events applied."""
+        w3 = await self.client.w3()
+        head = await self.client.call(w3.eth.block_number)
+        safe_head = head - self.confirmations
+        checkpoint = await self.checkpoint()
+        next_block = self.start_block if checkpoint is None else checkpoint + 1
+
+        applied = 0
+        while next_block <= safe_head:
+            to_block = min(next_block + self.block_range - 1, safe_head)
+            applied += await self._index_range(next_block, to_block)
+            await self._save_checkpoint(to_block)
+            next_block = to_block + 1
+        self.last_run_at = datetime.utcnow()
+        self.applied += applied
+        return applied
+
+    async def _index_range(self, from_block: int, to_block: int) -> int:
+        w3 = await self.client.w3()
+        events = await self._event_types()
+        logs = await self.client.call(w3.eth.get_logs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": self._addresses(),
+            "topics": [list(events)],
+        }))
+        applied = 0
+        for log in sorted(logs, key=lambda entry: (entry["blockNumber"], entry["logIndex"])):
+            event = events.get(Web3.to_hex(log["topics"][0]))
+            if event is None:
+                continue
+            decoded = event.process_log(log)
+            if await self._apply(decoded["event"], decoded["args"], log["blockNumber"], log["logIndex"]):
+                applied += 1
+        return applied
+
+    async def _apply(self, name: str, args: Any, block: int, log_index: int) -> bool:
+        if name == "DegreeVerified":
+            record = await OnChainDegree.find_one(OnChainDegree.token_id == args["tokenId"])
+            if record is None:
+                logger.warning("DegreeVerified for unknown token %s at block %d", args["tokenId"], block)
+                return False
+        else:
+            college_id_hash = _hex32(args["collegeIdHash"])
+            record = await OnChainDegree.find_one(OnChainDegree.college_id_hash == college_id_hash)
+            if record is None:
+                record = OnChainDegree(college_id_hash=college_id_hash)
+
+        if (block, log_index) <= (record.last_block, record.last_log_index):
+            return False
+
+        if name == "DegreeMinted":
+            # A re-mint after a burn starts a fresh record for the same hash.
+            record.token_id = args["tokenId"]
+            record.issued_by = args["issuedBy"]
+            record.degree_hash = _hex32(args["degreeHash"])
+            record.token_uri = args["tokenURI"]
+            record.minted_block = block
+            record.verified = False
+            record.revoked = False
+            record.revoked_at = None
+            record.revoked_by = None
+        elif name == "DegreeVerified":
+            record.verified = args["verified"]
+        elif name == "DegreeRevoked":
+            record.token_id = args["tokenId"]
+            record.verified = False
+            record.revoked = True
+            record.revoked_at = datetime.utcfromtimestamp(args["revokedAt"])
+            record.revoked_by = args["revokedBy"]
+        elif name == "StudentWalletLinked":
+            record.student_wallet = args["studentWallet"]
+
+        record.last_block = block
+        record.last_log_index = log_index
+        record.updated_at = datetime.utcnow()
+        try:
+            await record.save()
+        except DuplicateKeyError:
+            # Another indexer inserted the same collegeIdHash; it will apply
+            # this event too.
+            return False
+        if name in ("DegreeMinted", "DegreeRevoked"):
+            # Public lookups show the on-chain revocation state.
+            await public_lookup_cache.invalidate_credentials(
+                await Credential.find(Credential.college_id_hash == record.college_id_hash).to_list()
+            )
+        return True
+
+    # ---- Background loop ----
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                applied = await self.run_once()
+                self.last_error = None
+                if applied:
+                    logger.info("Chain indexer %s applied %d event(s) up to block %s", self.name, applied, self.last_block)
+            except asyncio.CancelledError:
+                raise
+            except HTTPException as exc:
+                self.last_error = str(exc.detail)
+                logger.warning("Chain indexer %s: %s", self.name, exc.detail)
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.exception("Chain indexer %s run failed", self.name)
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(
+                "Chain indexer %s started (confirmations=%d, range=%d)",
+                self.name, self.confirmations, self.block_range,
+            )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "last_block": self.last_block,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "events_applied": self.applied,
+            "last_error": self.last_error,
+        }
+
+
+chain_indexer = ChainIndexer(
+    client=chain,
+    start_block=settings.INDEXER_START_BLOCK,
+    block_range=settings.INDEXER_BLOCK_RANGE,
+    confirmations=settings.INDEXER_CONFIRMATIONS,
+    poll_seconds=settings.INDEXER_POLL_SECONDS,
+)
@@ -1,38 +1,195 @@
+import asyncio
+import collections
+import csv
+import functools
 import io
+import logging
 import os
 import shutil
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Tuple
 from uuid import UUID
 
+from beanie.exceptions import RevisionIdWasChanged
+from beanie.odm.queries.find import FindMany
+from beanie.operators import In
 from fastapi import HTTPException, UploadFile, status
-from pypdf import PdfReader, PdfWriter
-from reportlab.pdfgen import canvas
-import qrcode
+from pymongo.errors import DuplicateKeyError
 
 from app.crud.crud import CredentialCRUD
-from app.models.models import Credential, User, UserRole
-from app.schemas.schemas import CredentialCreate, CredentialStatus, CredentialUpdate
+from app.models.models import Credential, CredentialView, OnChainDegree, User, UserRole, VerifiedTransaction
+from app.schemas.schemas import (
+    CredentialCreate,
+    CredentialStatus,
+    CredentialUpdate,
+    PublicVerification,
+    TxVerificationResult,
+)
+from app.services.blob_store import BlobStore
+from app.services.chain import chain, compute_college_id_hash
+from app.services.pdf_cache import StampedPdfCache, discard, source_digest
+from app.services.pdf_render import render_footer_pdf
 from app.services.pdf_validation import validate_pdf_upload
-from web3 import Web3
+from app.services.public_cache import public_lookup_cache
+from app.services.render_pool import render_pool
+from app.services.tx_cache import verified_tx_cache
 from app.core.config import settings
+from app.core.http_cache import Validator, weak_etag
+from app.core.security import receipt_key_id, sign_receipt
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.zip_stream import ZipStream, safe_arcname
+
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "/app/uploads"))
 
-# Registry ABI for decoding uploadDegree call
-REGISTRY_ABI = [
-    {
-        "type": "function",
-        "name": "uploadDegree",
-        "inputs": [
-            {"name": "collegeIdHash", "type": "bytes32"},
-            {"name": "degreeHash", "type": "bytes32"},
-            {"name": "degreeURI", "type": "string"},
-        ],
-        "outputs": [{"name": "tokenId", "type": "uint256"}],
-        "stateMutability": "nonpayable",
-    }
-]
+document_store = BlobStore(UPLOAD_DIR / "blobs")
+
+stamped_pdf_cache = StampedPdfCache(
+    UPLOAD_DIR / "stamped_cache",
+    max_bytes=settings.STAMPED_PDF_CACHE_MAX_BYTES,
+)
+
+def _hex32(value) -> str:
+    return "0x" + bytes(value).hex()
+
+
+def _expected_college_id_hash(credential: Credential) -> str:
+    # Stored at create; computed for rows written before the field existed.
+    return credential.college_id_hash or compute_college_id_hash(credential.prn_number, credential.college_name)
+
+
+def _range_validator(scope: tuple, rows: List[dict], onchain: Optional[List[dict]] = None) -> Validator:
+    """Weak validator of a listing from the raw (_id, updated_at) rows it
+    reads: their count, newest updated_at and ids (so a row swapped for an
+    older one is noticed too), plus any on-chain records shown with them."""
+    onchain = onchain or []
+    stamps = [row.get("updated_at") for row in (*rows, *onchain)]
+    last_modified = max((stamp for stamp in stamps if stamp is not None), default=None)
+    etag = weak_etag(*scope, len(rows), [row["_id"] for row in rows], len(onchain), last_modified)
+    return Validator(etag, last_modified)
+
+
+class TxLookup(NamedTuple):
+    record: Optional[VerifiedTransaction]
+    error: Optional[str]
+
+
+async def _save_update(credential_id: UUID, credential_update: CredentialUpdate) -> Credential:
+    try:
+        return await CredentialCRUD.update(credential_id, credential_update)
+    except (DuplicateKeyError, RevisionIdWasChanged):
+        # college_id_hash is unique among credentials with a tx_hash; Beanie's
+        # save() reports that duplicate key as RevisionIdWasChanged.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another credential is already registered on-chain for this PRN and college",
+        )
+
+
+def _tx_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Blockchain transaction failed or not found."
+    )
+
+
+async def _load_transactions(tx_hashes: List[str], use_cache: bool = True) -> Dict[str, TxLookup]:
+    """Verification facts for each of `tx_hashes`, keyed by lower-cased hash.
+
+    Cached transactions are answered from the cache. For the rest, the
+    receipt (to check success), the transaction (to decode) and the chain
+    head (to count confirmations) all go out as one JSON-RPC batch, so a
+    single verification is one round trip and a back-fill of hundreds of
+    hashes is a handful. Records with enough confirmations are cached.
+    """
+    found = await verified_tx_cache.get_many(tx_hashes) if use_cache else {}
+    results = {key: TxLookup(record, None) for key, record in found.items()}
+    pending = sorted({h.lower() for h in tx_hashes} - found.keys())
+    if not pending:
+        return results
+
+    calls: List[Tuple[str, list]] = [("eth_blockNumber", [])]
+    for tx_hash in pending:
+        calls.append(("eth_getTransactionReceipt", [tx_hash]))
+        calls.append(("eth_getTransactionByHash", [tx_hash]))
+    answers = await chain.batch(calls)
+    if answers[0].error is not None:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Error reading chain head: {answers[0].error}"
+        )
+    head = int(answers[0].result, 16)
+    contract = await chain.registry()
+
+    for i, tx_hash in enumerate(pending):
+        receipt, tx = answers[1 + 2 * i], answers[2 + 2 * i]
+        error = receipt.error or tx.error
+        if error is not None:
+            results[tx_hash] = TxLookup(None, f"Error verifying blockchain transaction: {error}")
+            continue
+        if receipt.result is None or tx.result is None:
+            results[tx_hash] = TxLookup(None, _tx_not_found().detail)
+            continue
+
+        block_number = int(receipt.result["blockNumber"], 16)
+        record = VerifiedTransaction(
+            tx_hash=tx_hash,
+            status=int(receipt.result["status"], 16),
+            to_address=receipt.result.get("to"),
+            block_number=block_number,
+        )
+        try:
+            func_obj, func_params = contract.decode_function_input(tx.result["input"])
+        except ValueError:
+            func_obj = None
+        if func_obj is not None:
+            record.function_name = func_obj.fn_name
+            if func_obj.fn_name == "uploadDegree":
+                record.college_id_hash = _hex32(func_params["collegeIdHash"])
+                record.degree_hash = _hex32(func_params["degreeHash"])
+                record.degree_uri = func_params["degreeURI"]
+
+        if use_cache and head - block_number + 1 >= settings.TX_CACHE_MIN_CONFIRMATIONS:
+            await verified_tx_cache.put(record)
+        results[tx_hash] = TxLookup(record, None)
+    return results
+
+
+async def _load_transaction(tx_hash: str) -> VerifiedTransaction:
+    lookup = (await _load_transactions([tx_hash]))[tx_hash.lower()]
+    if lookup.error is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=lookup.error)
+    return lookup.record
+
+
+def _check_upload_degree(tx: VerifiedTransaction, expected_college_id_hash: str) -> None:
+    """Raise a 400 unless `tx` is a successful uploadDegree call on the
+    Registry for `expected_college_id_hash`."""
+    # 1. Check success
+    if tx.status != 1:
+        raise _tx_not_found()
+
+    # 2. Verify target contract
+    if (tx.to_address or "").lower() != settings.CONTRACT_REGISTRY_ADDRESS.lower():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Transaction target mismatch. Expected {settings.CONTRACT_REGISTRY_ADDRESS}, got {tx.to_address}"
+        )
+
+    # 3. Verify function call and arguments
+    if tx.function_name != "uploadDegree":
+         raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid contract function called: {tx.function_name}"
+        )
+
+    if tx.college_id_hash.lower() != expected_college_id_hash.lower():
+         raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"College ID Hash mismatch. Expected {expected_college_id_hash}, got {tx.college_id_hash}"
+        )
 
 
 async def _verify_blockchain_transaction(tx_hash: str, expected_college_id_hash: str) -> bool:
@@ -42,51 +199,15 @@ async def _verify_blockchain_transaction(tx_hash: str, expected_college_id_hash:
     2. Was sent to the correct Registry contract.
     3. Calls uploadDegree with the correct collegeIdHash.
     """
-    if not settings.WEB3_PROVIDER_URI:
+    if not chain.enabled:
         # If no provider is configured, we can't verify. 
         # In a real system we might want to fail hard, but for now we'll allow it if 
         # the environment isn't set up.
         print("WEB3_PROVIDER_URI not set, skipping blockchain verification.")
         return True
 
-    w3 = Web3(Web3.HTTPProvider(settings.WEB3_PROVIDER_URI))
-    
     try:
-        # 1. Fetch receipt to check success
-        receipt = w3.eth.get_transaction_receipt(tx_hash)
-        if receipt is None or receipt.status != 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Blockchain transaction failed or not found."
-            )
-
-        # 2. Verify target contract
-        if receipt.to.lower() != settings.CONTRACT_REGISTRY_ADDRESS.lower():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Transaction target mismatch. Expected {settings.CONTRACT_REGISTRY_ADDRESS}, got {receipt.to}"
-            )
-
-        # 3. Verify function call and arguments
-        tx = w3.eth.get_transaction(tx_hash)
-        contract = w3.eth.contract(abi=REGISTRY_ABI)
-        
-        # Decode the function call
-        func_obj, func_params = contract.decode_function_input(tx.input)
-        
-        if func_obj.fn_name != "uploadDegree":
-             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid contract function called: {func_obj.fn_name}"
-            )
-            
-        actual_college_id_hash = "0x" + func_params["collegeIdHash"].hex()
-        if actual_college_id_hash.lower() != expected_college_id_hash.lower():
-             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"College ID Hash mismatch. Expected {expected_college_id_hash}, got {actual_college_id_hash}"
-            )
-
+        _check_upload_degree(await _load_transaction(tx_hash), expected_college_id_hash)
         return True
         
     except HTTPException:
@@ -98,67 +219,62 @@ async def _verify_blockchain_transaction(tx_hash: str, expected_college_id_hash:
         )
 
 
+class DocumentFile(NamedTuple):
+    path: str
+    etag: str
 
-def _ensure_upload_dir() -> None:
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+class StampedDocument(NamedTuple):
+    credential: Credential
+    cache_key: str
 
-def _create_footer_overlay(page_width: float, page_height: float, tx_hash: str = None, document_uid: str = None):
-    packet = io.BytesIO()
-    c = canvas.Canvas(packet, pagesize=(page_width, page_height))
-    
-    # Text info on the left
-    c.setFont("Helvetica", 8)
-    c.setFillColorRGB(0.3, 0.3, 0.3)
-    x_text = 30
-    y_text = 20
-    
-    if tx_hash:
-        qr = qrcode.QRCode(version=1, box_size=2, border=0)
-        qr.add_data(f"https://sepolia.etherscan.io/tx/{tx_hash}")
-        qr.make(fit=True)
-        
-        qr_matrix = qr.get_matrix()
-        qr_size = len(qr_matrix)
-        box_size = 1.8 # Small boxes
-
-        footer_text = f"Blockchain Verified: {tx_hash[:10]}...{tx_hash[-10:]}"
-        # Add a link annotation for the text
-        c.linkURL(f"https://sepolia.etherscan.io/tx/{tx_hash}", (x_text, y_text - 2, x_text + 250, y_text + 10), relative=0)
-        c.drawString(x_text, y_text, footer_text)
-    
-        qr_x_start = page_width - (qr_size * box_size) - 40
-        qr_y_start = 15
-        
-        # Draw a small label above QR code
-        c.setFont("Helvetica-Bold", 6)
-        c.setFillColorRGB(0.5, 0.5, 0.5)
-        c.drawCentredString(qr_x_start + (qr_size * box_size) / 2, qr_y_start + (qr_size * box_size) + 4, "SCAN OR CLICK TO VERIFY")
-
-        c.setFillColorRGB(0, 0, 0)
-        for row_index, row in enumerate(qr_matrix):
-            for col_index, pixel in enumerate(row):
-                if pixel:
-                    c.rect(
-                        qr_x_start + (col_index * box_size),
-                        qr_y_start + ((qr_size - 1 - row_index) * box_size),
-                        box_size,
-                        box_size,
-                        stroke=0,
-                        fill=1
-                    )
-        
-        # Clickable hit-box (slightly oversized for ease of use)
-        c.linkURL(
-            f"https://sepolia.etherscan.io/tx/{tx_hash}",
-            (qr_x_start - 5, qr_y_start - 5, qr_x_start + (qr_size * box_size) + 5, qr_y_start + (qr_size * box_size) + 12),
-            relative=0
-        )
+    @property
+    def etag(self) -> str:
+        # The cache key already hashes id, tx_hash, document_uid and source bytes.
+        return f'"{self.cache_key}"'
+
+
+class ExportEntry(NamedTuple):
+    credential: Credential
+    path: Optional[Path]
+    error: Optional[str]
 
-    c.save()
-    packet.seek(0)
-    overlay = PdfReader(packet)
-    return overlay.pages[0]
+    @property
+    def arcname(self) -> str:
+        stem = f"{self.credential.prn_number}-{self.credential.id}" if self.credential.prn_number else str(self.credential.id)
+        return safe_arcname(stem) + ".pdf"
+
+
+# Renders currently running, keyed by cache key, so a download, the approval
+# notification and the pre-render of the same credential share one render.
+_renders_in_flight: Dict[str, "asyncio.Task[Path]"] = {}
+# Latest pre-render per credential; a new one waits for the previous to finish
+# so two writers never race on the same artifact file.
+_prerender_tasks: Dict[UUID, "asyncio.Task[None]"] = {}
+
+
+def _stamped_artifact_path(credential_id: UUID) -> Path:
+    return UPLOAD_DIR / f"{credential_id}.stamped.pdf"
+
+
+def _promote_stamped_artifact(rendered: Path, artifact: Path) -> str:
+    """Place `rendered` at `artifact` atomically and return its SHA-256.
+
+    Hard-links when possible (the cache and the uploads live on one volume),
+    falling back to a copy. Runs in a thread.
+    """
+    tmp = artifact.with_name(f".{artifact.name}.{os.getpid()}.tmp")
+    discard(str(tmp))
+    try:
+        os.link(rendered, tmp)
+    except OSError:
+        shutil.copyfile(rendered, tmp)
+    os.replace(tmp, artifact)
+    return source_digest(str(artifact))
+
+
+def _remove_stamped_artifact(credential_id: UUID) -> None:
+    discard(str(_stamped_artifact_path(credential_id)))
 
 
 class DegreeService:
@@ -180,21 +296,35 @@ class DegreeService:
         )
 
     @staticmethod
-    async def list_for_user(current_user: User) -> List[Credential]:
+    def _list_query(current_user: User) -> Optional[FindMany[CredentialView]]:
         if current_user.role == UserRole.SUPERADMIN:
-            creds = await CredentialCRUD.get_all()
-            # Even Superadmins shouldn't see rejected ones in general list to respect privacy
-            return [c for c in creds if c.status != CredentialStatus.REJECTED]
-        
+            return CredentialCRUD.query_all(projection=CredentialView)
         if current_user.role == UserRole.ADMIN:
             if current_user.college_name:
-                creds = await CredentialCRUD.get_by_college(current_user.college_name)
-                # Admins only see Pending/Approved. Rejected are hidden as per privacy rules.
-                return [c for c in creds if c.status != CredentialStatus.REJECTED]
+                return CredentialCRUD.query_by_college(current_user.college_name, projection=CredentialView)
+            return None
+        return CredentialCRUD.query_by_user(current_user.id, projection=CredentialView)
+
+    @staticmethod
+    async def list_for_user(current_user: User) -> List[CredentialView]:
+        query = DegreeService._list_query(current_user)
+        if query is None:
             return []
-            
+        creds = await query.to_list()
+        if current_user.role in (UserRole.SUPERADMIN, UserRole.ADMIN):
+            # Even Superadmins shouldn't see rejected ones in general list to respect privacy;
+            # Admins only see Pending/Approved.
+            return [c for c in creds if c.status != CredentialStatus.REJECTED]
         # Students see everything they've submitted
-        return await CredentialCRUD.get_by_user(current_user.id)
+        return creds
+
+    @staticmethod
+    async def list_validator(current_user: User) -> Validator:
+        """Validator of list_for_user(current_user), from the ids and
+        updated_at of the documents it reads (not the documents)."""
+        query = DegreeService._list_query(current_user)
+        rows = await CredentialCRUD.get_stamps(query) if query is not None else []
+        return _range_validator(("list", current_user.id), rows)
 
 
     @staticmethod
@@ -212,9 +342,15 @@ class DegreeService:
         credential.tx_hash = None
         credential.revoked = False
         credential.revoked_at = None
+        credential.stamped_document_path = None
+        credential.stamped_document_hash = None
+        credential.stamped_document_key = None
         from datetime import datetime
         credential.updated_at = datetime.utcnow()
         await credential.save()
+        DegreeService.invalidate_stamped_document(credential.id)
+        _remove_stamped_artifact(credential.id)
+        await public_lookup_cache.invalidate_credentials([credential])
         return credential
 
     @staticmethod
@@ -252,20 +388,121 @@ class DegreeService:
         return credential
 
     @staticmethod
-    async def get_public_by_prn(prn_number: str) -> List[Credential]:
-        return await CredentialCRUD.get_approved_by_prn(prn_number)
+    async def get_public_by_college_id_hash(college_id_hash: str) -> Credential:
+        credential = await CredentialCRUD.get_approved_by_college_id_hash(college_id_hash)
+        if not credential:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No approved degree for this collegeIdHash",
+            )
+        return credential
+
+    @staticmethod
+    async def public_verification(document_uid: str) -> dict:
+        """Signed verification payload (PublicVerificationResponse, as JSON)
+        of the approved degree printed with `document_uid`."""
+        credential = await CredentialCRUD.get_approved_by_document_uid(document_uid)
+        if not credential:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No approved degree for this document",
+            )
+        onchain = await DegreeService.onchain_states([credential])
+        claims = PublicVerification(
+            credential_id=credential.id,
+            onchain_revoked=onchain[credential.id].revoked if credential.id in onchain else None,
+            **credential.model_dump(include=set(PublicVerification.model_fields) - {"credential_id", "onchain_revoked"}),
+        ).model_dump(mode="json")
+        claims["receipt"] = {"alg": "HMAC-SHA256", "key_id": receipt_key_id(), "signature": sign_receipt(claims)}
+        return claims
 
     @staticmethod
-    async def get_public_by_email(email: str) -> List[Credential]:
+    async def public_query(
+        prn_number: Optional[str] = None,
+        email: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Optional[FindMany[CredentialView]]:
+        """Approved credentials for public verification, by PRN, else by the
+        student's email, else all of them; None if the email matches nobody."""
+        after = decode_cursor(cursor)
+        if prn_number:
+            return CredentialCRUD.query_approved(prn_number=prn_number.strip(), after=after, projection=CredentialView)
+        if email:
+            from app.crud.crud import UserCRUD
+            user = await UserCRUD.get_by_email(email)
+            if not user:
+                return None
+            return CredentialCRUD.query_approved(issued_to_id=user.id, after=after, projection=CredentialView)
+        return CredentialCRUD.query_approved(after=after, projection=CredentialView)
+
+    @staticmethod
+    async def public_batch(
+        prn_numbers: List[str], emails: List[str]
+    ) -> Tuple[Dict[str, List[CredentialView]], Dict[str, List[CredentialView]]]:
+        """Approved credentials grouped by requested PRN and by requested
+        email: one query per kind of identifier (plus one for the emails'
+        users), however many there are."""
         from app.crud.crud import UserCRUD
-        user = await UserCRUD.get_by_email(email)
-        if not user:
-            return []
-        return await CredentialCRUD.get_approved_by_user_id(user.id)
-        
+        by_prn: Dict[str, List[CredentialView]] = {p.strip(): [] for p in prn_numbers if p.strip()}
+        by_email: Dict[str, List[CredentialView]] = {
+            UserCRUD._norm_email(e): [] for e in emails if UserCRUD._norm_email(e)
+        }
+
+        if by_prn:
+            for view in await CredentialCRUD.get_approved_in(prn_numbers=list(by_prn), projection=CredentialView):
+                by_prn[view.prn_number].append(view)
+        if by_email:
+            users = await UserCRUD.get_many_by_email(list(by_email))
+            email_of = {user.id: user.email for user in users}
+            if email_of:
+                for view in await CredentialCRUD.get_approved_in(
+                    issued_to_ids=list(email_of), projection=CredentialView
+                ):
+                    by_email[email_of[view.issued_to_id]].append(view)
+        return by_prn, by_email
+
     @staticmethod
-    async def get_all_public() -> List[Credential]:
-        return await CredentialCRUD.get_all_approved()
+    async def public_page(
+        query: Optional[FindMany[CredentialView]], limit: int
+    ) -> Tuple[List[CredentialView], Optional[str]]:
+        """One keyset page and the cursor of the next (None on the last)."""
+        if query is None:
+            return [], None
+        creds = await query.limit(limit + 1).to_list()
+        if len(creds) <= limit:
+            return creds, None
+        creds = creds[:limit]
+        return creds, encode_cursor(creds[-1].created_at, creds[-1].id)
+
+    @staticmethod
+    async def public_validator(query: Optional[FindMany[CredentialView]], limit: int) -> Validator:
+        """Validator of public_page(query, limit), including the on-chain
+        state it shows, read without loading the page."""
+        if query is None:
+            return _range_validator(("public",), [])
+        rows = await CredentialCRUD.get_stamps(query, ("college_id_hash", "prn_number", "college_name"), limit + 1)
+        hashes = list({
+            row.get("college_id_hash") or compute_college_id_hash(row["prn_number"], row["college_name"])
+            for row in rows if row.get("prn_number") and row.get("college_name")
+        })
+        onchain = []
+        if hashes:
+            onchain = await OnChainDegree.get_motor_collection().find(
+                {"college_id_hash": {"$in": hashes}}, {"updated_at": 1}
+            ).to_list(None)
+        return _range_validator(("public",), rows, onchain)
+
+    @staticmethod
+    async def onchain_states(credentials: List[Credential]) -> Dict[UUID, OnChainDegree]:
+        """Indexed on-chain state of each credential that has one (one query)."""
+        hashes = {c.id: _expected_college_id_hash(c) for c in credentials if c.prn_number and c.college_name}
+        if not hashes:
+            return {}
+        found = {
+            record.college_id_hash: record
+            async for record in OnChainDegree.find(In(OnChainDegree.college_id_hash, list(set(hashes.values()))))
+        }
+        return {cid: found[h] for cid, h in hashes.items() if h in found}
 
     @staticmethod
     async def update_status(credential_id: UUID, status_value: CredentialStatus, admin_id: UUID = None) -> Credential:
@@ -277,17 +514,16 @@ class DegreeService:
             )
 
         if status_value == CredentialStatus.APPROVED and credential.tx_hash:
-            combined_string = f"{credential.prn_number}-{credential.college_name}"
-            expected_college_id_hash = Web3.keccak(text=combined_string).hex()
-            if not expected_college_id_hash.startswith("0x"):
-                expected_college_id_hash = "0x" + expected_college_id_hash
-            
-            await _verify_blockchain_transaction(credential.tx_hash, expected_college_id_hash)
-
-        credential = await CredentialCRUD.update(credential_id, CredentialUpdate(status=status_value))
+            await _verify_blockchain_transaction(credential.tx_hash, _expected_college_id_hash(credential))
+
+        previous_status = credential.status
+        credential = await _save_update(credential_id, CredentialUpdate(status=status_value))
         if admin_id:
             credential.issued_by_id = admin_id
             await credential.save()
+        await public_lookup_cache.invalidate_credentials([credential])
+        if status_value == CredentialStatus.APPROVED and previous_status != CredentialStatus.APPROVED:
+            DegreeService.schedule_prerender(credential.id)
         return credential
 
     @staticmethod
@@ -304,29 +540,39 @@ class DegreeService:
         new_tx_hash = credential_update.tx_hash or credential.tx_hash
 
         if new_status == CredentialStatus.APPROVED and new_tx_hash:
-            # Reconstruct the expected collegeIdHash
-            # collegeIdHash = keccak256(utf8(prn_number + "-" + universityName))
-            combined_string = f"{credential.prn_number}-{credential.college_name}"
-            expected_college_id_hash = Web3.keccak(text=combined_string).hex()
-            if not expected_college_id_hash.startswith("0x"):
-                expected_college_id_hash = "0x" + expected_college_id_hash
-            
-            await _verify_blockchain_transaction(new_tx_hash, expected_college_id_hash)
-
-        credential = await CredentialCRUD.update(credential_id, credential_update)
+            await _verify_blockchain_transaction(new_tx_hash, _expected_college_id_hash(credential))
+
+        previous_status = credential.status
+        previous_tx_hash = credential.tx_hash
+        previous_revoked = credential.revoked
+        previous_prn = credential.prn_number
+        credential = await _save_update(credential_id, credential_update)
         if admin_id:
             credential.issued_by_id = admin_id
             await credential.save()
+        await public_lookup_cache.invalidate_credentials([credential], prns=[previous_prn])
+        stamp_changed = credential.tx_hash != previous_tx_hash or credential.revoked != previous_revoked
+        if stamp_changed:
+            DegreeService.invalidate_stamped_document(credential.id)
+        if credential.status == CredentialStatus.APPROVED and (
+            stamp_changed or previous_status != CredentialStatus.APPROVED
+        ):
+            DegreeService.schedule_prerender(credential.id)
         return credential
 
     @staticmethod
     async def delete(credential_id: UUID) -> None:
+        credential = await CredentialCRUD.get_by_id(credential_id)
         success = await CredentialCRUD.delete(credential_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Credential not found",
             )
+        DegreeService.invalidate_stamped_document(credential_id)
+        _remove_stamped_artifact(credential_id)
+        await public_lookup_cache.invalidate_credentials([credential])
+        await document_store.release(credential.document_path)
 
     # ---- Document upload / download ----
 
@@ -346,36 +592,43 @@ class DegreeService:
                 detail="Not authorized",
             )
 
-        pdf_bytes = await validate_pdf_upload(file)
-
-        _ensure_upload_dir()
-
-        # Store with a unique name based on the credential id
-        filename = f"{credential_id}.pdf"
-        dest = UPLOAD_DIR / filename
-
-        with open(dest, "wb") as buf:
-            buf.write(pdf_bytes)
-
-        # Persist the path in the record
-        credential.document_path = str(dest)
-        if not credential.document_uid:
-            credential.document_uid = f"DOC-{credential.id}"
-        from datetime import datetime
-        credential.updated_at = datetime.utcnow()
-        await credential.save()
+        previous_path = credential.document_path
+        async with await validate_pdf_upload(file, document_store.spool_dir) as upload:
+            # Identical PDFs share one blob; hold the digest's lock until the
+            # record points at it so a concurrent release can't delete it.
+            async with document_store.lock(upload.sha256):
+                dest = await document_store.put(upload)
+                credential.document_path = str(dest)
+                credential.document_sha256 = upload.sha256
+                credential.document_keccak256 = upload.keccak256
+                if not credential.document_uid:
+                    credential.document_uid = f"DOC-{credential.id}"
+                credential.updated_at = datetime.utcnow()
+                await credential.save()
+
+        DegreeService.invalidate_stamped_document(credential.id)
+        await public_lookup_cache.invalidate_credentials([credential])
+        if previous_path != credential.document_path:
+            await document_store.release(previous_path)
+
+        if credential.status == CredentialStatus.APPROVED:
+            DegreeService.schedule_prerender(credential.id)
 
         return credential
 
     @staticmethod
-    async def get_document_path(credential_id: UUID, current_user: User) -> str:
+    async def _get_document_credential(credential_id: UUID, current_user: User) -> Credential:
         credential = await CredentialCRUD.get_by_id(credential_id)
         if not credential:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Credential not found",
             )
+        DegreeService._authorize_document(credential, current_user)
+        return credential
 
+    @staticmethod
+    def _authorize_document(credential: Credential, current_user: User) -> None:
         # Determine if user is authorized to view document
         is_authorized = False
         if current_user.role == UserRole.SUPERADMIN:
@@ -399,60 +652,327 @@ class DegreeService:
                 detail="No document uploaded for this credential",
             )
 
+    @staticmethod
+    async def get_document_path(credential_id: UUID, current_user: User) -> str:
+        credential = await DegreeService._get_document_credential(credential_id, current_user)
         return credential.document_path
 
     @staticmethod
-    async def get_document_with_footer(credential_id: UUID, current_user: User) -> bytes:
+    async def get_original_document(credential_id: UUID, current_user: User) -> DocumentFile:
+        """The uploaded PDF as-is, tagged with a content-derived ETag."""
+        credential = await DegreeService._get_document_credential(credential_id, current_user)
+        source_hash = await DegreeService._document_digest(credential)
+        return DocumentFile(path=credential.document_path, etag=f'"{source_hash[:32]}"')
+
+    @staticmethod
+    async def _document_digest(credential: Credential) -> str:
+        # Blobs are named after their SHA-256 and never rewritten, so the
+        # recorded digest is authoritative; legacy paths are hashed.
+        if credential.document_sha256 and document_store.contains(credential.document_path):
+            return credential.document_sha256
+        return await asyncio.to_thread(source_digest, credential.document_path)
+
+    @staticmethod
+    def invalidate_stamped_document(credential_id: UUID) -> None:
+        """Forget any cached footer-stamped rendition of this credential."""
+        stamped_pdf_cache.invalidate(credential_id)
+
+    @staticmethod
+    async def get_stamped_document(credential_id: UUID, current_user: User) -> StampedDocument:
+        """Authorize and key the footer-stamped PDF without rendering it, so a
+        caller can answer a conditional request before paying for the render."""
+        credential = await DegreeService._get_document_credential(credential_id, current_user)
+
+        if credential.status != CredentialStatus.APPROVED:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Document must be approved before viewing the official approved PDF.",
+            )
+
+        return await DegreeService._key_stamped_document(credential)
+
+    @staticmethod
+    async def _key_stamped_document(credential: Credential) -> StampedDocument:
+        source_hash = await DegreeService._document_digest(credential)
+        cache_key = stamped_pdf_cache.key(
+            credential.id,
+            credential.tx_hash,
+            credential.document_uid or str(credential.id),
+            source_hash,
+            revoked=credential.revoked,
+        )
+        return StampedDocument(credential=credential, cache_key=cache_key)
+
+    @staticmethod
+    def _stamped_artifact(stamped: StampedDocument) -> Optional[Path]:
+        """The pre-rendered artifact, if it was rendered for this exact key."""
+        credential = stamped.credential
+        if credential.stamped_document_key != stamped.cache_key or not credential.stamped_document_path:
+            return None
+        path = Path(credential.stamped_document_path)
+        return path if path.is_file() else None
+
+    @staticmethod
+    async def render_stamped_document(stamped: StampedDocument) -> Path:
+        artifact = DegreeService._stamped_artifact(stamped)
+        if artifact is not None:
+            return artifact
+
+        cached = stamped_pdf_cache.get(stamped.credential.id, stamped.cache_key)
+        if cached is not None:
+            return cached
+
+        task = _renders_in_flight.get(stamped.cache_key)
+        if task is None:
+            task = asyncio.create_task(DegreeService._render_into_cache(stamped))
+            _renders_in_flight[stamped.cache_key] = task
+            task.add_done_callback(lambda _t, key=stamped.cache_key: _renders_in_flight.pop(key, None))
+        # Shield so one cancelled request doesn't abort the render others await.
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _render_into_cache(stamped: StampedDocument) -> Path:
+        credential = stamped.credential
+        tmp_name = stamped_pdf_cache.reserve()
+        try:
+            await render_pool.run(
+                render_footer_pdf,
+                credential.document_path,
+                tmp_name,
+                credential.tx_hash,
+                credential.document_uid or str(credential.id),
+                credential.revoked,
+                # A timed-out render may still write tmp_name after we give up.
+                on_abandoned=functools.partial(discard, tmp_name),
+            )
+        except BaseException:
+            discard(tmp_name)
+            raise
+        return stamped_pdf_cache.commit(credential.id, stamped.cache_key, tmp_name)
+
+    @staticmethod
+    async def prerender_stamped_document(credential_id: UUID) -> Optional[Path]:
+        """Render the stamped PDF of an approved credential and store it next
+        to the original upload, recording its path, hash and render key.
+
+        Returns the artifact path, or None when there is nothing to render.
+        """
         credential = await CredentialCRUD.get_by_id(credential_id)
-        if not credential:
+        if (
+            not credential
+            or credential.status != CredentialStatus.APPROVED
+            or not credential.document_path
+            or not os.path.isfile(credential.document_path)
+        ):
+            return None
+
+        stamped = await DegreeService._key_stamped_document(credential)
+        artifact = DegreeService._stamped_artifact(stamped)
+        if artifact is not None:
+            return artifact
+
+        rendered = await DegreeService.render_stamped_document(stamped)
+        artifact = _stamped_artifact_path(credential.id)
+        digest = await asyncio.to_thread(_promote_stamped_artifact, rendered, artifact)
+
+        # Only record the artifact if nothing re-keyed the credential meanwhile;
+        # otherwise the pre-render scheduled by that change will replace it.
+        current = await CredentialCRUD.get_by_id(credential_id)
+        if not current or current.status != CredentialStatus.APPROVED or not current.document_path:
+            return None
+        if (await DegreeService._key_stamped_document(current)).cache_key != stamped.cache_key:
+            return None
+        await current.set({
+            Credential.stamped_document_path: str(artifact),
+            Credential.stamped_document_hash: digest,
+            Credential.stamped_document_key: stamped.cache_key,
+        })
+        return artifact
+
+    @staticmethod
+    def schedule_prerender(credential_id: UUID) -> None:
+        """Pre-render the stamped PDF in the background (fire-and-forget)."""
+        previous = _prerender_tasks.get(credential_id)
+
+        async def _run() -> None:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            try:
+                await DegreeService.prerender_stamped_document(credential_id)
+            except Exception as exc:
+                # Downloads still render lazily, so a failure here is not fatal.
+                logger.warning("Pre-rendering stamped PDF for %s failed: %s", credential_id, exc)
+
+        task = asyncio.create_task(_run())
+        _prerender_tasks[credential_id] = task
+
+        def _forget(done: "asyncio.Task[None]") -> None:
+            if _prerender_tasks.get(credential_id) is done:
+                del _prerender_tasks[credential_id]
+
+        task.add_done_callback(_forget)
+
+    @staticmethod
+    async def drain_prerenders() -> None:
+        """Wait for every scheduled pre-render to finish (used at shutdown)."""
+        while _prerender_tasks:
+            await asyncio.gather(*list(_prerender_tasks.values()), return_exceptions=True)
+
+    @staticmethod
+    async def get_document_with_footer(credential_id: UUID, current_user: User) -> bytes:
+        stamped = await DegreeService.get_stamped_document(credential_id, current_user)
+        stamped_path = await DegreeService.render_stamped_document(stamped)
+        return await asyncio.to_thread(stamped_path.read_bytes)
+
+    # ---- Bulk transaction verification ----
+
+    @staticmethod
+    async def verify_transactions(credential_ids: List[UUID], current_user: User) -> List[TxVerificationResult]:
+        """Re-verify the recorded tx_hash of many credentials at once (admin
+        back-fills, reconciliation). All uncached transactions are fetched in
+        batched RPC requests; one bad hash only fails its own result."""
+        if not chain.enabled:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Credential not found",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Blockchain provider is not configured",
             )
 
-        # Determine if user is authorized to view document
-        is_authorized = False
-        if current_user.role == UserRole.SUPERADMIN:
-            is_authorized = True
-        elif current_user.role == UserRole.ADMIN:
-            if ((credential.status == CredentialStatus.PENDING and credential.college_name == current_user.college_name) or
-                credential.issued_by_id == current_user.id):
-                is_authorized = True
-        elif credential.issued_to_id == current_user.id:
-            is_authorized = True
+        credentials = {c.id: c for c in await CredentialCRUD.get_many(credential_ids)}
+        results: Dict[UUID, TxVerificationResult] = {}
+        to_check: List[Credential] = []
+        for credential_id in dict.fromkeys(credential_ids):
+            credential = credentials.get(credential_id)
+            if credential is None:
+                detail = "Credential not found"
+            elif current_user.role == UserRole.ADMIN and credential.college_name != current_user.college_name:
+                detail = "Not authorized to verify this credential"
+            elif not credential.tx_hash:
+                detail = "No blockchain transaction recorded"
+            else:
+                to_check.append(credential)
+                continue
+            results[credential_id] = TxVerificationResult(
+                credential_id=credential_id,
+                tx_hash=credential.tx_hash if credential else None,
+                verified=False,
+                detail=detail,
+            )
 
-        if not is_authorized:
+        lookups = await _load_transactions([c.tx_hash for c in to_check]) if to_check else {}
+        for credential in to_check:
+            lookup = lookups[credential.tx_hash.lower()]
+            detail = lookup.error
+            if detail is None:
+                try:
+                    _check_upload_degree(lookup.record, _expected_college_id_hash(credential))
+                except HTTPException as exc:
+                    detail = str(exc.detail)
+            results[credential.id] = TxVerificationResult(
+                credential_id=credential.id,
+                tx_hash=credential.tx_hash,
+                verified=detail is None,
+                detail=detail,
+            )
+        return [results[credential_id] for credential_id in dict.fromkeys(credential_ids)]
+
+    # ---- Bulk export ----
+
+    @staticmethod
+    async def export_documents(
+        current_user: User,
+        college_name: Optional[str] = None,
+        status_value: CredentialStatus = CredentialStatus.APPROVED,
+        prn_prefix: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Tuple[str, AsyncIterator[bytes]]:
+        """Validate an export request and return (zip filename, archive stream).
+
+        Approved degrees are exported footer-stamped, pending ones as uploaded.
+        Each credential still goes through the per-document authorization, so
+        an admin only gets what they could download one by one; anything
+        skipped is listed in the archive's manifest.csv.
+        """
+        if current_user.role == UserRole.ADMIN:
+            college_name = college_name or current_user.college_name
+            if not college_name or college_name != current_user.college_name:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Admins can only export degrees of their own college",
+                )
+        elif not college_name:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="college_name is required",
             )
 
-        if not credential.document_path or not os.path.isfile(credential.document_path):
+        if status_value == CredentialStatus.REJECTED:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No document uploaded for this credential",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Rejected degrees are private to the student and cannot be exported.",
             )
 
-        if credential.status != CredentialStatus.APPROVED:
+        query = CredentialCRUD.query_for_export(college_name, status_value, prn_prefix, created_from, created_to)
+        if await query.count() == 0:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Document must be approved before viewing the official approved PDF.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No degrees match the export filters",
             )
 
-        with open(credential.document_path, "rb") as pdf_file:
-            reader = PdfReader(pdf_file)
-            writer = PdfWriter()
-            for page in reader.pages:
-                overlay_page = _create_footer_overlay(
-                    float(page.mediabox.width),
-                    float(page.mediabox.height),
-                    tx_hash=credential.tx_hash,
-                    document_uid=credential.document_uid or str(credential.id),
-                )
-                page.merge_page(overlay_page)
-                writer.add_page(page)
+        filename = f"{safe_arcname(college_name, 'college')}-{status_value.value.lower()}-degrees.zip"
+        return filename, DegreeService._stream_export(query, current_user)
 
-            output = io.BytesIO()
-            writer.write(output)
-            output.seek(0)
-            return output.read()
+    @staticmethod
+    async def _prepare_export_entry(credential: Credential, current_user: User) -> ExportEntry:
+        try:
+            DegreeService._authorize_document(credential, current_user)
+            if credential.status != CredentialStatus.APPROVED:
+                return ExportEntry(credential, Path(credential.document_path), None)
+            stamped = await DegreeService._key_stamped_document(credential)
+            return ExportEntry(credential, await DegreeService.render_stamped_document(stamped), None)
+        except HTTPException as exc:
+            return ExportEntry(credential, None, str(exc.detail))
+
+    @staticmethod
+    async def _stream_export(query, current_user: User) -> AsyncIterator[bytes]:
+        archive = ZipStream()
+        manifest = io.StringIO()
+        writer = csv.writer(manifest)
+        writer.writerow(["credential_id", "prn_number", "title", "file", "result"])
+        # Render ahead of the writer, but never more than BULK_EXPORT_CONCURRENCY
+        # documents at once; entries still leave in query order.
+        window: Deque["asyncio.Task[ExportEntry]"] = collections.deque()
+        limit = max(1, settings.BULK_EXPORT_CONCURRENCY)
+
+        async def write(entry: ExportEntry) -> AsyncIterator[bytes]:
+            cred = entry.credential
+            if entry.path is None:
+                writer.writerow([cred.id, cred.prn_number or "", cred.title, "", f"skipped: {entry.error}"])
+                return
+            try:
+                fh = await asyncio.to_thread(open, entry.path, "rb")
+            except OSError as exc:
+                writer.writerow([cred.id, cred.prn_number or "", cred.title, "", f"skipped: {exc.strerror}"])
+                return
+            try:
+                async for chunk in archive.add_file(entry.arcname, fh):
+                    yield chunk
+            finally:
+                fh.close()
+            writer.writerow([cred.id, cred.prn_number or "", cred.title, entry.arcname, "ok"])
+
+        try:
+            async for credential in query:
+                window.append(asyncio.create_task(DegreeService._prepare_export_entry(credential, current_user)))
+                if len(window) >= limit:
+                    async for chunk in write(await window.popleft()):
+                        yield chunk
+            while window:
+                async for chunk in write(await window.popleft()):
+                    yield chunk
+            yield archive.add_bytes("manifest.csv", manifest.getvalue().encode("utf-8"))
+            yield archive.close()
+        finally:
+            # Client went away mid-download: stop preparing the rest.
+            for task in window:
+                task.cancel()
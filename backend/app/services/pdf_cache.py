@@ -0,0 +1,168 @@
+"""Disk-backed cache for footer-stamped degree PDFs.
+
+Stamping an approved degree means re-reading the uploaded PDF, building a
+reportlab overlay per page and rewriting the whole document. The result only
+depends on the credential id, its tx_hash / document_uid / revocation and the
+bytes of the uploaded file, so we key the rendered output on exactly those and
+keep it on disk next to the uploads.
+
+Eviction is LRU by file mtime (a hit bumps the mtime) with a hard cap on the
+total bytes kept. Entries are stored as ``{credential_id}-{key}.pdf`` so every
+rendition of a credential can be dropped at once when it is reset, revoked or
+gets a new upload.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK = 1024 * 1024
+# (path, mtime_ns, size) -> sha256 hex. Bounded so a long-lived worker that has
+# served many documents doesn't grow this forever.
+_SOURCE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+_SOURCE_DIGESTS_MAX = 4096
+
+
+def source_digest(path: str) -> str:
+    """SHA-256 of the file at `path`, memoised on (path, mtime, size)."""
+    st = os.stat(path)
+    memo_key = (path, st.st_mtime_ns, st.st_size)
+    cached = _SOURCE_DIGESTS.get(memo_key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    if len(_SOURCE_DIGESTS) >= _SOURCE_DIGESTS_MAX:
+        _SOURCE_DIGESTS.clear()
+    _SOURCE_DIGESTS[memo_key] = value
+    return value
+
+
+def prime_source_digest(path: str, digest: str) -> None:
+    """Record a digest computed elsewhere (e.g. while an upload was spooled)."""
+    st = os.stat(path)
+    if len(_SOURCE_DIGESTS) >= _SOURCE_DIGESTS_MAX:
+        _SOURCE_DIGESTS.clear()
+    _SOURCE_DIGESTS[(path, st.st_mtime_ns, st.st_size)] = digest
+
+
+def discard(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class StampedPdfCache:
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        credential_id: UUID,
+        tx_hash: Optional[str],
+        document_uid: Optional[str],
+        source_hash: str,
+        revoked: bool = False,
+    ) -> str:
+        raw = "|".join((str(credential_id), tx_hash or "", document_uid or "", source_hash))
+        if revoked:
+            raw += "|revoked"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _path_for(self, credential_id: UUID, key: str) -> Path:
+        return self.root / f"{credential_id}-{key}.pdf"
+
+    def get(self, credential_id: UUID, key: str) -> Optional[Path]:
+        path = self._path_for(credential_id, key)
+        try:
+            # Bump mtime so eviction treats this entry as recently used.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def reserve(self) -> str:
+        """Allocate a temp file inside the cache dir for a renderer to write to.
+        Hand it back to `commit` (or unlink it) once the render finishes."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        return tmp_name
+
+    def commit(self, credential_id: UUID, key: str, tmp_name: str) -> Path:
+        # Rename into place so a concurrent reader never sees a half-written PDF.
+        dest = self._path_for(credential_id, key)
+        try:
+            os.replace(tmp_name, dest)
+        except BaseException:
+            discard(tmp_name)
+            raise
+        self._evict(keep=dest)
+        return dest
+
+    def put(self, credential_id: UUID, key: str, data: bytes) -> Path:
+        tmp_name = self.reserve()
+        try:
+            with open(tmp_name, "wb") as fh:
+                fh.write(data)
+        except BaseException:
+            discard(tmp_name)
+            raise
+        return self.commit(credential_id, key, tmp_name)
+
+    def invalidate(self, credential_id: UUID) -> int:
+        """Drop every cached rendition of `credential_id`. Returns the count removed."""
+        if not self.root.is_dir():
+            return 0
+        removed = 0
+        for path in self.root.glob(f"{credential_id}-*.pdf"):
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _evict(self, keep: Optional[Path] = None) -> None:
+        entries = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(".pdf"):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == str(keep):
+                continue
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        logger.debug("Stamped PDF cache evicted down to %d bytes", total)
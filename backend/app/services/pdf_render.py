@@ -0,0 +1,171 @@
+"""CPU-bound PDF work that runs inside the render pool.
+
+Everything here is a plain module-level function over paths / bytes so it can
+be pickled into a ProcessPoolExecutor worker. Keep FastAPI, Beanie and other
+app state out of this module — workers import it on their own.
+"""
+
+from __future__ import annotations
+
+import io
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import qrcode
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from reportlab.pdfgen import canvas
+
+
+_QR_BOX_SIZE = 1.8  # Small boxes
+
+
+def _verify_url(tx_hash: str) -> str:
+    return f"https://sepolia.etherscan.io/tx/{tx_hash}"
+
+
+@lru_cache(maxsize=64)
+def _qr_runs(url: str) -> Tuple[int, Tuple[Tuple[int, int, int], ...]]:
+    """QR matrix for `url` as (size, runs), where each run is a horizontal
+    strip of dark modules: (row_index, first_col, length)."""
+    qr = qrcode.QRCode(version=1, box_size=2, border=0)
+    qr.add_data(url)
+    qr.make(fit=True)
+
+    matrix = qr.get_matrix()
+    runs = []
+    for row_index, row in enumerate(matrix):
+        col = 0
+        while col < len(row):
+            if not row[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(row) and row[col]:
+                col += 1
+            runs.append((row_index, start, col - start))
+    return len(matrix), tuple(runs)
+
+
+@lru_cache(maxsize=64)
+def _footer_overlay_pdf(
+    page_width: float,
+    page_height: float,
+    tx_hash: str = None,
+    document_uid: str = None,
+    revoked: bool = False,
+) -> bytes:
+    """Single-page overlay PDF for one (page size, tx_hash, document_uid, revoked).
+
+    Memoised per worker process: a degree's pages almost always share one page
+    size, so a multi-page document builds the QR and canvas exactly once.
+    """
+    packet = io.BytesIO()
+    c = canvas.Canvas(packet, pagesize=(page_width, page_height))
+
+    # Text info on the left
+    c.setFont("Helvetica", 8)
+    c.setFillColorRGB(0.3, 0.3, 0.3)
+    x_text = 30
+    y_text = 20
+
+    if tx_hash:
+        url = _verify_url(tx_hash)
+        qr_size, runs = _qr_runs(url)
+        box_size = _QR_BOX_SIZE
+
+        if revoked:
+            # Never print "Verified" on a credential the issuer has revoked.
+            footer_text = f"REVOKED - on-chain record: {tx_hash[:10]}...{tx_hash[-10:]}"
+            c.setFillColorRGB(0.75, 0.1, 0.1)
+        else:
+            footer_text = f"Blockchain Verified: {tx_hash[:10]}...{tx_hash[-10:]}"
+        # Add a link annotation for the text
+        c.linkURL(url, (x_text, y_text - 2, x_text + 250, y_text + 10), relative=0)
+        c.drawString(x_text, y_text, footer_text)
+
+        qr_x_start = page_width - (qr_size * box_size) - 40
+        qr_y_start = 15
+
+        # Draw a small label above QR code
+        c.setFont("Helvetica-Bold", 6)
+        c.setFillColorRGB(0.5, 0.5, 0.5)
+        c.drawCentredString(qr_x_start + (qr_size * box_size) / 2, qr_y_start + (qr_size * box_size) + 4, "SCAN OR CLICK TO VERIFY")
+
+        # The QR goes into a Form XObject holding one compound path (consecutive
+        # dark modules in a row merged into a single rectangle). The page
+        # content then only carries a `Do`, which keeps pypdf's per-page
+        # content-stream parsing in merge_page cheap.
+        c.beginForm("qr", lowerx=0, lowery=0, upperx=qr_size * box_size, uppery=qr_size * box_size)
+        c.setFillColorRGB(0, 0, 0)
+        qr_path = c.beginPath()
+        for row_index, first_col, length in runs:
+            qr_path.rect(
+                first_col * box_size,
+                (qr_size - 1 - row_index) * box_size,
+                length * box_size,
+                box_size,
+            )
+        c.drawPath(qr_path, stroke=0, fill=1)
+        c.endForm()
+        c.saveState()
+        c.translate(qr_x_start, qr_y_start)
+        c.doForm("qr")
+        c.restoreState()
+
+        # Clickable hit-box (slightly oversized for ease of use)
+        c.linkURL(
+            url,
+            (qr_x_start - 5, qr_y_start - 5, qr_x_start + (qr_size * box_size) + 5, qr_y_start + (qr_size * box_size) + 12),
+            relative=0
+        )
+
+    c.save()
+    return packet.getvalue()
+
+
+def render_footer_pdf(
+    source_path: str,
+    dest_path: str,
+    tx_hash: str = None,
+    document_uid: str = None,
+    revoked: bool = False,
+) -> None:
+    """Stamp every page of `source_path` with the verification footer and write
+    the result to `dest_path`. Runs inside a render-pool worker."""
+    overlays: Dict[Tuple[float, float], PageObject] = {}
+    with open(source_path, "rb") as pdf_file:
+        reader = PdfReader(pdf_file)
+        writer = PdfWriter()
+        for page in reader.pages:
+            size = (float(page.mediabox.width), float(page.mediabox.height))
+            overlay_page = overlays.get(size)
+            if overlay_page is None:
+                overlay_bytes = _footer_overlay_pdf(size[0], size[1], tx_hash, document_uid, revoked)
+                overlay_page = PdfReader(io.BytesIO(overlay_bytes)).pages[0]
+                overlays[size] = overlay_page
+            page.merge_page(overlay_page)
+            writer.add_page(page)
+
+        with open(dest_path, "wb") as output:
+            writer.write(output)
+
+
+def check_pdf_structure(data: bytes) -> Optional[str]:
+    """Parse `data` with pypdf. Returns None when it is a valid PDF, otherwise
+    the parser's error message."""
+    try:
+        PdfReader(io.BytesIO(data))
+    except (PdfReadError, ValueError, OSError) as exc:
+        return str(exc)
+    return None
+
+
+def check_pdf_file(path: str) -> Optional[str]:
+    """Like check_pdf_structure, but reads the file itself so an upload
+    spooled to disk is never shipped to the worker as bytes."""
+    try:
+        PdfReader(path)
+    except (PdfReadError, ValueError, OSError) as exc:
+        return str(exc)
+    return None
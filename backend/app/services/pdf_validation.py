@@ -5,59 +5,115 @@ Enforces, in this order:
   2. File size is within MAX_PDF_UPLOAD_BYTES (streamed — never loads an
      unbounded payload into memory).
   3. The payload actually starts with %PDF- (magic bytes).
-  4. pypdf can parse the full payload as a valid PDF structure.
+  4. pypdf can parse the full payload as a valid PDF structure (run in the
+     render pool so a large upload doesn't block the event loop).
 
-Returns the full file bytes on success so callers can persist them without
-re-reading.
+The upload is spooled chunk by chunk (through app.services.storage, off the
+event loop) into a temp file inside the destination directory while its
+SHA-256 and keccak256 are computed, so peak memory per upload is about one
+chunk. Callers get a ValidatedUpload and persist it with `commit()`, an
+atomic rename, instead of writing the bytes out again.
 """
 
 from __future__ import annotations
 
-import io
+import hashlib
+from pathlib import Path
+from typing import Union
 
+from eth_hash.auto import keccak
 from fastapi import HTTPException, UploadFile, status
-from pypdf import PdfReader
-from pypdf.errors import PdfReadError
+
+from app.services.pdf_cache import prime_source_digest
+from app.services.pdf_render import check_pdf_file
+from app.services.render_pool import render_pool
+from app.services.storage import TempFile, storage
 
 MAX_PDF_UPLOAD_BYTES = 10 * 1024 * 1024  # 10 MiB
 _PDF_MAGIC = b"%PDF-"
 _CHUNK = 64 * 1024
 
 
-async def validate_pdf_upload(file: UploadFile) -> bytes:
+class ValidatedUpload:
+    """A validated PDF spooled to a temp file, not yet at its final path."""
+
+    def __init__(self, spool: TempFile, sha256: str, keccak256: str) -> None:
+        self._spool = spool
+        self.tmp_path = spool.path
+        self.size = spool.size
+        self.sha256 = sha256
+        # 0x-prefixed, the form the contracts and web3 use.
+        self.keccak256 = keccak256
+
+    async def commit(self, dest: Union[str, Path]) -> Path:
+        """Atomically move the spooled file to `dest` (same filesystem)."""
+        dest = await self._spool.commit(dest)
+        await storage.run("stat", prime_source_digest, str(dest), self.sha256, record=False)
+        return dest
+
+    async def discard(self) -> None:
+        await self._spool.discard()
+
+    async def __aenter__(self) -> "ValidatedUpload":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.discard()
+
+
+def _not_a_pdf() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="File is not a valid PDF (missing %PDF- header)",
+    )
+
+
+async def validate_pdf_upload(file: UploadFile, directory: Union[str, Path]) -> ValidatedUpload:
+    """Validate `file` and spool it into `directory`.
+
+    The caller must either `commit()` or `discard()` the result (or use it as
+    an async context manager, which discards anything left uncommitted).
+    """
     if file.content_type not in ("application/pdf",):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are accepted",
         )
 
-    # Stream-read with a hard cap so a malicious client can't OOM us.
-    buf = bytearray()
-    while True:
-        chunk = await file.read(_CHUNK)
-        if not chunk:
-            break
-        buf.extend(chunk)
-        if len(buf) > MAX_PDF_UPLOAD_BYTES:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"PDF exceeds {MAX_PDF_UPLOAD_BYTES // (1024 * 1024)} MiB limit",
-            )
+    sha256 = hashlib.sha256()
+    keccak256 = keccak.new(b"")
+    spool = await storage.create_temp(directory, suffix=".pdf.tmp", digests=(sha256, keccak256))
+    try:
+        # Stream-read with a hard cap so a malicious client can't OOM us.
+        head = b""
+        while True:
+            chunk = await file.read(_CHUNK)
+            if not chunk:
+                break
+            if len(head) < len(_PDF_MAGIC):
+                # Reject non-PDFs on the first chunk instead of spooling them.
+                head += chunk[: len(_PDF_MAGIC) - len(head)]
+                if not _PDF_MAGIC.startswith(head):
+                    raise _not_a_pdf()
+            if spool.size + len(chunk) > MAX_PDF_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"PDF exceeds {MAX_PDF_UPLOAD_BYTES // (1024 * 1024)} MiB limit",
+                )
+            await spool.write(chunk)
+        await spool.finish()
 
-    data = bytes(buf)
-    if not data.startswith(_PDF_MAGIC):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File is not a valid PDF (missing %PDF- header)",
-        )
+        if head != _PDF_MAGIC:
+            raise _not_a_pdf()
 
-    try:
-        PdfReader(io.BytesIO(data))
-    except (PdfReadError, ValueError, OSError) as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid or malformed PDF file: {exc}",
-        )
+        error = await render_pool.run(check_pdf_file, spool.path)
+        if error is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid or malformed PDF file: {error}",
+            )
+    except BaseException:
+        await spool.discard()
+        raise
 
-    await file.seek(0)
-    return data
+    return ValidatedUpload(spool, sha256=sha256.hexdigest(), keccak256="0x" + keccak256.digest().hex())
@@ -0,0 +1,288 @@
+"""Cache of public verification lookups (`/degrees/public?prn_number=`,
+`?email=` and `/degrees/public/uid/{document_uid}`).
+
+Employers check the same PRNs over and over while the answers change rarely,
+so the first page of each lookup is cached under its normalized PRN or email
+in two tiers: an in-process TTL LRU in front of a shared store - Redis when
+REDIS_URL is set, otherwise a process-local stand-in with the same interface.
+Lookups go LRU -> store -> Mongo.
+
+Every change to a credential that the public view shows (status, revocation,
+reset, delete, document upload, on-chain events) drops the keys for its PRN,
+its document_uid and its student's email from both tiers, and bumps a
+per-key generation in the store. A miss reads that generation before loading
+from Mongo and only stores its answer if it is unchanged (atomically, a Lua
+script on Redis), so a load that raced an invalidation in any worker never
+reaches the shared tier. With Redis, other workers' LRUs are not reached by
+an invalidation and may serve a stale answer for up to
+PUBLIC_CACHE_LOCAL_TTL_SECONDS, which is why that TTL is kept short.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from beanie.operators import In
+
+from app.core.config import settings
+from app.models.models import Credential, User
+
+logger = logging.getLogger(__name__)
+
+
+class _TtlLru:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "collections.OrderedDict[str, Tuple[float, Any]]" = collections.OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _generation_key(key: str) -> str:
+    # Outside the "public:" namespace, so clear() leaves generations alone.
+    return f"gen:{key}"
+
+
+class LocalStore:
+    """Stand-in for Redis when REDIS_URL is unset (single-process deployments
+    and tests): the same async interface over TTL LRUs."""
+
+    name = "local"
+
+    def __init__(self, max_entries: int) -> None:
+        self._lru = _TtlLru(max_entries)
+        self._generations = _TtlLru(max_entries)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._lru.get(key)
+
+    async def generation(self, key: str) -> Optional[int]:
+        return self._generations.get(_generation_key(key)) or 0
+
+    async def set_unless_invalidated(self, key: str, value: str, ttl: float, generation: Optional[int]) -> bool:
+        if await self.generation(key) != generation:
+            return False
+        self._lru.set(key, value, ttl)
+        return True
+
+    async def invalidate(self, keys: List[str], ttl: float) -> None:
+        self._lru.delete(keys)
+        for key in keys:
+            generation_key = _generation_key(key)
+            self._generations.set(generation_key, (self._generations.get(generation_key) or 0) + 1, ttl)
+
+    async def clear(self) -> None:
+        self._lru.clear()
+
+    async def close(self) -> None:
+        pass
+
+
+# KEYS: value key, its generation key; ARGV: value, TTL in ms, the generation
+# read before loading. Stores only if no invalidation happened since.
+_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[3] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+
+class RedisStore:
+    """Shared tier on Redis. A cache must never fail a lookup, so Redis
+    errors are logged and read as misses."""
+
+    name = "redis"
+
+    def __init__(self, url: str, timeout: float = 0.5) -> None:
+        import redis.asyncio as redis
+        from redis.exceptions import RedisError
+
+        self._redis = redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._errors = (RedisError, OSError, asyncio.TimeoutError)
+        self._set_if_generation = self._redis.register_script(_SET_IF_GENERATION)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self._redis.get(key)
+        except self._errors as exc:
+            logger.warning("Public cache: Redis GET failed: %s", exc)
+            return None
+        return value.decode() if value is not None else None
+
+    async def generation(self, key: str) -> Optional[int]:
+        """None when Redis can't be read; the answer is then not stored."""
+        try:
+            value = await self._redis.get(_generation_key(key))
+        except self._errors as exc:
+            logger.warning("Public cache: Redis GET failed: %s", exc)
+            return None
+        return int(value) if value is not None else 0
+
+    async def set_unless_invalidated(self, key: str, value: str, ttl: float, generation: Optional[int]) -> bool:
+        if generation is None:
+            return True
+        try:
+            return bool(await self._set_if_generation(
+                keys=[key, _generation_key(key)], args=[value, int(ttl * 1000), generation]
+            ))
+        except self._errors as exc:
+            logger.warning("Public cache: Redis SET failed: %s", exc)
+            return True
+
+    async def invalidate(self, keys: List[str], ttl: float) -> None:
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*keys)
+                for key in keys:
+                    pipe.incr(_generation_key(key))
+                    pipe.pexpire(_generation_key(key), int(ttl * 1000))
+                await pipe.execute()
+        except self._errors as exc:
+            logger.warning("Public cache: Redis invalidation failed: %s", exc)
+
+    async def clear(self) -> None:
+        try:
+            async for key in self._redis.scan_iter(match="public:*"):
+                await self._redis.delete(key)
+        except self._errors as exc:
+            logger.warning("Public cache: Redis clear failed: %s", exc)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class PublicLookupCache:
+    def __init__(self, store, max_entries: int, local_ttl: float, ttl: float) -> None:
+        self.store = store
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self._lru = _TtlLru(max_entries)
+        # Bumped by every invalidation in this process: a miss that started
+        # loading from Mongo before one must not cache what it read locally,
+        # even when the store could not be asked (the store's generations
+        # guard the shared tier across workers).
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(kind: str, value: str) -> str:
+        value = value.strip()
+        return f"public:{kind}:{value.lower() if kind == 'email' else value}"
+
+    async def fetch(self, kind: str, value: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """The cached answer for a `kind` ("prn" / "email" / "uid") lookup, else the
+        result of `load()` (JSON-serializable), which is then cached."""
+        key = self.key(kind, value)
+        cached = self._lru.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        raw = await self.store.get(key)
+        if raw is not None:
+            self.hits += 1
+            cached = json.loads(raw)
+            self._lru.set(key, cached, self.local_ttl)
+            return cached
+
+        self.misses += 1
+        epoch = self._epoch
+        generation = await self.store.generation(key)
+        result = await load()
+        stored = await self.store.set_unless_invalidated(key, json.dumps(result), self.ttl, generation)
+        if stored and epoch == self._epoch:
+            self._lru.set(key, result, self.local_ttl)
+        return result
+
+    async def invalidate(
+        self,
+        prns: Iterable[Optional[str]] = (),
+        emails: Iterable[Optional[str]] = (),
+        uids: Iterable[Optional[str]] = (),
+    ) -> None:
+        keys = (
+            [self.key("prn", p) for p in prns if p]
+            + [self.key("email", e) for e in emails if e]
+            + [self.key("uid", u) for u in uids if u]
+        )
+        self._epoch += 1
+        if keys:
+            self._lru.delete(keys)
+            await self.store.invalidate(keys, self.ttl)
+
+    async def invalidate_credentials(self, credentials: Iterable[Credential], prns: Iterable[Optional[str]] = ()) -> None:
+        """Drop the lookups that can show any of `credentials` (plus extra
+        PRNs, e.g. one a credential was just moved off)."""
+        credentials = [c for c in credentials if c is not None]
+        student_ids = list({c.issued_to_id for c in credentials})
+        emails = []
+        if student_ids:
+            users = await User.find(In(User.id, student_ids)).to_list()
+            emails = [u.email for u in users]
+        await self.invalidate(
+            prns=[c.prn_number for c in credentials] + list(prns),
+            emails=emails,
+            uids=[c.document_uid for c in credentials],
+        )
+
+    async def clear(self) -> None:
+        self._epoch += 1
+        self._lru.clear()
+        await self.store.clear()
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": self.store.name,
+            "local_entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _store_from_settings():
+    if settings.REDIS_URL:
+        return RedisStore(settings.REDIS_URL)
+    return LocalStore(max_entries=settings.PUBLIC_CACHE_MAX_ENTRIES)
+
+
+public_lookup_cache = PublicLookupCache(
+    _store_from_settings(),
+    max_entries=settings.PUBLIC_CACHE_MAX_ENTRIES,
+    local_ttl=settings.PUBLIC_CACHE_LOCAL_TTL_SECONDS,
+    ttl=settings.PUBLIC_CACHE_TTL_SECONDS,
+)
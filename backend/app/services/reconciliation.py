@@ -0,0 +1,222 @@
+"""Chain-vs-database reconciliation.
+
+Walks approved credentials with a Mongo cursor (sorted by id, never loaded
+all at once) and compares each with `AltriumRegistry.getDegree(collegeIdHash)`.
+The eth_calls go out through `ChainClient.batch()`, RECONCILE_BATCH_SIZE
+credentials per round of batch requests. Findings are reported as Drift
+entries:
+
+  * missing_on_chain      — the credential has a tx_hash, the chain has no degree
+  * not_recorded          — the chain has a degree, the credential no tx_hash
+  * token_id_mismatch     — the recorded token_id differs from the chain's
+  * revoked_on_chain_only — revoked on-chain, not in the database
+  * revoked_in_db_only    — revoked in the database, not on-chain
+  * rpc_error             — the eth_call itself failed
+
+With `fix=True` only revoked_on_chain_only is corrected (revoked / revoked_at
+copied from the chain): on-chain revocation is irreversible and authoritative,
+while a database-only revocation may still be waiting for its transaction.
+
+Progress is kept in an IndexerCheckpoint after every batch, so an interrupted
+run over a large collection can `resume=True`; a completed run clears it.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+from eth_abi import decode
+from eth_utils.abi import get_abi_output_types
+
+from app.core.config import settings
+from app.models.models import Credential, CredentialStatus, IndexerCheckpoint
+from app.services.chain import REGISTRY_ABI, ChainClient, RpcResult, chain
+from app.services.degree_service import DegreeService, _expected_college_id_hash
+from app.services.public_cache import public_lookup_cache
+
+logger = logging.getLogger(__name__)
+
+_GET_DEGREE_ABI = next(entry for entry in REGISTRY_ABI if entry.get("name") == "getDegree")
+_GET_DEGREE_TYPES = get_abi_output_types(_GET_DEGREE_ABI)
+
+
+class ChainDegree(NamedTuple):
+    exists: bool
+    token_id: int
+    revoked: bool
+    revoked_at: Optional[datetime]
+
+
+class Drift(NamedTuple):
+    credential_id: UUID
+    prn_number: Optional[str]
+    college_id_hash: str
+    kind: str
+    database: Any
+    chain: Any
+    fixed: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = self._asdict()
+        data["credential_id"] = str(self.credential_id)
+        return data
+
+
+class ReconcileSummary:
+    def __init__(self) -> None:
+        self.checked = 0
+        self.drifted = 0
+        self.fixed = 0
+        self.by_kind: Dict[str, int] = {}
+        self.last_id: Optional[UUID] = None
+
+    def record(self, drift: Drift) -> None:
+        self.drifted += 1
+        self.fixed += int(drift.fixed)
+        self.by_kind[drift.kind] = self.by_kind.get(drift.kind, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "drifted": self.drifted,
+            "fixed": self.fixed,
+            "by_kind": dict(self.by_kind),
+        }
+
+
+def _decode_degree(result: RpcResult) -> ChainDegree:
+    exists, token_id, record, _uri = decode(_GET_DEGREE_TYPES, bytes.fromhex(result.result[2:]))
+    revoked, revoked_at = record[5], record[6]
+    return ChainDegree(
+        exists=exists,
+        token_id=token_id,
+        revoked=revoked,
+        revoked_at=datetime.utcfromtimestamp(revoked_at) if revoked and revoked_at else None,
+    )
+
+
+class ChainReconciler:
+    name = "reconciliation"
+
+    def __init__(self, client: ChainClient, batch_size: int) -> None:
+        self.client = client
+        self.batch_size = max(1, batch_size)
+
+    @staticmethod
+    def _query(after: Optional[UUID], college_name: Optional[str]):
+        filters = [
+            Credential.status == CredentialStatus.APPROVED,
+            Credential.prn_number != None,  # noqa: E711 (Beanie expression)
+            Credential.college_name != None,  # noqa: E711
+        ]
+        if college_name is not None:
+            filters.append(Credential.college_name == college_name)
+        if after is not None:
+            filters.append(Credential.id > after)
+        return Credential.find(*filters).sort("+_id")
+
+    async def _checkpoint(self) -> Optional[IndexerCheckpoint]:
+        return await IndexerCheckpoint.find_one(IndexerCheckpoint.name == self.name)
+
+    async def run(
+        self,
+        fix: bool = False,
+        resume: bool = False,
+        on_drift: Optional[Callable[[Drift], None]] = None,
+        college_name: Optional[str] = None,
+    ) -> ReconcileSummary:
+        checkpoint = await self._checkpoint()
+        if checkpoint is None:
+            checkpoint = IndexerCheckpoint(name=self.name)
+        elif not resume:
+            checkpoint.last_id = None
+            checkpoint.processed = 0
+        elif checkpoint.last_id is not None:
+            logger.info("Resuming reconciliation after %s (%d checked)", checkpoint.last_id, checkpoint.processed)
+
+        summary = ReconcileSummary()
+        batch: List[Credential] = []
+        async for credential in self._query(checkpoint.last_id, college_name):
+            batch.append(credential)
+            if len(batch) >= self.batch_size:
+                await self._reconcile_batch(batch, fix, summary, on_drift)
+                await self._save_checkpoint(checkpoint, batch[-1].id, len(batch))
+                batch = []
+        if batch:
+            await self._reconcile_batch(batch, fix, summary, on_drift)
+
+        # Finished: the next run starts from the beginning.
+        if checkpoint.id is not None:
+            await checkpoint.delete()
+        return summary
+
+    async def _save_checkpoint(self, checkpoint: IndexerCheckpoint, last_id: UUID, count: int) -> None:
+        checkpoint.last_id = last_id
+        checkpoint.processed += count
+        checkpoint.updated_at = datetime.utcnow()
+        await checkpoint.save()
+
+    async def _reconcile_batch(
+        self,
+        credentials: List[Credential],
+        fix: bool,
+        summary: ReconcileSummary,
+        on_drift: Optional[Callable[[Drift], None]],
+    ) -> None:
+        registry = await self.client.registry()
+        hashes = [_expected_college_id_hash(c) for c in credentials]
+        calls = [
+            ("eth_call", [
+                {
+                    "to": registry.address,
+                    "data": registry.functions.getDegree(bytes.fromhex(h[2:]))._encode_transaction_data(),
+                },
+                "latest",
+            ])
+            for h in hashes
+        ]
+        answers = await self.client.batch(calls)
+
+        for credential, college_id_hash, answer in zip(credentials, hashes, answers):
+            summary.checked += 1
+            summary.last_id = credential.id
+            for drift in await self._compare(credential, college_id_hash, answer, fix):
+                summary.record(drift)
+                if on_drift is not None:
+                    on_drift(drift)
+
+    async def _compare(self, credential: Credential, college_id_hash: str, answer: RpcResult, fix: bool) -> List[Drift]:
+        def drift(kind: str, database: Any, on_chain: Any, fixed: bool = False) -> Drift:
+            return Drift(credential.id, credential.prn_number, college_id_hash, kind, database, on_chain, fixed)
+
+        if answer.error is not None:
+            return [drift("rpc_error", None, answer.error)]
+        degree = _decode_degree(answer)
+        if not degree.exists:
+            return [drift("missing_on_chain", credential.tx_hash, None)] if credential.tx_hash else []
+
+        drifts = []
+        if not credential.tx_hash:
+            drifts.append(drift("not_recorded", None, degree.token_id))
+        if credential.token_id is not None and credential.token_id != degree.token_id:
+            drifts.append(drift("token_id_mismatch", credential.token_id, degree.token_id))
+        if degree.revoked and not credential.revoked:
+            fixed = False
+            if fix:
+                credential.revoked = True
+                credential.revoked_at = degree.revoked_at or datetime.utcnow()
+                credential.updated_at = datetime.utcnow()
+                await credential.save()
+                DegreeService.invalidate_stamped_document(credential.id)
+                await public_lookup_cache.invalidate_credentials([credential])
+                fixed = True
+            drifts.append(drift("revoked_on_chain_only", False, True, fixed))
+        elif credential.revoked and not degree.revoked:
+            drifts.append(drift("revoked_in_db_only", True, False))
+        return drifts
+
+
+chain_reconciler = ChainReconciler(client=chain, batch_size=settings.RECONCILE_BATCH_SIZE)
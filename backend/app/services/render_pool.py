@@ -0,0 +1,139 @@
+"""Bounded process pool for CPU-heavy PDF work.
+
+pypdf / reportlab / qrcode hold the GIL for the whole render, so running them
+inside an `async def` handler (or even in the default thread pool) stalls every
+other request on the uvicorn worker. Jobs submitted here run in a
+ProcessPoolExecutor instead; the event loop only awaits the future.
+
+  * RENDER_POOL_WORKERS       — worker processes. 0 runs jobs in a thread
+                                instead (dev / tests, no subprocesses).
+  * RENDER_POOL_MAX_PENDING   — jobs allowed in flight (running + queued)
+                                before new ones are refused with a 503.
+  * RENDER_JOB_TIMEOUT_SECONDS — per-job wall clock limit (504 on expiry).
+                                A worker can't be interrupted, so a job that
+                                times out (or whose caller goes away) stays
+                                in flight until it really ends; `on_abandoned`
+                                then cleans up after it.
+
+`stats()` exposes queue depth and counters; it is surfaced on /health.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPool:
+    def __init__(self, max_workers: int, max_pending: int, job_timeout: float) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        if self._executor is not None or self.max_workers <= 0:
+            return
+        # spawn, not fork: the parent holds Motor sockets and an event loop
+        # that must not be duplicated into the workers.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Render pool started with %d worker process(es)", self.max_workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(
+        self, fn: Callable[..., Any], *args: Any, on_abandoned: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """`fn(*args)` in the pool. `on_abandoned` runs once a job the caller
+        stopped waiting for has finished, e.g. to remove what it wrote."""
+        if self._in_flight >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Document renderer is busy, please retry shortly",
+            )
+
+        pending = None
+        if self.max_workers <= 0:
+            job = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        else:
+            self.start()
+            pending = self._executor.submit(fn, *args)
+            job = asyncio.wrap_future(pending)
+        self._in_flight += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job), timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Document rendering timed out",
+            )
+        except HTTPException:
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            if job.done():
+                self._in_flight -= 1
+            else:
+                # Still queued (cancel succeeds) or running (it doesn't):
+                # either way it counts until its future settles.
+                if pending is not None:
+                    pending.cancel()
+                job.add_done_callback(functools.partial(self._abandoned_done, on_abandoned))
+
+        self._completed += 1
+        return result
+
+    def _abandoned_done(self, on_abandoned: Optional[Callable[[], Any]], job: asyncio.Future) -> None:
+        self._in_flight -= 1
+        if not job.cancelled() and job.exception() is not None:
+            logger.warning("Abandoned render job failed: %s", job.exception())
+        if on_abandoned is not None:
+            try:
+                on_abandoned()
+            except Exception:
+                logger.exception("Cleanup after an abandoned render job failed")
+
+    def stats(self) -> dict:
+        workers = max(self.max_workers, 0)
+        return {
+            "workers": workers,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - workers, 0) if workers else 0,
+            "max_pending": self.max_pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "rejected": self._rejected,
+        }
+
+
+render_pool = RenderPool(
+    max_workers=settings.RENDER_POOL_WORKERS,
+    max_pending=settings.RENDER_POOL_MAX_PENDING,
+    job_timeout=settings.RENDER_JOB_TIMEOUT_SECONDS,
+)
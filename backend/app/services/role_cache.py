@@ -0,0 +1,107 @@
+"""On-chain role membership, projected from RoleGranted / RoleRevoked events.
+
+Whether an admin's wallet holds UNIVERSITY_ROLE used to be a `hasRole` eth_call
+at the moment it mattered, and the dashboard had no cheap way to show it at
+all. `RoleIndexer` is a second ChainIndexer (own checkpoint, so it seeds
+itself from INDEXER_START_BLOCK even where degree events are already indexed)
+that folds the Registry's AccessControl events into `onchain_roles`, one
+document per (account, role). Reads lag the chain by INDEXER_CONFIRMATIONS
+blocks plus one poll interval.
+
+`RoleMembership` is the read side: a Mongo lookup per wallet (or one In query
+for a page of admins). It answers None for a wallet the indexer has never
+seen an event for; callers decide what "unknown" means for them.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from beanie.operators import In
+from pymongo.errors import DuplicateKeyError
+from web3 import Web3
+
+from app.core.config import settings
+from app.models.models import OnChainRole
+from app.services.chain import UNIVERSITY_ROLE, chain
+from app.services.chain_indexer import ChainIndexer
+
+ROLE_EVENTS = ("RoleGranted", "RoleRevoked")
+
+
+def _role_hex(role: bytes) -> str:
+    return "0x" + bytes(role).hex()
+
+
+class RoleIndexer(ChainIndexer):
+    name = "role_members"
+
+    @property
+    def enabled(self) -> bool:
+        return settings.INDEXER_ENABLED and self.client.enabled and bool(settings.CONTRACT_REGISTRY_ADDRESS)
+
+    async def _event_types(self) -> Dict[str, Any]:
+        if self._events is None:
+            registry = await self.client.registry()
+            events = (registry.events[name]() for name in ROLE_EVENTS)
+            self._events = {event.topic: event for event in events}
+        return self._events
+
+    def _addresses(self) -> List[str]:
+        return [Web3.to_checksum_address(settings.CONTRACT_REGISTRY_ADDRESS)]
+
+    async def _apply(self, name: str, args: Any, block: int, log_index: int) -> bool:
+        role = _role_hex(args["role"])
+        account = Web3.to_checksum_address(args["account"])
+        record = await OnChainRole.find_one(OnChainRole.account == account, OnChainRole.role == role)
+        if record is None:
+            record = OnChainRole(role=role, account=account)
+        if (block, log_index) <= (record.last_block, record.last_log_index):
+            return False
+
+        record.member = name == "RoleGranted"
+        record.changed_by = args["sender"]
+        record.last_block = block
+        record.last_log_index = log_index
+        record.updated_at = datetime.utcnow()
+        try:
+            await record.save()
+        except DuplicateKeyError:
+            return False
+        return True
+
+
+class RoleMembership:
+    @staticmethod
+    async def lookup(wallets: Iterable[str], role: bytes = UNIVERSITY_ROLE) -> Dict[str, OnChainRole]:
+        """Checksum address -> indexed role record, for the wallets that have one."""
+        accounts = {Web3.to_checksum_address(wallet) for wallet in wallets if wallet}
+        if not accounts:
+            return {}
+        records = await OnChainRole.find(
+            In(OnChainRole.account, list(accounts)),
+            OnChainRole.role == _role_hex(role),
+        ).to_list()
+        return {record.account: record for record in records}
+
+    @staticmethod
+    async def has_role(wallet: Optional[str], role: bytes = UNIVERSITY_ROLE) -> Optional[bool]:
+        """True / False once the indexer has seen a grant or revocation for
+        the wallet, None otherwise."""
+        if not wallet:
+            return None
+        record = await OnChainRole.find_one(
+            OnChainRole.account == Web3.to_checksum_address(wallet),
+            OnChainRole.role == _role_hex(role),
+        )
+        return record.member if record else None
+
+
+role_indexer = RoleIndexer(
+    client=chain,
+    start_block=settings.INDEXER_START_BLOCK,
+    block_range=settings.INDEXER_BLOCK_RANGE,
+    confirmations=settings.INDEXER_CONFIRMATIONS,
+    poll_seconds=settings.INDEXER_POLL_SECONDS,
+)
@@ -0,0 +1,218 @@
+"""Non-blocking file persistence for uploads.
+
+A `write()` or `fsync()` on the Docker `uploads` volume (or any networked
+disk) can stall for tens of milliseconds, and inside an `async def` handler
+that stalls every request on the worker. All upload I/O goes through this
+module instead: each operation runs on a small dedicated thread pool (so slow
+storage can't starve the default executor other code relies on), files are
+written under a temp name and renamed into place atomically, and how hard we
+push data to disk is configurable:
+
+  * STORAGE_FSYNC_POLICY  — "none": leave flushing to the OS.
+                            "file": fsync the file before it is renamed into
+                                    place (default; the new name never points
+                                    at a partially written file after a crash).
+                            "full": also fsync the directory after the rename
+                                    so the rename itself survives a crash.
+  * STORAGE_IO_THREADS    — threads in the I/O pool.
+
+Per-operation latency (write / fsync / commit) is tracked and exposed via
+`stats()` on /health.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_SAMPLES = 1024
+
+
+class FsyncPolicy(str, Enum):
+    NONE = "none"
+    FILE = "file"
+    FULL = "full"
+
+
+class _Latency:
+    """Counters plus a bounded window of recent samples for percentiles."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = collections.deque(maxlen=_LATENCY_SAMPLES)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def stats(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(pct(0.50), 3),
+            "p95_ms": round(pct(0.95), 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class TempFile:
+    """A file being written under a temp name; `commit()` renames it into place.
+
+    `digests` are hashlib-style objects updated with every chunk, in the same
+    worker-thread call as the write.
+    """
+
+    def __init__(self, storage: "AsyncStorage", path: str, fh: BinaryIO, digests: Iterable[Any] = ()) -> None:
+        self.storage = storage
+        self.path = path
+        self.size = 0
+        self._fh: Optional[BinaryIO] = fh
+        self._digests = tuple(digests)
+        self._committed = False
+
+    def _write(self, chunk: bytes) -> None:
+        self._fh.write(chunk)
+        for digest in self._digests:
+            digest.update(chunk)
+        self.size += len(chunk)
+
+    async def write(self, chunk: bytes) -> None:
+        await self.storage.run("write", self._write, chunk)
+
+    def _finish(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.flush()
+            if self.storage.policy != FsyncPolicy.NONE:
+                os.fsync(self._fh.fileno())
+        finally:
+            self._fh.close()
+            self._fh = None
+
+    async def finish(self) -> None:
+        """Flush (and fsync, per policy) and close; idempotent."""
+        if self._fh is not None:
+            await self.storage.run("fsync", self._finish)
+
+    def _commit(self, dest: str) -> None:
+        os.replace(self.path, dest)
+        if self.storage.policy == FsyncPolicy.FULL:
+            _fsync_dir(os.path.dirname(dest) or ".")
+
+    async def commit(self, dest: Union[str, Path]) -> Path:
+        await self.finish()
+        dest = Path(dest)
+        await self.storage.run("commit", self._commit, str(dest))
+        self._committed = True
+        return dest
+
+    def _discard(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if not self._committed:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    async def discard(self) -> None:
+        await self.storage.run("discard", self._discard, record=False)
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _create_temp(directory: str, prefix: str, suffix: str):
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=suffix)
+    return path, os.fdopen(fd, "wb")
+
+
+class AsyncStorage:
+    def __init__(self, io_threads: int, policy: Union[str, FsyncPolicy]) -> None:
+        self.io_threads = max(1, io_threads)
+        self.policy = FsyncPolicy(policy)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._latency: Dict[str, _Latency] = collections.defaultdict(_Latency)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.io_threads, thread_name_prefix="storage-io")
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run(self, op: str, fn: Callable[..., Any], *args: Any, record: bool = True) -> Any:
+        """Run a blocking filesystem call on the I/O pool, timing it as `op`."""
+        loop = asyncio.get_running_loop()
+
+        def timed() -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                if record:
+                    elapsed = time.perf_counter() - started
+                    # Recorded on the loop thread so stats need no lock.
+                    loop.call_soon_threadsafe(self._latency[op].record, elapsed)
+
+        return await loop.run_in_executor(self._pool(), timed)
+
+    async def create_temp(
+        self,
+        directory: Union[str, Path],
+        *,
+        prefix: str = ".upload-",
+        suffix: str = ".tmp",
+        digests: Iterable[Any] = (),
+    ) -> TempFile:
+        """Open a temp file in `directory` (the destination's directory, so the
+        final rename stays on one filesystem)."""
+        path, fh = await self.run("create", _create_temp, str(directory), prefix, suffix, record=False)
+        return TempFile(self, path, fh, digests)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fsync_policy": self.policy.value,
+            "io_threads": self.io_threads,
+            "latency": {op: latency.stats() for op, latency in sorted(self._latency.items())},
+        }
+
+
+storage = AsyncStorage(
+    io_threads=settings.STORAGE_IO_THREADS,
+    policy=settings.STORAGE_FSYNC_POLICY,
+)
@@ -0,0 +1,90 @@
+"""Cache of verified on-chain transactions.
+
+Re-saving an approved credential re-verifies its tx_hash, which used to mean
+fetching the same receipt and transaction from the RPC every time. A mined
+transaction with TX_CACHE_MIN_CONFIRMATIONS confirmations can no longer be
+reorged away, so its verification facts (status, target, block, decoded
+uploadDegree arguments) are stored in the `verified_transactions` collection
+and fronted by an in-process LRU. Lookups go LRU -> Mongo -> RPC.
+"""
+
+from __future__ import annotations
+
+import collections
+from typing import Dict, Iterable, Optional
+
+from beanie.operators import In
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models.models import VerifiedTransaction
+
+
+class VerifiedTxCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lru: "collections.OrderedDict[str, VerifiedTransaction]" = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(tx_hash: str) -> str:
+        return tx_hash.lower()
+
+    def _remember(self, record: VerifiedTransaction) -> None:
+        self._lru[record.tx_hash] = record
+        self._lru.move_to_end(record.tx_hash)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def get(self, tx_hash: str) -> Optional[VerifiedTransaction]:
+        key = self._key(tx_hash)
+        record = self._lru.get(key)
+        if record is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return record
+
+        record = await VerifiedTransaction.find_one(VerifiedTransaction.tx_hash == key)
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(record)
+        return record
+
+    async def get_many(self, tx_hashes: Iterable[str]) -> Dict[str, VerifiedTransaction]:
+        """Cached records for any of `tx_hashes`, keyed by lower-cased hash;
+        misses are simply absent. One Mongo query for everything the LRU
+        doesn't hold."""
+        found: Dict[str, VerifiedTransaction] = {}
+        missing = []
+        for key in {self._key(h) for h in tx_hashes}:
+            record = self._lru.get(key)
+            if record is not None:
+                self._lru.move_to_end(key)
+                found[key] = record
+            else:
+                missing.append(key)
+        if missing:
+            async for record in VerifiedTransaction.find(In(VerifiedTransaction.tx_hash, missing)):
+                found[record.tx_hash] = record
+                self._remember(record)
+        self.hits += len(found)
+        self.misses += len(set(missing) - found.keys())
+        return found
+
+    async def put(self, record: VerifiedTransaction) -> None:
+        record.tx_hash = self._key(record.tx_hash)
+        try:
+            await record.insert()
+        except DuplicateKeyError:
+            pass  # Another worker cached it first; the facts are identical.
+        self._remember(record)
+
+    def clear(self) -> None:
+        """Drop the in-process layer (Mongo is left alone)."""
+        self._lru.clear()
+
+
+verified_tx_cache = VerifiedTxCache(max_entries=settings.TX_CACHE_MAX_ENTRIES)
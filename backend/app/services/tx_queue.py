@@ -0,0 +1,359 @@
+"""Server-side queue for Registry transactions sent from the backend wallet.
+
+Admin verification and wallet updates used to sign and send grantRole /
+addUniversity inline: fetch the nonce, read the gas price, then block the
+HTTP request on `wait_for_transaction_receipt` for up to two minutes, while
+two concurrent verifications could pick the same nonce. Now the endpoints
+only insert a ChainTxJob and return its id; this module does the rest.
+
+  * One writer (the process with TX_QUEUE_WRITER) submits queued jobs in
+    order. The nonce is read from the chain once ("pending" count) and then
+    tracked locally, so jobs are pipelined without waiting for each other;
+    any send error drops the local nonce so the next job resyncs.
+  * EIP-1559 fees (2 x base fee + priority fee) are cached for
+    TX_FEE_CACHE_SECONDS instead of being read per transaction.
+  * A tracker polls receipts of submitted jobs in one batch request and marks
+    them CONFIRMED / FAILED (reverted). A job not mined within
+    TX_CONFIRM_TIMEOUT_SECONDS becomes STALLED: its transaction still holds
+    the nonce every later job queues behind, so it is re-sent at that nonce
+    with bumped fees (each timeout, up to TX_MAX_REPLACEMENTS times) and kept
+    tracked until one of its sends is mined. Only when the nonce was taken by
+    a transaction that is not one of them does the job FAIL.
+  * Jobs whose wallet already holds UNIVERSITY_ROLE (per the role cache, or
+    a hasRole call when the cache has not seen a grant) are SKIPPED.
+
+Jobs live in Mongo, so anything queued or submitted before a restart is
+picked up again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from beanie.operators import In
+from fastapi import HTTPException
+from web3 import Web3
+
+from app.core.config import settings
+from app.models.models import ChainTxJob, ChainTxStatus
+from app.services.chain import UNIVERSITY_ROLE, ChainClient, chain
+from app.services.role_cache import RoleMembership
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("grantRole", "addUniversity")
+
+
+class TxQueue:
+    def __init__(
+        self,
+        client: ChainClient,
+        gas_limit: int,
+        fee_ttl: float,
+        poll_seconds: float,
+        confirm_timeout: float,
+        fee_bump_percent: int = 25,
+        max_replacements: int = 5,
+    ) -> None:
+        self.client = client
+        self.gas_limit = gas_limit
+        self.fee_ttl = fee_ttl
+        self.poll_seconds = poll_seconds
+        self.confirm_timeout = confirm_timeout
+        self.fee_bump_percent = fee_bump_percent
+        self.max_replacements = max_replacements
+        self._nonce: Optional[int] = None
+        self._chain_id: Optional[int] = None
+        self._fees: Optional[Tuple[float, Dict[str, int]]] = None
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._tasks: list = []
+        self.submitted = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.replaced = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(settings.PRIVATE_KEY and settings.CONTRACT_REGISTRY_ADDRESS and self.client.enabled)
+
+    async def enqueue(
+        self,
+        action: str,
+        wallet_address: str,
+        requested_by_id: Optional[UUID] = None,
+        subject_user_id: Optional[UUID] = None,
+    ) -> ChainTxJob:
+        if action not in ACTIONS:
+            raise ValueError(f"Unsupported chain action: {action}")
+        job = ChainTxJob(
+            action=action,
+            wallet_address=Web3.to_checksum_address(wallet_address),
+            requested_by_id=requested_by_id,
+            subject_user_id=subject_user_id,
+        )
+        await job.insert()
+        self._wake.set()
+        return job
+
+    # ---- Submission ----
+
+    async def _fee_fields(self) -> Dict[str, int]:
+        now = time.monotonic()
+        if self._fees is None or now - self._fees[0] > self.fee_ttl:
+            w3 = await self.client.w3()
+            block, tip = await asyncio.gather(
+                self.client.call(w3.eth.get_block("latest")),
+                self.client.call(w3.eth.max_priority_fee),
+            )
+            fees = {
+                "maxFeePerGas": 2 * block["baseFeePerGas"] + tip,
+                "maxPriorityFeePerGas": tip,
+            }
+            self._fees = (now, fees)
+        return self._fees[1]
+
+    async def _next_nonce(self) -> int:
+        if self._nonce is None:
+            w3 = await self.client.w3()
+            self._nonce = await self.client.call(
+                w3.eth.get_transaction_count(self.client.account.address, "pending")
+            )
+        return self._nonce
+
+    async def submit_pending(self) -> int:
+        """Submit every QUEUED job, oldest first. Returns how many were sent."""
+        sent = 0
+        async with self._lock:
+            jobs = await ChainTxJob.find(ChainTxJob.status == ChainTxStatus.QUEUED).sort("+created_at").to_list()
+            for job in jobs:
+                sent += int(await self._submit(job))
+        return sent
+
+    async def _send(self, job: ChainTxJob, nonce: int, fees: Dict[str, int]) -> str:
+        w3 = await self.client.w3()
+        registry = await self.client.registry()
+        wallet = Web3.to_checksum_address(job.wallet_address)
+        if job.action == "grantRole":
+            function = registry.functions.grantRole(UNIVERSITY_ROLE, wallet)
+        else:
+            function = registry.functions.addUniversity(wallet)
+        if self._chain_id is None:
+            self._chain_id = await self.client.call(w3.eth.chain_id)
+        tx = await function.build_transaction({
+            "from": self.client.account.address,
+            "nonce": nonce,
+            "gas": self.gas_limit,
+            "chainId": self._chain_id,
+            **fees,
+        })
+        signed = self.client.account.sign_transaction(tx)
+        return Web3.to_hex(await self.client.call(w3.eth.send_raw_transaction(signed.raw_transaction)))
+
+    async def _submit(self, job: ChainTxJob) -> bool:
+        registry = await self.client.registry()
+        wallet = Web3.to_checksum_address(job.wallet_address)
+        job.attempts += 1
+        try:
+            # The role cache answers most repeats; only fall back to an
+            # eth_call when it has not seen this wallet get the role.
+            if await RoleMembership.has_role(wallet) or await self.client.call(
+                registry.functions.hasRole(UNIVERSITY_ROLE, wallet).call()
+            ):
+                job.status = ChainTxStatus.SKIPPED
+                await job.save()
+                return False
+
+            nonce = await self._next_nonce()
+            fees = await self._fee_fields()
+            tx_hash = await self._send(job, nonce, fees)
+        except Exception as exc:
+            # The nonce may or may not have been consumed; read it afresh.
+            self._nonce = None
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            if job.attempts >= 3:
+                job.status = ChainTxStatus.FAILED
+                self.failed += 1
+            job.error = detail
+            await job.save()
+            logger.warning("Chain job %s (%s) not sent: %s", job.id, job.action, detail)
+            return False
+
+        self._nonce = nonce + 1
+        job.status = ChainTxStatus.SUBMITTED
+        job.nonce = nonce
+        job.tx_hash = tx_hash
+        job.max_fee_per_gas = fees["maxFeePerGas"]
+        job.max_priority_fee_per_gas = fees["maxPriorityFeePerGas"]
+        job.error = None
+        job.submitted_at = datetime.utcnow()
+        await job.save()
+        self.submitted += 1
+        return True
+
+    # ---- Confirmation tracking ----
+
+    async def track_submitted(self) -> int:
+        """Check receipts of every SUBMITTED / STALLED job (all of each job's
+        sends) in one batch, and re-send the overdue ones. Returns how many
+        were settled."""
+        jobs = await ChainTxJob.find(
+            In(ChainTxJob.status, [ChainTxStatus.SUBMITTED, ChainTxStatus.STALLED])
+        ).to_list()
+        if not jobs:
+            return 0
+        # The mined nonce is read before the receipts: a nonce it covers with
+        # none of a job's sends mined was taken by another transaction.
+        calls = [("eth_getTransactionCount", [self.client.account.address, "latest"])]
+        for job in jobs:
+            calls += [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in [job.tx_hash, *job.replaced_tx_hashes]]
+        answers = iter(await self.client.batch(calls))
+        count = next(answers)
+        mined_nonce = int(count.result, 16) if count.error is None else None
+
+        deadline = datetime.utcnow() - timedelta(seconds=self.confirm_timeout)
+        settled = 0
+        for job in jobs:
+            receipts = [next(answers) for _ in range(1 + len(job.replaced_tx_hashes))]
+            receipt = next((a.result for a in receipts if a.error is None and a.result is not None), None)
+            if receipt is None:
+                if mined_nonce is not None and job.nonce is not None and job.nonce < mined_nonce:
+                    job.status = ChainTxStatus.FAILED
+                    job.error = f"Nonce {job.nonce} was used by another transaction"
+                    self._nonce = None
+                    self.failed += 1
+                    await job.save()
+                    settled += 1
+                elif job.submitted_at and job.submitted_at < deadline:
+                    await self._replace(job)
+                continue
+            job.tx_hash = receipt["transactionHash"]
+            job.block_number = int(receipt["blockNumber"], 16)
+            job.confirmed_at = datetime.utcnow()
+            if int(receipt["status"], 16) == 1:
+                job.status = ChainTxStatus.CONFIRMED
+                job.error = None
+                self.confirmed += 1
+            else:
+                job.status = ChainTxStatus.FAILED
+                job.error = "Transaction reverted"
+                self.failed += 1
+            await job.save()
+            settled += 1
+        return settled
+
+    async def _replace(self, job: ChainTxJob) -> None:
+        """Mark an overdue job STALLED and re-send it at its nonce with fees
+        bumped past both its last send's and the current market's."""
+        job.status = ChainTxStatus.STALLED
+        job.error = f"Not mined within {self.confirm_timeout:.0f}s"
+        replacements = len(job.replaced_tx_hashes)
+        if replacements >= self.max_replacements:
+            # Give up re-sending but keep tracking; restart the clock so
+            # the check is not repeated every pass.
+            job.submitted_at = datetime.utcnow()
+            await job.save()
+            return
+
+        bump = 100 + self.fee_bump_percent
+        async with self._lock:
+            try:
+                self._fees = None
+                market = await self._fee_fields()
+                fees = {
+                    "maxFeePerGas": max(market["maxFeePerGas"], -(-(job.max_fee_per_gas or 0) * bump // 100)),
+                    "maxPriorityFeePerGas": max(
+                        market["maxPriorityFeePerGas"], -(-(job.max_priority_fee_per_gas or 0) * bump // 100)
+                    ),
+                }
+                fees["maxFeePerGas"] = max(fees["maxFeePerGas"], fees["maxPriorityFeePerGas"])
+                tx_hash = await self._send(job, job.nonce, fees)
+            except Exception as exc:
+                # e.g. one of its sends was mined meanwhile; the next pass
+                # finds the receipt.
+                detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                job.error = f"{job.error}; replacement not sent: {detail}"
+                job.submitted_at = datetime.utcnow()
+                await job.save()
+                logger.warning("Chain job %s: replacement at nonce %s not sent: %s", job.id, job.nonce, detail)
+                return
+
+        job.replaced_tx_hashes.append(job.tx_hash)
+        job.tx_hash = tx_hash
+        job.max_fee_per_gas = fees["maxFeePerGas"]
+        job.max_priority_fee_per_gas = fees["maxPriorityFeePerGas"]
+        job.submitted_at = datetime.utcnow()
+        await job.save()
+        self.replaced += 1
+        logger.info("Chain job %s re-sent at nonce %s with higher fees as %s", job.id, job.nonce, tx_hash)
+
+    # ---- Background loops ----
+
+    async def _writer_loop(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.submit_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Transaction queue writer failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _tracker_loop(self) -> None:
+        while True:
+            try:
+                await self.track_submitted()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Transaction confirmation tracker failed")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        if self._tasks or not self.configured or not settings.TX_QUEUE_WRITER:
+            return
+        self._tasks = [
+            asyncio.create_task(self._writer_loop()),
+            asyncio.create_task(self._tracker_loop()),
+        ]
+        logger.info("Transaction queue writer started")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "writer": bool(self._tasks),
+            "nonce": self._nonce,
+            "submitted": self.submitted,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "replaced": self.replaced,
+        }
+
+
+tx_queue = TxQueue(
+    client=chain,
+    gas_limit=settings.TX_GAS_LIMIT,
+    fee_ttl=settings.TX_FEE_CACHE_SECONDS,
+    poll_seconds=settings.TX_QUEUE_POLL_SECONDS,
+    confirm_timeout=settings.TX_CONFIRM_TIMEOUT_SECONDS,
+    fee_bump_percent=settings.TX_FEE_BUMP_PERCENT,
+    max_replacements=settings.TX_MAX_REPLACEMENTS,
+)
@@ -0,0 +1,149 @@
+"""
+Benchmark a college's credential listing: full documents vs CredentialView.
+
+Seeds N credentials for one college (realistic description, metadata and
+stamped-copy fields), then builds the /degrees/ admin listing response both
+ways and prints, per path:
+
+  bytes from Mongo   BSON size of the documents the query returns
+  CPU per item       process time to load the documents and serialize the
+                     JSON body ("total"), and the same from already-fetched
+                     raw documents ("app", i.e. without driver time)
+
+before: full Credential documents -> _to_response() -> FastAPI's response
+        validation against List[CredentialResponse] -> JSONResponse
+after:  CredentialView projection -> json_list_response()
+
+Needs MONGODB_URL reachable (like the other scripts); the seeded credentials
+are deleted afterwards.
+
+Usage:  python scripts/bench_credential_listing.py [--count N] [--repeat R]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Tuple
+from uuid import uuid4
+
+import bson
+from beanie import init_beanie
+from beanie.odm.utils.projection import get_projection
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.api.routes.degrees import _to_response
+from app.core.config import settings
+from app.core.serialization import json_list_response
+from app.models.models import Credential, CredentialStatus, CredentialView
+from app.schemas.schemas import CredentialResponse
+
+COLLEGE = "Benchmark Listing University"
+
+
+def _credential(i: int) -> Credential:
+    return Credential(
+        title="Bachelor of Technology",
+        description=("Computer Engineering, with honours in distributed systems. " * 4).strip(),
+        metadata_json={
+            "student_name": f"Student {i}",
+            "branch": "Computer Engineering",
+            "cgpa": "8.7",
+            "graduation_year": 2024,
+            "division": "First Class with Distinction",
+        },
+        issued_to_id=uuid4(),
+        issued_by_id=uuid4(),
+        status=CredentialStatus.APPROVED,
+        prn_number=f"BL{i:08d}",
+        college_name=COLLEGE,
+        college_id_hash="0x" + os.urandom(32).hex(),
+        token_id=i,
+        tx_hash="0x" + os.urandom(32).hex(),
+        document_uid=f"DOC-{uuid4().hex[:12].upper()}",
+        document_path=f"/app/uploads/blobs/{os.urandom(1).hex()}/{os.urandom(32).hex()}.pdf",
+        document_sha256=os.urandom(32).hex(),
+        document_keccak256="0x" + os.urandom(32).hex(),
+        stamped_document_path=f"/app/uploads/stamped_cache/{uuid4()}.pdf",
+        stamped_document_hash=os.urandom(32).hex(),
+        stamped_document_key=os.urandom(32).hex(),
+    )
+
+
+_response_field = create_response_field(name="Response", type_=List[CredentialResponse])
+
+
+async def _before_body(creds: List[Credential]) -> bytes:
+    content = await serialize_response(
+        field=_response_field, response_content=[_to_response(c) for c in creds], is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+def _after_body(views: List[CredentialView]) -> bytes:
+    return json_list_response(CredentialView, views).body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    motor_client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(database=motor_client[settings.MONGODB_DB], document_models=[Credential])
+    collection = Credential.get_motor_collection()
+
+    await Credential.find(Credential.college_name == COLLEGE).delete()
+    for start in range(0, args.count, 1000):
+        await Credential.insert_many([_credential(i) for i in range(start, min(start + 1000, args.count))])
+
+    try:
+        where = {"college_name": COLLEGE}
+        full_raw = await collection.find(where).to_list(None)
+        view_raw = await collection.find(where, get_projection(CredentialView)).to_list(None)
+        sizes = {
+            "before": sum(len(bson.encode(d)) for d in full_raw),
+            "after": sum(len(bson.encode(d)) for d in view_raw),
+        }
+
+        async def total_before() -> bytes:
+            creds = await Credential.find(Credential.college_name == COLLEGE).to_list()
+            return await _before_body(creds)
+
+        async def total_after() -> bytes:
+            views = await Credential.find(Credential.college_name == COLLEGE, projection_model=CredentialView).to_list()
+            return _after_body(views)
+
+        async def app_before() -> bytes:
+            return await _before_body([Credential.model_validate(d) for d in full_raw])
+
+        async def app_after() -> bytes:
+            return _after_body([CredentialView.model_validate(d) for d in view_raw])
+
+        async def cpu_per_item(run) -> Tuple[float, int]:
+            best = None
+            for _ in range(args.repeat):
+                start = time.process_time()
+                body = await run()
+                elapsed = time.process_time() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best / args.count * 1e6, len(body)
+
+        print(f"{args.count} credentials of one college (best of {args.repeat})")
+        print(f"{'':8}{'bytes from Mongo':>18}{'JSON body':>12}{'CPU/item total':>16}{'CPU/item app':>14}")
+        for name, total, app in (("before", total_before, app_before), ("after", total_after, app_after)):
+            total_us, body_size = await cpu_per_item(total)
+            app_us, _ = await cpu_per_item(app)
+            print(f"{name:8}{sizes[name]:>18,}{body_size:>12,}{total_us:>13.1f} us{app_us:>11.1f} us")
+    finally:
+        await Credential.find(Credential.college_name == COLLEGE).delete()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark footer stamping cost for 1-, 10- and 50-page degree PDFs.
+
+Generates synthetic A4 documents with reportlab, stamps each one with
+render_footer_pdf (the function the render pool runs) and prints the mean
+per-document and per-page wall time. Every run starts from a cold overlay
+cache so the numbers reflect a first download, not a warmed worker.
+
+Usage:  python scripts/bench_footer_stamping.py [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.services import pdf_render
+
+PAGE_COUNTS = (1, 10, 50)
+TX_HASH = "0x" + "ab" * 32
+DOCUMENT_UID = "DOC-BENCHMARK01"
+
+
+def _make_source(path: str, pages: int) -> None:
+    c = canvas.Canvas(path, pagesize=A4)
+    for n in range(pages):
+        c.setFont("Helvetica", 14)
+        c.drawString(72, 760, f"Bachelor of Technology - page {n + 1}")
+        for line in range(40):
+            c.drawString(72, 720 - line * 16, "Lorem ipsum dolor sit amet " * 3)
+        c.showPage()
+    c.save()
+
+
+def _reset_overlay_cache() -> None:
+    for name in ("_footer_overlay_pdf", "_qr_runs"):
+        fn = getattr(pdf_render, name, None)
+        if fn is not None and hasattr(fn, "cache_clear"):
+            fn.cache_clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'pages':>5}  {'doc ms':>9}  {'page ms':>9}")
+        for pages in PAGE_COUNTS:
+            source = os.path.join(tmp, f"src_{pages}.pdf")
+            dest = os.path.join(tmp, f"out_{pages}.pdf")
+            _make_source(source, pages)
+
+            timings = []
+            for _ in range(args.repeat):
+                _reset_overlay_cache()
+                start = time.perf_counter()
+                pdf_render.render_footer_pdf(source, dest, TX_HASH, DOCUMENT_UID)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            mean = statistics.mean(timings)
+            print(f"{pages:>5}  {mean:>9.1f}  {mean / pages:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
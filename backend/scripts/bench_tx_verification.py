@@ -0,0 +1,99 @@
+"""
+Benchmark uploadDegree verification: sequential RPC calls vs JSON-RPC batches.
+
+Starts the local JSON-RPC stand-in from tests/rpc_stub.py with an injected
+per-request latency (modelling a remote provider), seeds it with N mined
+uploadDegree transactions and times three ways of fetching their
+verification facts, bypassing the verified-transaction cache:
+
+  sequential  receipt, transaction and chain head as three round trips
+  batched     one batch request per credential (the approval path)
+  bulk        every credential in batches of WEB3_MAX_BATCH_SIZE calls
+              (the /degrees/verify-transactions back-fill path)
+
+Needs MONGODB_URL reachable (like the other scripts) only so Beanie can be
+initialised; nothing is written.
+
+Usage:  python scripts/bench_tx_verification.py [--count N] [--latency MS]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.models.models import VerifiedTransaction
+from app.services import degree_service
+from app.services.chain import ChainClient, HttpBackend
+from tests.rpc_stub import RpcStub, college_id_hash
+
+
+async def _sequential(client: ChainClient, tx_hashes) -> None:
+    w3 = await client.w3()
+    for tx_hash in tx_hashes:
+        await client.call(w3.eth.get_transaction_receipt(tx_hash))
+        await client.call(w3.eth.get_transaction(tx_hash))
+        await client.call(w3.eth.block_number)
+
+
+async def _batched(client: ChainClient, tx_hashes) -> None:
+    for tx_hash in tx_hashes:
+        await degree_service._load_transactions([tx_hash], use_cache=False)
+
+
+async def _bulk(client: ChainClient, tx_hashes) -> None:
+    await degree_service._load_transactions(tx_hashes, use_cache=False)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=20.0, help="per-request latency in ms")
+    args = parser.parse_args()
+
+    # Records are built but never stored; Beanie only needs to know the model.
+    motor_client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(
+        database=motor_client[settings.MONGODB_DB],
+        document_models=[VerifiedTransaction],
+        skip_indexes=True,
+    )
+
+    stub = RpcStub(latency=args.latency / 1000)
+    url = await stub.start()
+    client = ChainClient(
+        HttpBackend(url, pool_size=settings.WEB3_POOL_SIZE),
+        call_timeout=60.0,
+        max_batch_size=settings.WEB3_MAX_BATCH_SIZE,
+    )
+    degree_service.chain = client
+    tx_hashes = [
+        stub.add_upload_degree(college_id_hash(f"PRN{i:05d}", "Bench University"), to="0x" + "5e" * 20)
+        for i in range(args.count)
+    ]
+
+    try:
+        print(f"{args.count} transactions, {args.latency:.0f} ms per HTTP request")
+        print(f"{'mode':>10}  {'total s':>8}  {'per tx ms':>9}  {'requests':>8}")
+        for name, run in (("sequential", _sequential), ("batched", _batched), ("bulk", _bulk)):
+            before = stub.http_requests
+            start = time.perf_counter()
+            await run(client, tx_hashes)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>10}  {elapsed:>8.2f}  {elapsed * 1000 / args.count:>9.2f}"
+                f"  {stub.http_requests - before:>8}"
+            )
+    finally:
+        await client.close()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Load-test degree approval with on-chain verification turned on.
+
+Seeds N pending credentials, each with a canned uploadDegree transaction in
+the in-process fake chain (app/services/chain_fake.py), then approves them
+through DegreeService.update_status with C approvals in flight, so every
+approval fetches and checks its receipt exactly as in production (minus the
+network, which --latency stands in for). Prints throughput, latency
+percentiles and how many chain requests were made; the seeded credentials
+are deleted afterwards.
+
+  --save-fixtures PATH   also write the canned chain as a fixture file, so an
+                         app started with CHAIN_BACKEND=fake and
+                         CHAIN_FAKE_FIXTURES=PATH can be load-tested over HTTP
+
+Needs MONGODB_URL reachable (like the other scripts); writes only to the
+credentials it seeds and the verified-transaction cache.
+
+Usage:  python scripts/load_test_approvals.py [--count N] [--concurrency C] [--latency MS]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.models.models import Credential, CredentialStatus, VerifiedTransaction
+from app.services import degree_service
+from app.services.chain import ChainClient, compute_college_id_hash
+from app.services.chain_fake import FakeBackend
+from app.services.degree_service import DegreeService
+from app.services.tx_cache import verified_tx_cache
+
+COLLEGE = "Load Test University"
+REGISTRY = "0x" + "5e" * 20
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=20.0, help="per-request chain latency in ms")
+    parser.add_argument("--save-fixtures")
+    args = parser.parse_args()
+
+    motor_client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(
+        database=motor_client[settings.MONGODB_DB],
+        document_models=[Credential, VerifiedTransaction],
+    )
+
+    settings.CONTRACT_REGISTRY_ADDRESS = settings.CONTRACT_REGISTRY_ADDRESS or REGISTRY
+    backend = FakeBackend(latency=args.latency / 1000)
+    client = ChainClient(backend, call_timeout=60.0, max_batch_size=settings.WEB3_MAX_BATCH_SIZE)
+    degree_service.chain = client
+
+    run = uuid4().hex[:6].upper()
+    credentials = []
+    for i in range(args.count):
+        prn = f"LT{run}{i:05d}"
+        tx_hash = backend.fake.add_upload_degree(
+            compute_college_id_hash(prn, COLLEGE), to=settings.CONTRACT_REGISTRY_ADDRESS
+        )
+        credential = Credential(
+            title="B.Tech",
+            issued_to_id=uuid4(),
+            issued_by_id=uuid4(),
+            prn_number=prn,
+            college_name=COLLEGE,
+            college_id_hash=compute_college_id_hash(prn, COLLEGE),
+            tx_hash=tx_hash,
+        )
+        await credential.insert()
+        credentials.append(credential)
+    if args.save_fixtures:
+        backend.fake.dump_fixtures(args.save_fixtures)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def approve(credential: Credential) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await DegreeService.update_status(credential.id, CredentialStatus.APPROVED)
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        verified_tx_cache.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(approve(c) for c in credentials))
+        elapsed = time.perf_counter() - start
+        await DegreeService.drain_prerenders()
+
+        latencies.sort()
+        print(
+            f"{args.count} approvals, concurrency {args.concurrency}, "
+            f"{args.latency:.0f} ms per chain request"
+        )
+        print(f"  throughput   {args.count / elapsed:8.1f} approvals/s")
+        print(f"  p50 latency  {statistics.median(latencies) * 1000:8.1f} ms")
+        print(f"  p95 latency  {latencies[int(len(latencies) * 0.95) - 1] * 1000:8.1f} ms")
+        print(f"  chain        {backend.requests} requests, {backend.fake.rpc_calls} calls")
+    finally:
+        for credential in credentials:
+            await credential.delete()
+        await VerifiedTransaction.find(
+            {"tx_hash": {"$in": list(backend.fake.transactions)}}
+        ).delete()
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Move existing uploads into the content-addressed document store.
+
+Before the store existed, degree PDFs lived at UPLOAD_DIR/{credential_id}.pdf
+and admin verification documents at uploads/verification_{user_id}.pdf
+(relative to the backend's working directory). This script hashes every file
+still referenced from its old location, places it in the store (identical
+files collapse into one blob), repoints Credential.document_path /
+User.verification_document_path and records the digests on credentials.
+
+Originals are deleted after their record is updated unless --keep-originals
+is given. Safe to re-run: records that already point into the store are
+skipped.
+
+Usage:  python scripts/migrate_document_store.py [--dry-run] [--keep-originals]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from eth_hash.auto import keccak
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.models.models import Credential, User
+from app.services.degree_service import document_store
+from app.services.pdf_cache import discard
+
+_CHUNK = 1024 * 1024
+
+
+def _digests(path: str):
+    sha256 = hashlib.sha256()
+    keccak256 = keccak.new(b"")
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            sha256.update(chunk)
+            keccak256.update(chunk)
+    return sha256.hexdigest(), "0x" + keccak256.digest().hex()
+
+
+def _migrate_file(path: str, dry_run: bool):
+    """Returns (blob path, sha256, keccak256), or None if the file is gone."""
+    if not os.path.isfile(path):
+        print(f"  ! missing on disk: {path}")
+        return None
+    sha256, keccak256 = _digests(path)
+    if dry_run:
+        return str(document_store.path_for(sha256)), sha256, keccak256
+    return str(document_store.put_file(path, sha256)), sha256, keccak256
+
+
+async def migrate(dry_run: bool, keep_originals: bool) -> None:
+    print(f"Connecting to MongoDB at {settings.MONGODB_URL}...")
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(database=client[settings.MONGODB_DB], document_models=[User, Credential])
+    print(f"Document store: {document_store.root}{' (dry run)' if dry_run else ''}")
+
+    moved = skipped = missing = 0
+    originals = []
+    blobs = set()
+
+    async for credential in Credential.find(Credential.document_path != None):  # noqa: E711
+        if document_store.contains(credential.document_path):
+            skipped += 1
+            continue
+        result = await asyncio.to_thread(_migrate_file, credential.document_path, dry_run)
+        if result is None:
+            missing += 1
+            continue
+        blob, sha256, keccak256 = result
+        blobs.add(blob)
+        print(f"  credential {credential.id}: {credential.document_path} -> {blob}")
+        if not dry_run:
+            # set() also updates the local object, so note the old path first.
+            originals.append(credential.document_path)
+            await credential.set({
+                Credential.document_path: blob,
+                Credential.document_sha256: sha256,
+                Credential.document_keccak256: keccak256,
+            })
+        moved += 1
+
+    async for user in User.find(User.verification_document_path != None):  # noqa: E711
+        if document_store.contains(user.verification_document_path):
+            skipped += 1
+            continue
+        result = await asyncio.to_thread(_migrate_file, user.verification_document_path, dry_run)
+        if result is None:
+            missing += 1
+            continue
+        blob = result[0]
+        blobs.add(blob)
+        print(f"  user {user.id}: {user.verification_document_path} -> {blob}")
+        if not dry_run:
+            originals.append(user.verification_document_path)
+            await user.set({User.verification_document_path: blob})
+        moved += 1
+
+    if originals and not keep_originals:
+        for path in originals:
+            discard(path)
+        print(f"Deleted {len(originals)} original files.")
+
+    print(f"✅ Migrated {moved} documents into {len(blobs)} blobs "
+          f"({skipped} already in the store, {missing} missing).")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would move without touching anything")
+    parser.add_argument("--keep-originals", action="store_true", help="leave the old files in place")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run, args.keep_originals))
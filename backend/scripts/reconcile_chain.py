@@ -0,0 +1,80 @@
+"""
+Compare approved credentials with the on-chain Registry and report drift.
+
+Streams credentials from Mongo, checks each against getDegree(collegeIdHash)
+with batched eth_calls and writes one JSON line per finding to the report
+file (see app/services/reconciliation.py for the drift kinds). A summary is
+printed at the end.
+
+  --fix            copy on-chain revocations (revoked / revoked_at) into the DB
+  --resume         continue an interrupted run from its checkpoint; needs
+                   --report naming that run's report, which is appended to
+  --report PATH    report file (default: reconciliation-<timestamp>.jsonl)
+  --college NAME   only credentials of one college
+  --batch-size N   credentials per round of batch requests
+  --calls-per-request N   eth_calls per JSON-RPC batch HTTP request
+
+Usage:  python scripts/reconcile_chain.py [--fix] [--report PATH]
+        python scripts/reconcile_chain.py --resume --report PATH [--fix]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.models.models import Credential, IndexerCheckpoint, User
+from app.services.chain import chain
+from app.services.reconciliation import ChainReconciler
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fix", action="store_true")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--college")
+    parser.add_argument("--report")
+    parser.add_argument("--batch-size", type=int, default=settings.RECONCILE_BATCH_SIZE)
+    parser.add_argument("--calls-per-request", type=int, default=settings.WEB3_MAX_BATCH_SIZE)
+    args = parser.parse_args()
+    if args.resume and not args.report:
+        parser.error("--resume needs --report PATH, the report of the run being resumed")
+    if args.report is None:
+        args.report = f"reconciliation-{datetime.utcnow():%Y%m%d-%H%M%S}.jsonl"
+
+    if not chain.enabled or not settings.CONTRACT_REGISTRY_ADDRESS:
+        sys.exit("WEB3_PROVIDER_URI and CONTRACT_REGISTRY_ADDRESS must be set.")
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(
+        database=client[settings.MONGODB_DB],
+        document_models=[User, Credential, IndexerCheckpoint],
+    )
+    chain.max_batch_size = max(1, args.calls_per_request)
+    reconciler = ChainReconciler(chain, batch_size=args.batch_size)
+
+    # Append when resuming so the report covers the whole run.
+    with open(args.report, "a" if args.resume else "w") as report:
+        def write(drift) -> None:
+            report.write(json.dumps(drift.as_dict(), default=str) + "\n")
+
+        try:
+            summary = await reconciler.run(
+                fix=args.fix, resume=args.resume, on_drift=write, college_name=args.college
+            )
+        finally:
+            await chain.close()
+
+    print(json.dumps(summary.as_dict(), indent=2))
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
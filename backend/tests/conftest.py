@@ -16,16 +16,21 @@ os.environ["CONTRACT_REGISTRY_ADDRESS"] = ""
 os.environ["CONTRACT_SBT_ADDRESS"] = ""
 os.environ["PRIVATE_KEY"] = ""
 os.environ["UPLOAD_DIR"] = "/tmp/altrium_test_uploads"
+os.environ["RENDER_POOL_WORKERS"] = "0"
 
+from uuid import uuid4
+
+import pytest
 import pytest_asyncio
 from beanie import init_beanie
 from httpx import AsyncClient, ASGITransport
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
+from app.core.limiter import limiter
 from app.crud.crud import UserCRUD
 from app.main import app
-from app.models.models import Credential, User, UserRole
+from app.models.models import ChainTxJob, Credential, CredentialStatus, IndexerCheckpoint, OnChainDegree, OnChainRole, User, UserRole, VerifiedTransaction
 from app.schemas.schemas import UserCreate
 
 
@@ -39,7 +44,7 @@ async def initialized_db():
     await motor_client.drop_database("altrium_test")
 
     db = motor_client["altrium_test"]
-    await init_beanie(database=db, document_models=[User, Credential])
+    await init_beanie(database=db, document_models=[User, Credential, VerifiedTransaction, OnChainDegree, OnChainRole, IndexerCheckpoint, ChainTxJob])
 
     # Seed superadmin (mirrors app/main.py lifespan logic)
     existing = await UserCRUD.get_by_email(settings.SUPERADMIN_EMAIL)
@@ -74,6 +79,14 @@ async def client(initialized_db) -> AsyncClient:
         yield c
 
 
+@pytest.fixture(autouse=True)
+def _reset_rate_limits():
+    """Every request in the session comes from the same client address, so
+    start each test with empty rate-limit counters."""
+    limiter.reset()
+    yield
+
+
 # ─── Shared user fixtures ─────────────────────────────────────────────────────
 
 @pytest_asyncio.fixture(scope="session")
@@ -137,3 +150,31 @@ async def student_token(client: AsyncClient, registered_student: dict) -> str:
     )
     assert r.status_code == 200, f"Student login failed: {r.text}"
     return r.json()["access_token"]
+
+
+@pytest_asyncio.fixture
+async def make_credential(initialized_db):
+    """
+    Factory inserting an APPROVED credential for unrelated placeholder users;
+    any field can be overridden. Everything it made is deleted after the test
+    so session-wide listings in other test modules don't see it.
+    """
+    created = []
+
+    async def make(**fields) -> Credential:
+        credential = Credential(
+            **{
+                "title": "B.Tech",
+                "issued_to_id": uuid4(),
+                "issued_by_id": uuid4(),
+                "status": CredentialStatus.APPROVED,
+                **fields,
+            }
+        )
+        await credential.insert()
+        created.append(credential)
+        return credential
+
+    yield make
+    for credential in created:
+        await credential.delete()
@@ -0,0 +1,53 @@
+"""
+The in-process FakeChain (app/services/chain_fake.py) served over a real
+local HTTP socket, for tests and benchmarks that exercise the HttpBackend
+path end to end. Everything except the transport is FakeChain's: seeding
+(`add_upload_degree`, `emit`, `set_degree`, `roles`), the sending side and
+the `rpc_calls` / `methods` counters. `http_requests` counts HTTP requests so
+tests can assert how many round trips a code path made; `latency` adds a
+per-request delay to model a remote provider.
+"""
+import asyncio
+import json
+from typing import Optional
+
+from aiohttp import web
+from web3 import Web3
+
+from app.services.chain_fake import FakeChain
+
+
+class RpcStub(FakeChain):
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__()
+        self.latency = latency
+        self.http_requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        body = json.loads(await request.read())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response(self.answer(body))
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def college_id_hash(prn_number: str, college_name: str) -> str:
+    value = Web3.keccak(text=f"{prn_number}-{college_name}").hex()
+    return value if value.startswith("0x") else "0x" + value
@@ -0,0 +1,59 @@
+"""
+Unit tests for the content-addressed document store (app/services/blob_store.py).
+"""
+import hashlib
+import io
+
+from fastapi import UploadFile
+from reportlab.pdfgen import canvas
+from starlette.datastructures import Headers
+
+from app.services.blob_store import BlobStore
+from app.services.pdf_validation import validate_pdf_upload
+
+
+def _make_pdf() -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    c.drawString(72, 720, "verification")
+    c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+_PDF = _make_pdf()
+
+
+async def _validated(store: BlobStore, data: bytes = _PDF):
+    upload = UploadFile(io.BytesIO(data), filename="x.pdf", headers=Headers({"content-type": "application/pdf"}))
+    return await validate_pdf_upload(upload, store.spool_dir)
+
+
+class TestBlobStore:
+    def test_paths_fan_out_by_digest(self, tmp_path):
+        store = BlobStore(tmp_path)
+        digest = hashlib.sha256(b"x").hexdigest()
+        path = store.path_for(digest)
+        assert path == tmp_path / digest[:2] / digest[2:4] / f"{digest}.pdf"
+        assert store.digest_of(path) == digest
+        assert store.contains(path)
+        assert not store.contains(tmp_path.parent / "elsewhere.pdf")
+        assert not store.contains(None)
+
+    async def test_identical_uploads_share_one_blob(self, tmp_path):
+        store = BlobStore(tmp_path)
+        first = await store.put(await _validated(store))
+        second = await store.put(await _validated(store))
+        assert first == second
+        assert first.read_bytes() == _PDF
+        assert store.digest_of(first) == hashlib.sha256(_PDF).hexdigest()
+        # The duplicate's spool file was dropped, not left behind.
+        assert list(store.spool_dir.iterdir()) == []
+
+    def test_put_file_copies_existing_file_in(self, tmp_path):
+        store = BlobStore(tmp_path / "store")
+        legacy = tmp_path / "legacy.pdf"
+        legacy.write_bytes(_PDF)
+        blob = store.put_file(legacy, hashlib.sha256(_PDF).hexdigest())
+        assert blob.read_bytes() == _PDF
+        assert legacy.exists()
@@ -0,0 +1,226 @@
+"""
+Tests for the shared async Web3 client (app/services/chain.py), the
+uploadDegree verification built on it and the verified-transaction cache,
+against a local JSON-RPC stand-in and the in-process fake backend.
+"""
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services import degree_service
+from app.models.models import CredentialStatus, User, UserRole, VerifiedTransaction
+from app.services.chain import ChainBackend, ChainClient, HttpBackend, backend_from_settings
+from app.services.chain_fake import FakeBackend, FakeChain
+from app.services.tx_cache import verified_tx_cache
+from tests.rpc_stub import RpcStub, college_id_hash
+
+REGISTRY = "0x" + "5e" * 20
+
+
+@pytest_asyncio.fixture
+async def rpc(monkeypatch, initialized_db):
+    # Stub tx hashes repeat across tests, so start every test with a cold cache.
+    await VerifiedTransaction.delete_all()
+    verified_tx_cache.clear()
+    stub = RpcStub()
+    url = await stub.start()
+    client = ChainClient(HttpBackend(url, pool_size=4), call_timeout=2.0)
+    monkeypatch.setattr(degree_service, "chain", client)
+    monkeypatch.setattr(settings, "CONTRACT_REGISTRY_ADDRESS", REGISTRY)
+    yield stub, client
+    await client.close()
+    await stub.stop()
+
+
+class TestChainClient:
+    async def test_verifies_upload_degree_transaction(self, rpc):
+        stub, client = rpc
+        expected = college_id_hash("AU2024001", "Altrium University")
+        tx_hash = stub.add_upload_degree(expected, to=REGISTRY)
+
+        assert await degree_service._verify_blockchain_transaction(tx_hash, expected) is True
+        # Receipt, transaction and chain head go out as one batch request.
+        assert stub.rpc_calls == 3
+        assert stub.http_requests == 1
+
+        # The client (and its contract objects) are reused, not rebuilt.
+        registry = await client.registry()
+        await degree_service._verify_blockchain_transaction(tx_hash, expected)
+        assert await client.registry() is registry
+
+    async def test_rejects_wrong_college_hash(self, rpc):
+        stub, _ = rpc
+        tx_hash = stub.add_upload_degree(college_id_hash("AU1", "Other"), to=REGISTRY)
+        with pytest.raises(HTTPException) as exc:
+            await degree_service._verify_blockchain_transaction(
+                tx_hash, college_id_hash("AU2024001", "Altrium University")
+            )
+        assert exc.value.status_code == 400
+        assert "College ID Hash mismatch" in exc.value.detail
+
+    async def test_rejects_failed_or_misdirected_transactions(self, rpc):
+        stub, _ = rpc
+        expected = college_id_hash("AU2024001", "Altrium University")
+        failed = stub.add_upload_degree(expected, to=REGISTRY, status=0)
+        elsewhere = stub.add_upload_degree(expected, to="0x" + "99" * 20)
+        for tx_hash in (failed, elsewhere, "0x" + "ff" * 32):
+            with pytest.raises(HTTPException) as exc:
+                await degree_service._verify_blockchain_transaction(tx_hash, expected)
+            assert exc.value.status_code == 400
+
+    async def test_slow_provider_times_out(self, rpc):
+        stub, client = rpc
+        stub.latency = 0.5
+        client.call_timeout = 0.1
+        expected = college_id_hash("AU2024001", "Altrium University")
+        tx_hash = stub.add_upload_degree(expected, to=REGISTRY)
+        with pytest.raises(HTTPException) as exc:
+            await degree_service._verify_blockchain_transaction(tx_hash, expected)
+        assert exc.value.status_code == 504
+
+
+class TestVerifiedTxCache:
+    async def test_repeat_verification_costs_no_rpc_calls(self, rpc):
+        stub, _ = rpc
+        expected = college_id_hash("AU2024001", "Altrium University")
+        tx_hash = stub.add_upload_degree(expected, to=REGISTRY)
+
+        await degree_service._verify_blockchain_transaction(tx_hash, expected)
+        calls = stub.rpc_calls
+        await degree_service._verify_blockchain_transaction(tx_hash, expected)
+        assert stub.rpc_calls == calls
+
+        # Cold process: the Mongo copy still answers without the RPC.
+        verified_tx_cache.clear()
+        await degree_service._verify_blockchain_transaction(tx_hash.upper().replace("0X", "0x"), expected)
+        assert stub.rpc_calls == calls
+
+        record = await VerifiedTransaction.find_one(VerifiedTransaction.tx_hash == tx_hash)
+        assert record.function_name == "uploadDegree"
+        assert record.college_id_hash == expected
+        assert record.to_address.lower() == REGISTRY
+        assert record.status == 1
+
+    async def test_cached_facts_still_enforce_the_checks(self, rpc):
+        stub, _ = rpc
+        expected = college_id_hash("AU2024001", "Altrium University")
+        tx_hash = stub.add_upload_degree(expected, to=REGISTRY)
+        await degree_service._verify_blockchain_transaction(tx_hash, expected)
+
+        with pytest.raises(HTTPException) as exc:
+            await degree_service._verify_blockchain_transaction(tx_hash, college_id_hash("X", "Y"))
+        assert exc.value.status_code == 400
+
+    async def test_recent_transactions_are_not_cached(self, rpc):
+        stub, _ = rpc
+        expected = college_id_hash("AU2024001", "Altrium University")
+        tx_hash = stub.add_upload_degree(expected, to=REGISTRY, block_number=stub.block_number - 1)
+
+        await degree_service._verify_blockchain_transaction(tx_hash, expected)
+        calls = stub.rpc_calls
+        await degree_service._verify_blockchain_transaction(tx_hash, expected)
+        assert stub.rpc_calls == calls * 2
+        assert await VerifiedTransaction.find_one(VerifiedTransaction.tx_hash == tx_hash) is None
+
+
+class TestBulkVerification:
+    async def test_batches_hundreds_of_transactions(self, rpc, make_credential):
+        stub, client = rpc
+        client.max_batch_size = 100
+        credentials = []
+        for i in range(150):
+            prn = f"AU{i:04d}"
+            tx_hash = stub.add_upload_degree(college_id_hash(prn, "Altrium University"), to=REGISTRY)
+            credentials.append(await make_credential(prn_number=prn, college_name="Altrium University", tx_hash=tx_hash))
+        superadmin = User(email="bulk@altrium.test", hashed_password="x", role=UserRole.SUPERADMIN)
+
+        results = await degree_service.DegreeService.verify_transactions([c.id for c in credentials], superadmin)
+        assert [r.credential_id for r in results] == [c.id for c in credentials]
+        assert all(r.verified for r in results)
+        # 1 + 2 * 150 calls, 100 per HTTP request.
+        assert stub.rpc_calls == 301
+        assert stub.http_requests == 4
+
+    async def test_failures_are_reported_per_credential(self, rpc, make_credential):
+        stub, _ = rpc
+        good = await make_credential(prn_number="AU1", college_name="Altrium University", tx_hash=stub.add_upload_degree(college_id_hash("AU1", "Altrium University"), to=REGISTRY))
+        wrong = await make_credential(prn_number="AU2", college_name="Altrium University", tx_hash=stub.add_upload_degree(college_id_hash("AU9", "Altrium University"), to=REGISTRY))
+        missing = await make_credential(prn_number="AU3", college_name="Altrium University", tx_hash="0x" + "ff" * 32)
+        untracked = await make_credential(prn_number="AU4", college_name="Altrium University", tx_hash=None)
+        other = await make_credential(prn_number="OT1", college_name="Other University", tx_hash=good.tx_hash)
+        admin = User(
+            email="bulk-admin@altrium.test",
+            hashed_password="x",
+            role=UserRole.ADMIN,
+            college_name="Altrium University",
+        )
+
+        ids = [good.id, wrong.id, missing.id, untracked.id, other.id, uuid4()]
+        results = await degree_service.DegreeService.verify_transactions(ids, admin)
+        assert [r.verified for r in results] == [True, False, False, False, False, False]
+        assert "College ID Hash mismatch" in results[1].detail
+        assert results[2].detail == "Blockchain transaction failed or not found."
+        assert results[3].detail == "No blockchain transaction recorded"
+        assert results[4].detail == "Not authorized to verify this credential"
+        assert results[5].detail == "Credential not found"
+        assert stub.http_requests == 1
+
+
+@pytest_asyncio.fixture
+async def fake_chain(monkeypatch, initialized_db):
+    await VerifiedTransaction.delete_all()
+    verified_tx_cache.clear()
+    backend = FakeBackend()
+    client = ChainClient(backend, call_timeout=2.0)
+    monkeypatch.setattr(degree_service, "chain", client)
+    monkeypatch.setattr(settings, "CONTRACT_REGISTRY_ADDRESS", REGISTRY)
+    yield backend, client
+    await client.close()
+
+
+class TestFakeBackend:
+    async def test_approval_verifies_in_process(self, fake_chain, make_credential):
+        backend, client = fake_chain
+        assert await client.is_connected()
+        tx_hash = backend.fake.add_upload_degree(college_id_hash("FK1", "Altrium University"), to=REGISTRY)
+        good = await make_credential(prn_number="FK1", college_name="Altrium University", tx_hash=tx_hash)
+        wrong = await make_credential(prn_number="FK2", college_name="Altrium University", tx_hash=tx_hash)
+
+        requests = backend.requests
+        approved = await degree_service.DegreeService.update_status(good.id, CredentialStatus.APPROVED)
+        assert approved.status == CredentialStatus.APPROVED
+        assert backend.requests - requests == 1
+        with pytest.raises(HTTPException) as exc:
+            await degree_service.DegreeService.update_status(wrong.id, CredentialStatus.APPROVED)
+        assert "College ID Hash mismatch" in exc.value.detail
+
+    async def test_replays_canned_fixtures(self, fake_chain, monkeypatch, tmp_path):
+        recorded = FakeChain()
+        expected = college_id_hash("FK3", "Altrium University")
+        tx_hash = recorded.add_upload_degree(expected, to=REGISTRY)
+        recorded.dump_fixtures(str(tmp_path / "chain.json"))
+
+        monkeypatch.setattr(settings, "CHAIN_BACKEND", "fake")
+        monkeypatch.setattr(settings, "CHAIN_FAKE_FIXTURES", str(tmp_path / "chain.json"))
+        monkeypatch.setattr(settings, "CHAIN_FAKE_LATENCY_MS", 5.0)
+        backend = backend_from_settings()
+        assert isinstance(backend, FakeBackend) and backend.latency == 0.005
+
+        client = ChainClient(backend, call_timeout=2.0)
+        monkeypatch.setattr(degree_service, "chain", client)
+        assert await degree_service._verify_blockchain_transaction(tx_hash, expected) is True
+        assert backend.fake.methods == ["eth_blockNumber", "eth_getTransactionReceipt", "eth_getTransactionByHash"]
+        await client.close()
+
+    def test_incomplete_backend_fails_on_instantiation(self):
+        class NoPost(ChainBackend):
+            enabled = True
+
+            async def start(self, timeout):
+                return None
+
+        with pytest.raises(TypeError, match="post"):
+            NoPost()
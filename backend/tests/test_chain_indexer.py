@@ -0,0 +1,135 @@
+"""
+Tests for the degree event indexer (app/services/chain_indexer.py) against the
+local JSON-RPC stand-in, and the on-chain revocation it exposes publicly.
+"""
+from uuid import uuid4
+
+import pytest_asyncio
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.models.models import IndexerCheckpoint, OnChainDegree
+from app.services.chain import ChainClient, HttpBackend
+from app.services.chain_indexer import ChainIndexer
+from tests.rpc_stub import RpcStub, college_id_hash
+
+SBT = "0x" + "5b" * 20
+REGISTRY = "0x" + "5e" * 20
+ISSUER = "0x" + "aa" * 20
+WALLET = "0x" + "cc" * 20
+
+
+@pytest_asyncio.fixture
+async def indexed_chain(monkeypatch, initialized_db):
+    await OnChainDegree.delete_all()
+    await IndexerCheckpoint.delete_all()
+    stub = RpcStub()
+    url = await stub.start()
+    client = ChainClient(HttpBackend(url, pool_size=4), call_timeout=2.0)
+    monkeypatch.setattr(settings, "CONTRACT_SBT_ADDRESS", SBT)
+    monkeypatch.setattr(settings, "CONTRACT_REGISTRY_ADDRESS", REGISTRY)
+    indexer = ChainIndexer(client, start_block=0, block_range=10, confirmations=12, poll_seconds=0.01)
+    yield stub, indexer
+    await client.close()
+    await stub.stop()
+    await OnChainDegree.delete_all()
+    await IndexerCheckpoint.delete_all()
+
+
+def _mint(stub: RpcStub, token_id: int, hash_: str, block: int) -> None:
+    stub.emit(
+        SBT, "DegreeMinted", block,
+        tokenId=token_id,
+        collegeIdHash=bytes.fromhex(hash_[2:]),
+        issuedBy=ISSUER,
+        degreeHash=b"\x22" * 32,
+        tokenURI=f"ipfs://degree/{token_id}",
+    )
+
+
+class TestChainIndexer:
+    async def test_projects_degree_events_in_block_ranges(self, indexed_chain):
+        stub, indexer = indexed_chain
+        first = college_id_hash("AU1", "Altrium University")
+        second = college_id_hash("AU2", "Altrium University")
+        _mint(stub, 1, first, block=5)
+        _mint(stub, 2, second, block=17)
+        stub.emit(SBT, "DegreeVerified", 20, tokenId=2, verified=True, verifier=ISSUER)
+        stub.emit(REGISTRY, "StudentWalletLinked", 30, collegeIdHash=bytes.fromhex(first[2:]), studentWallet=WALLET)
+        stub.emit(
+            SBT, "DegreeRevoked", 40,
+            tokenId=1, collegeIdHash=bytes.fromhex(first[2:]), revokedBy=ISSUER, revokedAt=1_700_000_000,
+        )
+        stub.block_number = 60
+
+        assert await indexer.run_once() == 5
+        assert await indexer.checkpoint() == 48
+
+        revoked = await OnChainDegree.find_one(OnChainDegree.college_id_hash == first)
+        assert revoked.token_id == 1
+        assert revoked.revoked is True
+        assert revoked.revoked_at.year == 2023
+        assert revoked.student_wallet.lower() == WALLET
+        verified = await OnChainDegree.find_one(OnChainDegree.college_id_hash == second)
+        assert verified.verified is True and verified.revoked is False
+        assert verified.token_uri == "ipfs://degree/2"
+
+    async def test_waits_for_confirmations(self, indexed_chain):
+        stub, indexer = indexed_chain
+        hash_ = college_id_hash("AU1", "Altrium University")
+        _mint(stub, 1, hash_, block=5)
+        stub.emit(
+            SBT, "DegreeRevoked", 45,
+            tokenId=1, collegeIdHash=bytes.fromhex(hash_[2:]), revokedBy=ISSUER, revokedAt=1_700_000_000,
+        )
+        stub.block_number = 50
+
+        assert await indexer.run_once() == 1
+        assert (await OnChainDegree.find_one(OnChainDegree.college_id_hash == hash_)).revoked is False
+
+        stub.block_number = 57
+        assert await indexer.run_once() == 1
+        assert (await OnChainDegree.find_one(OnChainDegree.college_id_hash == hash_)).revoked is True
+
+    async def test_replaying_a_range_changes_nothing(self, indexed_chain):
+        stub, indexer = indexed_chain
+        hash_ = college_id_hash("AU1", "Altrium University")
+        _mint(stub, 1, hash_, block=5)
+        stub.emit(
+            SBT, "DegreeRevoked", 6,
+            tokenId=1, collegeIdHash=bytes.fromhex(hash_[2:]), revokedBy=ISSUER, revokedAt=1_700_000_000,
+        )
+        stub.block_number = 30
+        await indexer.run_once()
+
+        # Crash after writing projections but before the checkpoint landed.
+        await IndexerCheckpoint.delete_all()
+        assert await indexer.run_once() == 0
+        assert (await OnChainDegree.find_one(OnChainDegree.college_id_hash == hash_)).revoked is True
+
+
+class TestPublicOnchainRevocation:
+    async def test_public_lookup_reports_indexed_revocation(self, client: AsyncClient, indexed_chain, make_credential):
+        prn = f"IDX{uuid4().hex[:8]}"
+        credential = await make_credential(
+            prn_number=prn,
+            college_name="Altrium University",
+            college_id_hash=college_id_hash(prn, "Altrium University"),
+        )
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}")
+        assert r.status_code == 200
+        assert r.json()[0]["onchain_revoked"] is None
+
+        # Indexing the revocation also invalidates the cached lookup.
+        stub, indexer = indexed_chain
+        _mint(stub, 9, credential.college_id_hash, block=5)
+        stub.emit(
+            SBT, "DegreeRevoked", 6,
+            tokenId=9, collegeIdHash=bytes.fromhex(credential.college_id_hash[2:]),
+            revokedBy=ISSUER, revokedAt=1_700_000_000,
+        )
+        stub.block_number = 30
+        await indexer.run_once()
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}")
+        assert r.json()[0]["onchain_revoked"] is True
+        assert r.json()[0]["revoked"] is False
@@ -0,0 +1,72 @@
+"""
+Tests for the stored collegeIdHash on credentials: computed at create, unique
+among credentials registered on-chain, and the public by-hash lookup.
+"""
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.crud.crud import CredentialCRUD
+from app.models.models import Credential
+from app.schemas.schemas import CredentialCreate, CredentialStatus, CredentialUpdate
+from app.services.degree_service import DegreeService
+from tests.rpc_stub import college_id_hash
+
+COLLEGE = "Altrium University"
+
+
+@pytest_asyncio.fixture
+async def prn(initialized_db):
+    prn = f"HASH{uuid4().hex[:8]}"
+    yield prn
+    await Credential.find(Credential.prn_number == prn).delete()
+
+
+class TestCollegeIdHash:
+    async def test_stored_at_create(self, prn):
+        credential = await CredentialCRUD.create(
+            CredentialCreate(title="B.Tech", prn_number=prn, college_name=COLLEGE),
+            issued_to_id=uuid4(),
+            issued_by_id=uuid4(),
+        )
+        assert credential.college_id_hash == college_id_hash(prn, COLLEGE)
+        assert (await Credential.get(credential.id)).college_id_hash == credential.college_id_hash
+
+    async def test_only_one_registered_credential_per_hash(self, prn, make_credential):
+        # Two submissions of the same degree, the hash stored at create.
+        pending = dict(
+            prn_number=prn,
+            college_name=COLLEGE,
+            college_id_hash=college_id_hash(prn, COLLEGE),
+            status=CredentialStatus.PENDING,
+        )
+        first, second = await make_credential(**pending), await make_credential(**pending)
+        await DegreeService.update(first.id, CredentialUpdate(tx_hash="0x" + "11" * 32))
+        with pytest.raises(HTTPException) as exc:
+            await DegreeService.update(second.id, CredentialUpdate(tx_hash="0x" + "22" * 32))
+        assert exc.value.status_code == 409
+        assert (await Credential.get(second.id)).tx_hash is None
+
+    async def test_public_lookup_by_hash(self, client: AsyncClient, prn, make_credential):
+        credential = await make_credential(
+            prn_number=prn,
+            college_name=COLLEGE,
+            college_id_hash=college_id_hash(prn, COLLEGE),
+            status=CredentialStatus.PENDING,
+        )
+        hash_ = college_id_hash(prn, COLLEGE)
+
+        r = await client.get(f"/api/v1/degrees/by-hash/{hash_}")
+        assert r.status_code == 404
+
+        await DegreeService.update_status(credential.id, CredentialStatus.APPROVED)
+        r = await client.get(f"/api/v1/degrees/by-hash/{hash_.upper().replace('0X', '0x')}")
+        assert r.status_code == 200
+        assert r.json()["id"] == str(credential.id)
+        assert r.json()["college_id_hash"] == hash_
+
+        r = await client.get("/api/v1/degrees/by-hash/0x1234")
+        assert r.status_code == 422
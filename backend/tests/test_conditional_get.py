@@ -0,0 +1,99 @@
+"""
+Tests for conditional GETs on the credential listings: weak ETag and
+Last-Modified on /degrees/, /credentials/ and /degrees/public, and 304s that
+are answered without loading the listing.
+"""
+from uuid import UUID, uuid4
+
+import pytest
+from beanie.odm.queries.find import FindMany
+from httpx import AsyncClient
+
+from app.models.models import OnChainDegree
+from app.schemas.schemas import CredentialStatus, CredentialUpdate
+from app.services.chain import compute_college_id_hash
+from app.services.degree_service import DegreeService
+
+
+@pytest.fixture
+def prn():
+    return f"COND{uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def listings_loaded(monkeypatch):
+    """Number of listing queries executed meanwhile."""
+    calls = []
+    original = FindMany.to_list
+
+    async def counting(self, *args, **kwargs):
+        calls.append(self)
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(FindMany, "to_list", counting)
+    return calls
+
+
+class TestListConditionalGet:
+    @pytest.mark.parametrize("url", ["/api/v1/degrees/", "/api/v1/credentials/"])
+    async def test_revalidation(
+        self, client: AsyncClient, student_token, registered_student, make_credential, prn, url, listings_loaded
+    ):
+        auth = {"Authorization": f"Bearer {student_token}"}
+        credential = await make_credential(
+            prn_number=prn,
+            college_name="Altrium University",
+            issued_to_id=UUID(registered_student["id"]),
+            status=CredentialStatus.PENDING,
+        )
+        r = await client.get(url, headers=auth)
+        assert r.status_code == 200
+        etag, last_modified = r.headers["etag"], r.headers["last-modified"]
+        assert etag.startswith('W/"') and r.headers["cache-control"] == "private, no-cache"
+
+        listings_loaded.clear()
+        r = await client.get(url, headers={**auth, "If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+        r = await client.get(url, headers={**auth, "If-Modified-Since": last_modified})
+        assert r.status_code == 304
+        assert listings_loaded == []
+
+        await DegreeService.update(credential.id, CredentialUpdate(description="Edited"))
+        r = await client.get(url, headers={**auth, "If-None-Match": etag})
+        assert r.status_code == 200 and r.headers["etag"] != etag
+        etag = r.headers["etag"]
+
+        # Deletions leave Last-Modified alone but change the ETag.
+        await credential.delete()
+        r = await client.get(url, headers={**auth, "If-None-Match": etag})
+        assert r.status_code == 200 and str(credential.id) not in r.text
+
+
+class TestPublicConditionalGet:
+    @pytest.mark.parametrize("extra", ["", "&limit=10"])
+    async def test_revalidation(self, client: AsyncClient, make_credential, prn, extra, listings_loaded):
+        url = f"/api/v1/degrees/public?prn_number={prn}{extra}"
+        credential = await make_credential(prn_number=prn, college_name="Altrium University")
+        r = await client.get(url)
+        etag = r.headers["etag"]
+        assert r.headers["cache-control"] == "public, no-cache" and "last-modified" in r.headers
+
+        listings_loaded.clear()
+        r = await client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert listings_loaded == []
+
+        # Indexed on-chain revocation changes what the page shows.
+        record = OnChainDegree(
+            college_id_hash=compute_college_id_hash(prn, credential.college_name), revoked=True
+        )
+        await record.insert()
+        try:
+            if not extra:
+                # The cached first page is dropped by the indexer, not here.
+                await DegreeService.update(credential.id, CredentialUpdate(description="Edited"))
+            r = await client.get(url, headers={"If-None-Match": etag})
+            assert r.status_code == 200 and r.headers["etag"] != etag
+            assert r.json()[0]["onchain_revoked"] is True
+        finally:
+            await record.delete()
@@ -0,0 +1,50 @@
+"""
+Tests for the CredentialView projection: it serializes exactly like
+CredentialResponse and is loaded without the fields responses never show.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+import pytest_asyncio
+
+from app.api.routes.degrees import _to_response
+from app.crud.crud import CredentialCRUD
+from app.models.models import Credential, CredentialView
+from app.schemas.schemas import CredentialResponse
+
+
+@pytest_asyncio.fixture
+async def credential(make_credential):
+    return await make_credential(
+        description="Computer Engineering",
+        metadata_json={"cgpa": "9.1", "year": 2024},
+        prn_number=f"VIEW{uuid4().hex[:8]}",
+        college_name="Altrium University",
+        college_id_hash="0x" + "cd" * 32,
+        token_id=7,
+        tx_hash="0x" + "ab" * 32,
+        document_uid="DOC-VIEW00000001",
+        document_path="/app/uploads/blobs/ab/abcdef.pdf",
+        document_sha256="ab" * 32,
+        document_keccak256="0x" + "ef" * 32,
+        stamped_document_path="/app/uploads/stamped_cache/x.pdf",
+        stamped_document_hash="12" * 32,
+        stamped_document_key="34" * 32,
+        revoked=True,
+        revoked_at=datetime(2030, 1, 2),
+    )
+
+
+class TestCredentialView:
+    async def test_serializes_like_credential_response(self, credential):
+        [view] = await CredentialCRUD.get_by_user(credential.issued_to_id, projection=CredentialView)
+        stored = await Credential.get(credential.id)
+        expected = CredentialResponse.model_validate(_to_response(stored)).model_dump(mode="json")
+        assert view.model_dump(mode="json") == expected
+        assert expected["has_document"] is True
+
+    async def test_projection_leaves_internal_fields_on_the_server(self, credential):
+        query = CredentialCRUD.query_approved(prn_number=credential.prn_number, projection=CredentialView)
+        raw = await query.motor_cursor.to_list(None)
+        assert len(raw) == 1
+        assert not {"stamped_document_path", "stamped_document_hash", "stamped_document_key", "revision_id"} & raw[0].keys()
@@ -0,0 +1,253 @@
+"""
+End-to-end tests for the degree PDF download path: stamped rendering,
+ETag / If-None-Match, byte-range requests and the bulk ZIP export.
+"""
+import csv
+import io
+import os
+import zipfile
+from uuid import UUID
+
+import pytest_asyncio
+from httpx import AsyncClient
+from reportlab.pdfgen import canvas
+
+from app.models.models import Credential
+from app.services.degree_service import DegreeService
+
+
+def _sample_pdf(pages: int = 2) -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    for n in range(pages):
+        c.drawString(72, 720, f"Degree certificate page {n + 1}")
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def approved_degree(
+    client: AsyncClient,
+    student_token: str,
+    admin_token: str,
+    superadmin_token: str,
+    registered_admin: dict,
+) -> dict:
+    # Approving needs a verified admin with a wallet; both calls are idempotent.
+    verify = await client.post(
+        f"/api/v1/users/verify-admin/{registered_admin['id']}",
+        headers={"Authorization": f"Bearer {superadmin_token}"},
+    )
+    assert verify.status_code == 200
+    wallet = await client.patch(
+        "/api/v1/users/me/wallet",
+        json={"wallet_address": "0x1234567890abcdef1234567890abcdef12345678"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert wallet.status_code == 200
+
+    create = await client.post(
+        "/api/v1/degrees/",
+        json={"title": "Bachelor of Design"},
+        headers={"Authorization": f"Bearer {student_token}"},
+    )
+    assert create.status_code == 200
+    cred_id = create.json()["id"]
+
+    upload = await client.post(
+        f"/api/v1/degrees/{cred_id}/document",
+        files={"file": ("degree.pdf", _sample_pdf(), "application/pdf")},
+        headers={"Authorization": f"Bearer {student_token}"},
+    )
+    assert upload.status_code == 200, upload.text
+
+    approve = await client.patch(
+        f"/api/v1/degrees/{cred_id}/status",
+        params={"status": "APPROVED"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert approve.status_code == 200
+    return approve.json()
+
+
+class TestDocumentDownload:
+    async def test_stamped_download_has_strong_etag(
+        self, client: AsyncClient, student_token: str, approved_degree: dict
+    ):
+        r = await client.get(
+            f"/api/v1/degrees/{approved_degree['id']}/document",
+            headers={"Authorization": f"Bearer {student_token}"},
+        )
+        assert r.status_code == 200
+        assert r.content.startswith(b"%PDF-")
+        assert r.headers["accept-ranges"] == "bytes"
+        assert r.headers["etag"].startswith('"')
+        assert int(r.headers["content-length"]) == len(r.content)
+
+    async def test_approval_prerenders_stamped_artifact(
+        self, client: AsyncClient, student_token: str, approved_degree: dict
+    ):
+        await DegreeService.drain_prerenders()
+        cred = await Credential.get(UUID(approved_degree["id"]))
+        assert cred.stamped_document_key
+        assert cred.stamped_document_hash
+        assert os.path.isfile(cred.stamped_document_path)
+
+        r = await client.get(
+            f"/api/v1/degrees/{approved_degree['id']}/document",
+            headers={"Authorization": f"Bearer {student_token}"},
+        )
+        assert r.status_code == 200
+        assert r.headers["etag"] == f'"{cred.stamped_document_key}"'
+        with open(cred.stamped_document_path, "rb") as fh:
+            assert r.content == fh.read()
+
+    async def test_if_none_match_returns_304(
+        self, client: AsyncClient, student_token: str, approved_degree: dict
+    ):
+        url = f"/api/v1/degrees/{approved_degree['id']}/document"
+        auth = {"Authorization": f"Bearer {student_token}"}
+        etag = (await client.get(url, headers=auth)).headers["etag"]
+
+        r = await client.get(url, headers={**auth, "If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["etag"] == etag
+
+    async def test_range_request_returns_partial_content(
+        self, client: AsyncClient, student_token: str, approved_degree: dict
+    ):
+        url = f"/api/v1/degrees/{approved_degree['id']}/document"
+        auth = {"Authorization": f"Bearer {student_token}"}
+        full = (await client.get(url, headers=auth)).content
+
+        r = await client.get(url, headers={**auth, "Range": "bytes=0-99"})
+        assert r.status_code == 206
+        assert r.content == full[:100]
+        assert r.headers["content-range"] == f"bytes 0-99/{len(full)}"
+
+        tail = await client.get(url, headers={**auth, "Range": "bytes=-50"})
+        assert tail.status_code == 206
+        assert tail.content == full[-50:]
+
+    async def test_unsatisfiable_range_returns_416(
+        self, client: AsyncClient, student_token: str, approved_degree: dict
+    ):
+        r = await client.get(
+            f"/api/v1/degrees/{approved_degree['id']}/document",
+            headers={"Authorization": f"Bearer {student_token}", "Range": "bytes=999999999-"},
+        )
+        assert r.status_code == 416
+        assert r.headers["content-range"].startswith("bytes */")
+
+    async def test_etag_changes_after_reupload(
+        self, client: AsyncClient, student_token: str, approved_degree: dict
+    ):
+        url = f"/api/v1/degrees/{approved_degree['id']}/document"
+        auth = {"Authorization": f"Bearer {student_token}"}
+        before = (await client.get(url, headers=auth)).headers["etag"]
+
+        upload = await client.post(
+            url,
+            files={"file": ("degree.pdf", _sample_pdf(pages=3), "application/pdf")},
+            headers=auth,
+        )
+        assert upload.status_code == 200
+
+        after = await client.get(url, headers={**auth, "If-None-Match": before})
+        assert after.status_code == 200
+        assert after.headers["etag"] != before
+
+
+class TestBulkExport:
+    async def test_export_streams_zip_of_stamped_pdfs(
+        self, client: AsyncClient, admin_token: str, student_token: str, approved_degree: dict
+    ):
+        r = await client.get(
+            "/api/v1/degrees/export",
+            params={"prn_prefix": "AU2024"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert r.status_code == 200, r.text
+        assert r.headers["content-type"] == "application/zip"
+        assert "content-encoding" not in r.headers
+
+        archive = zipfile.ZipFile(io.BytesIO(r.content))
+        assert archive.testzip() is None
+        rows = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode())))
+        row = next(row for row in rows if row["credential_id"] == approved_degree["id"])
+        assert row["result"] == "ok"
+
+        stamped = await client.get(
+            f"/api/v1/degrees/{approved_degree['id']}/document",
+            headers={"Authorization": f"Bearer {student_token}"},
+        )
+        assert archive.read(row["file"]) == stamped.content
+
+    async def test_export_with_no_matches_is_404(
+        self, client: AsyncClient, admin_token: str, approved_degree: dict
+    ):
+        r = await client.get(
+            "/api/v1/degrees/export",
+            params={"prn_prefix": "NOPE"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert r.status_code == 404
+
+    async def test_admin_cannot_export_another_college(
+        self, client: AsyncClient, admin_token: str, approved_degree: dict
+    ):
+        r = await client.get(
+            "/api/v1/degrees/export",
+            params={"college_name": "Some Other University"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert r.status_code == 403
+
+    async def test_students_cannot_export(self, client: AsyncClient, student_token: str):
+        r = await client.get(
+            "/api/v1/degrees/export",
+            headers={"Authorization": f"Bearer {student_token}"},
+        )
+        assert r.status_code == 403
+
+
+class TestDocumentStore:
+    async def test_identical_uploads_are_stored_once_and_released(
+        self, client: AsyncClient, student_token: str
+    ):
+        auth = {"Authorization": f"Bearer {student_token}"}
+        pdf = _sample_pdf(pages=4)
+        ids = []
+        for title in ("Minor in Music", "Minor in Film"):
+            created = await client.post("/api/v1/degrees/", json={"title": title}, headers=auth)
+            ids.append(created.json()["id"])
+            upload = await client.post(
+                f"/api/v1/degrees/{ids[-1]}/document",
+                files={"file": ("degree.pdf", pdf, "application/pdf")},
+                headers=auth,
+            )
+            assert upload.status_code == 200
+            assert upload.json()["document_sha256"]
+            assert upload.json()["document_keccak256"].startswith("0x")
+
+        first, second = [await Credential.get(UUID(i)) for i in ids]
+        assert first.document_path == second.document_path
+        shared = first.document_path
+
+        # Still referenced by the second credential: replacing the first keeps it.
+        await client.post(
+            f"/api/v1/degrees/{ids[0]}/document",
+            files={"file": ("degree.pdf", _sample_pdf(pages=5), "application/pdf")},
+            headers=auth,
+        )
+        assert os.path.isfile(shared)
+
+        # Last reference gone: the blob is deleted.
+        await client.post(
+            f"/api/v1/degrees/{ids[1]}/document",
+            files={"file": ("degree.pdf", _sample_pdf(pages=6), "application/pdf")},
+            headers=auth,
+        )
+        assert not os.path.exists(shared)
@@ -0,0 +1,121 @@
+"""
+Tests for the declared indexes: boot-time reconciliation of clashing ones
+(app/main.py), and that every CRUD query - plus the hot queries made outside
+the CRUD layer - is answered from an index rather than a collection scan.
+The explain() checks need a real MongoDB server and are skipped without one.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from beanie.odm.queries.find import FindMany, FindOne
+from bson import Binary
+from pymongo import ASCENDING, IndexModel
+
+from app.crud.crud import CredentialCRUD, UserCRUD
+from app.main import _reconcile_indexes
+from app.models.models import Credential, CredentialStatus, User, UserRole
+
+
+class _Probe:
+    class Settings:
+        name = "index_probe"
+        indexes = [
+            IndexModel([("a", ASCENDING)]),
+            IndexModel([("b", ASCENDING)], name="b_unique", unique=True),
+            IndexModel([("c", ASCENDING)]),
+        ]
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """(model, filter, sort) of every query Beanie executes meanwhile."""
+    queries = []
+
+    def patch(cls, name):
+        original = getattr(cls, name)
+
+        async def wrapper(self, *args, **kwargs):
+            queries.append((self.document_model, self.get_filter_query(), getattr(self, "sort_expressions", None)))
+            return await original(self, *args, **kwargs)
+
+        monkeypatch.setattr(cls, name, wrapper)
+
+    patch(FindMany, "to_list")
+    patch(FindMany, "count")
+    patch(FindOne, "_find_one")
+    return queries
+
+
+async def _winning_stages(model, filter, sort=None) -> set:
+    cursor = model.get_motor_collection().find(filter, sort=sort or None)
+    if not hasattr(cursor, "explain"):
+        pytest.skip("explain() needs a real MongoDB server")
+    plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+
+    stages, pending = set(), [plan]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            stages.add(node.get("stage"))
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return stages
+
+
+class TestIndexReconciliation:
+    async def test_drops_only_clashing_indexes(self, initialized_db):
+        collection = initialized_db["altrium_test"]["index_probe"]
+        await collection.drop()
+        await collection.create_index([("a", ASCENDING)], unique=True)  # became non-unique
+        await collection.create_index([("z", ASCENDING)], name="b_unique")  # name reused
+        await collection.create_index([("c", ASCENDING)])  # already as declared
+        await collection.create_index([("d", ASCENDING)])  # not ours to touch
+
+        await _reconcile_indexes(initialized_db["altrium_test"], [_Probe])
+        assert set(await collection.index_information()) == {"_id_", "c_1", "d_1"}
+        await collection.drop()
+
+
+class TestQueriesUseIndexes:
+    async def test_crud_queries(self, initialized_db, recorded):
+        some_id = uuid4()
+        since = datetime.utcnow() - timedelta(days=1)
+        await UserCRUD.get_by_email("nobody@altrium.test")
+        await UserCRUD.get_by_id(some_id)
+        await UserCRUD.get_all()
+        await UserCRUD.get_many_by_email(["a@altrium.test", "b@altrium.test"])
+        await CredentialCRUD.get_by_id(some_id)
+        await CredentialCRUD.get_many([some_id, uuid4()])
+        await CredentialCRUD.get_all()
+        await CredentialCRUD.get_by_user(some_id)
+        await CredentialCRUD.get_by_college("Altrium University")
+        await CredentialCRUD.get_approved_by_college_id_hash("0x" + "ab" * 32)
+        await CredentialCRUD.get_approved_by_document_uid("DOC-0123456789AB")
+        await CredentialCRUD.query_approved().to_list()
+        await CredentialCRUD.query_approved(prn_number="AU1", after=(since, some_id)).to_list()
+        await CredentialCRUD.query_approved(issued_to_id=some_id).to_list()
+        await CredentialCRUD.get_approved_in(prn_numbers=["AU1", "AU2"])
+        await CredentialCRUD.get_approved_in(issued_to_ids=[some_id, uuid4()])
+        await CredentialCRUD.query_for_export(
+            "Altrium University", CredentialStatus.APPROVED, prn_prefix="AU", created_from=since
+        ).to_list()
+        assert len(recorded) >= 17
+
+        for model, filter, sort in recorded:
+            stages = await _winning_stages(model, filter, sort)
+            assert "COLLSCAN" not in stages, (model.__name__, filter, sort)
+
+    @pytest.mark.parametrize("model, filter", [
+        # Telegram bot: sender lookup and a student's degrees by status
+        (User, {"telegram_id": "12345"}),
+        (Credential, {"issued_to_id": Binary.from_uuid(uuid4()), "status": CredentialStatus.APPROVED.value}),
+        # /users/my-students, /users/universities, pending-degree reminder
+        (User, {"role": UserRole.STUDENT.value, "college_name": "Altrium University"}),
+        (User, {"role": UserRole.ADMIN.value, "college_name": {"$ne": None}}),
+        (User, {"role": UserRole.ADMIN.value, "is_legal_admin_verified": True}),
+        (Credential, {"college_name": "Altrium University", "status": CredentialStatus.PENDING.value}),
+    ])
+    async def test_hot_queries_outside_crud(self, initialized_db, model, filter):
+        assert "COLLSCAN" not in await _winning_stages(model, filter)
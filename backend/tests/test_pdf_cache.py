@@ -0,0 +1,59 @@
+"""
+Unit tests for the disk-backed stamped-PDF cache (app/services/pdf_cache.py).
+These don't touch Mongo or the HTTP app.
+"""
+import os
+from uuid import uuid4
+
+from app.services.pdf_cache import StampedPdfCache, source_digest
+
+
+class TestStampedPdfCache:
+    def test_key_changes_with_credential_state(self):
+        cid = uuid4()
+        base = StampedPdfCache.key(cid, "0xabc", "DOC-1", "h1")
+        assert base == StampedPdfCache.key(cid, "0xabc", "DOC-1", "h1")
+        assert base != StampedPdfCache.key(cid, "0xdef", "DOC-1", "h1")
+        assert base != StampedPdfCache.key(cid, "0xabc", "DOC-2", "h1")
+        assert base != StampedPdfCache.key(cid, "0xabc", "DOC-1", "h2")
+        assert base != StampedPdfCache.key(uuid4(), "0xabc", "DOC-1", "h1")
+        assert base != StampedPdfCache.key(cid, "0xabc", "DOC-1", "h1", revoked=True)
+
+    def test_put_then_get_round_trips(self, tmp_path):
+        cache = StampedPdfCache(tmp_path, max_bytes=1024)
+        cid = uuid4()
+        path = cache.put(cid, "k1", b"%PDF-stamped")
+        assert cache.get(cid, "k1") == path
+        assert path.read_bytes() == b"%PDF-stamped"
+        assert cache.get(cid, "missing") is None
+
+    def test_invalidate_drops_every_rendition(self, tmp_path):
+        cache = StampedPdfCache(tmp_path, max_bytes=1024)
+        cid, other = uuid4(), uuid4()
+        cache.put(cid, "k1", b"a")
+        cache.put(cid, "k2", b"b")
+        cache.put(other, "k1", b"c")
+        assert cache.invalidate(cid) == 2
+        assert cache.get(cid, "k1") is None
+        assert cache.get(other, "k1") is not None
+
+    def test_evicts_least_recently_used_over_budget(self, tmp_path):
+        cache = StampedPdfCache(tmp_path, max_bytes=20)
+        a, b, c = uuid4(), uuid4(), uuid4()
+        path_a = cache.put(a, "k", b"x" * 8)
+        path_b = cache.put(b, "k", b"x" * 8)
+        # Make `a` older than `b`, then touch it through a hit so `b` is LRU.
+        os.utime(path_a, ns=(1, 1))
+        os.utime(path_b, ns=(2, 2))
+        assert cache.get(a, "k") is not None
+        cache.put(c, "k", b"x" * 8)
+        assert cache.get(b, "k") is None
+        assert cache.get(a, "k") is not None
+        assert cache.get(c, "k") is not None
+
+    def test_source_digest_tracks_file_contents(self, tmp_path):
+        src = tmp_path / "doc.pdf"
+        src.write_bytes(b"first")
+        first = source_digest(str(src))
+        src.write_bytes(b"second version")
+        assert source_digest(str(src)) != first
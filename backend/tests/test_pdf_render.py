@@ -0,0 +1,57 @@
+"""
+Unit tests for the footer renderer (app/services/pdf_render.py).
+"""
+import qrcode
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+from app.services import pdf_render
+
+TX_HASH = "0x" + "ab" * 32
+
+
+def _make_pdf(path, sizes):
+    c = canvas.Canvas(str(path))
+    for width, height in sizes:
+        c.setPageSize((width, height))
+        c.drawString(72, 72, "degree")
+        c.showPage()
+    c.save()
+
+
+class TestFooterRenderer:
+    def test_qr_runs_reproduce_the_qr_matrix(self):
+        url = f"https://sepolia.etherscan.io/tx/{TX_HASH}"
+        qr = qrcode.QRCode(version=1, box_size=2, border=0)
+        qr.add_data(url)
+        qr.make(fit=True)
+        expected = qr.get_matrix()
+
+        size, runs = pdf_render._qr_runs(url)
+        rebuilt = [[False] * size for _ in range(size)]
+        for row, first_col, length in runs:
+            for col in range(first_col, first_col + length):
+                rebuilt[row][col] = True
+        assert rebuilt == expected
+
+    def test_overlay_built_once_per_page_size(self, tmp_path):
+        source, dest = tmp_path / "src.pdf", tmp_path / "out.pdf"
+        _make_pdf(source, [(595, 842)] * 5 + [(842, 595)] * 2)
+
+        pdf_render._footer_overlay_pdf.cache_clear()
+        pdf_render.render_footer_pdf(str(source), str(dest), TX_HASH, "DOC-1")
+
+        info = pdf_render._footer_overlay_pdf.cache_info()
+        assert info.misses == 2
+        pages = PdfReader(str(dest)).pages
+        assert len(pages) == 7
+        # Every stamped page carries the QR form XObject and both link annotations.
+        for page in pages:
+            assert "/FormXob.qr" in page["/Resources"]["/XObject"]
+            assert len(page["/Annots"]) == 2
+
+    def test_check_pdf_structure_reports_parse_errors(self, tmp_path):
+        source = tmp_path / "src.pdf"
+        _make_pdf(source, [(595, 842)])
+        assert pdf_render.check_pdf_structure(source.read_bytes()) is None
+        assert pdf_render.check_pdf_structure(b"%PDF-1.4 not really") is not None
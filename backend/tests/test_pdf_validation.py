@@ -0,0 +1,69 @@
+"""
+Unit tests for the spooled upload validator (app/services/pdf_validation.py).
+"""
+import hashlib
+import io
+
+import pytest
+from eth_hash.auto import keccak
+from fastapi import HTTPException, UploadFile
+from reportlab.pdfgen import canvas
+from starlette.datastructures import Headers
+
+from app.services import pdf_validation
+from app.services.pdf_cache import source_digest
+
+
+def _upload(data: bytes, content_type: str = "application/pdf") -> UploadFile:
+    return UploadFile(
+        io.BytesIO(data),
+        filename="doc.pdf",
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+def _pdf() -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    c.drawString(72, 720, "degree")
+    c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+class TestValidatePdfUpload:
+    async def test_spools_and_hashes_then_commits_by_rename(self, tmp_path):
+        data = _pdf()
+        upload = await pdf_validation.validate_pdf_upload(_upload(data), tmp_path)
+        assert upload.size == len(data)
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        assert upload.keccak256 == "0x" + keccak(data).hex()
+
+        dest = await upload.commit(tmp_path / "final.pdf")
+        assert dest.read_bytes() == data
+        assert source_digest(str(dest)) == upload.sha256
+        assert [p.name for p in tmp_path.iterdir()] == ["final.pdf"]
+
+    async def test_uncommitted_upload_is_discarded(self, tmp_path):
+        async with await pdf_validation.validate_pdf_upload(_upload(_pdf()), tmp_path):
+            pass
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_rejects_non_pdf_without_leaving_a_spool_file(self, tmp_path):
+        with pytest.raises(HTTPException) as exc:
+            await pdf_validation.validate_pdf_upload(_upload(b"GIF89a" + b"x" * 100), tmp_path)
+        assert exc.value.status_code == 400
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_rejects_oversized_upload(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pdf_validation, "MAX_PDF_UPLOAD_BYTES", 1024)
+        with pytest.raises(HTTPException) as exc:
+            await pdf_validation.validate_pdf_upload(_upload(b"%PDF-" + b"x" * 4096), tmp_path)
+        assert exc.value.status_code == 413
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_rejects_malformed_pdf(self, tmp_path):
+        with pytest.raises(HTTPException) as exc:
+            await pdf_validation.validate_pdf_upload(_upload(b"%PDF-1.4 not really"), tmp_path)
+        assert exc.value.status_code == 400
+        assert list(tmp_path.iterdir()) == []
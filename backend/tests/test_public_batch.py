@@ -0,0 +1,72 @@
+"""
+Tests for POST /degrees/public/batch: cohort verification grouped by
+identifier, resolved with one query per kind of identifier, and charged to
+the rate limit by batch size rather than per candidate.
+"""
+from uuid import UUID, uuid4
+
+import pytest_asyncio
+from beanie.odm.queries.find import FindMany
+from httpx import AsyncClient
+from starlette.requests import Request
+
+from app.api.routes.degrees import _public_batch, _public_batch_cost
+from app.schemas.schemas import CredentialStatus, PublicBatchRequest
+
+URL = "/api/v1/degrees/public/batch"
+
+
+@pytest_asyncio.fixture
+async def cohort(make_credential, registered_student):
+    run = uuid4().hex[:6].upper()
+    prns = [f"BATCH{run}{i}" for i in range(3)]
+    creds = [
+        await make_credential(
+            issued_to_id=UUID(registered_student["id"]) if i == 0 else uuid4(),
+            prn_number=prn,
+            status=CredentialStatus.PENDING if i == 2 else CredentialStatus.APPROVED,
+        )
+        for i, prn in enumerate(prns)
+    ]
+    return prns, creds
+
+
+class TestPublicBatch:
+    async def test_grouped_by_identifier(self, client: AsyncClient, cohort, monkeypatch):
+        prns, creds = cohort
+        queries = []
+        original = FindMany.to_list
+
+        async def counting(self, *args, **kwargs):
+            queries.append(self.document_model.__name__)
+            return await original(self, *args, **kwargs)
+
+        monkeypatch.setattr(FindMany, "to_list", counting)
+        r = await client.post(URL, json={
+            "prn_numbers": [prns[0], f" {prns[1]} ", prns[2], "NOSUCHPRN"],
+            "emails": ["Student@Altrium.test", "nobody@altrium.test"],
+        })
+        assert r.status_code == 200
+        body = r.json()
+        assert [row["id"] for row in body["by_prn"][prns[0]]] == [str(creds[0].id)]
+        assert [row["id"] for row in body["by_prn"][prns[1]]] == [str(creds[1].id)]
+        assert body["by_prn"][prns[2]] == [] and body["by_prn"]["NOSUCHPRN"] == []
+        assert str(creds[0].id) in [row["id"] for row in body["by_email"]["student@altrium.test"]]
+        assert body["by_email"]["nobody@altrium.test"] == []
+        # PRNs, the emails' users, their credentials (+ on-chain states).
+        assert queries.count("Credential") == 2 and queries.count("User") == 1
+
+    async def test_rejects_empty_and_oversized_batches(self, client: AsyncClient):
+        assert (await client.post(URL, json={})).status_code == 422
+        r = await client.post(URL, json={"prn_numbers": ["P"] * 300, "emails": ["e@x.test"] * 201})
+        assert r.status_code == 422
+
+    async def test_cost_grows_per_block_of_identifiers(self):
+        async def cost(size: int) -> int:
+            request = Request({"type": "http", "headers": []})
+            await _public_batch(request, PublicBatchRequest(prn_numbers=["P"] * size))
+            return _public_batch_cost(request)
+
+        assert await cost(1) == 1
+        assert await cost(200) == 1
+        assert await cost(251) == 2
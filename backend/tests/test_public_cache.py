@@ -0,0 +1,84 @@
+"""
+Tests for the public lookup cache (app/services/public_cache.py): PRN and
+email checks are served from it, and credential changes invalidate them.
+"""
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.schemas.schemas import CredentialStatus, CredentialUpdate
+from app.services.degree_service import DegreeService
+from app.services.public_cache import LocalStore, PublicLookupCache, public_lookup_cache
+
+
+@pytest.fixture
+def prn():
+    return f"CACHE{uuid4().hex[:8]}"
+
+
+class TestPublicLookupCache:
+    async def test_prn_lookup_cached_until_credential_changes(self, client: AsyncClient, make_credential, prn):
+        first = await make_credential(prn_number=prn)
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}")
+        assert [row["id"] for row in r.json()] == [str(first.id)]
+
+        # Written behind the service's back: the cached answer stands.
+        hits = public_lookup_cache.hits
+        second = await make_credential(prn_number=prn)
+        r = await client.get(f"/api/v1/degrees/public?prn_number=%20{prn}%20")
+        assert len(r.json()) == 1
+        assert public_lookup_cache.hits == hits + 1
+
+        await DegreeService.update(first.id, CredentialUpdate(revoked=True))
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}")
+        rows = {row["id"]: row for row in r.json()}
+        assert rows.keys() == {str(first.id), str(second.id)}
+        assert rows[str(first.id)]["revoked"] is True
+
+        await DegreeService.delete(second.id)
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}")
+        assert [row["id"] for row in r.json()] == [str(first.id)]
+
+    async def test_email_lookup_invalidated_by_status_change(
+        self, client: AsyncClient, registered_student, make_credential, prn
+    ):
+        student_id = UUID(registered_student["id"])
+        credential = await make_credential(prn_number=prn, issued_to_id=student_id)
+        r = await client.get("/api/v1/degrees/public?email=Student@Altrium.test")
+        assert str(credential.id) in [row["id"] for row in r.json()]
+
+        await DegreeService.update_status(credential.id, CredentialStatus.REJECTED)
+        r = await client.get("/api/v1/degrees/public?email=student@altrium.test")
+        assert str(credential.id) not in [row["id"] for row in r.json()]
+
+    async def test_load_racing_an_invalidation_is_not_cached(self):
+        cache = PublicLookupCache(LocalStore(max_entries=10), max_entries=10, local_ttl=10, ttl=60)
+        answers = iter([["stale"], ["fresh"]])
+
+        async def load():
+            answer = next(answers)
+            await cache.invalidate(prns=["P1"])
+            return answer
+
+        assert await cache.fetch("prn", "P1", load) == ["stale"]
+        assert await cache.fetch("prn", "P1", load) == ["fresh"]
+        assert cache.misses == 2
+
+    async def test_load_racing_another_workers_invalidation_is_not_shared(self):
+        store = LocalStore(max_entries=10)
+        worker_a = PublicLookupCache(store, max_entries=10, local_ttl=10, ttl=60)
+        worker_b = PublicLookupCache(store, max_entries=10, local_ttl=10, ttl=60)
+
+        async def stale():
+            # Worker A has read Mongo; worker B invalidates before A stores.
+            await worker_b.invalidate(prns=["P1"])
+            return ["stale"]
+
+        async def fresh():
+            return ["fresh"]
+
+        assert await worker_a.fetch("prn", "P1", stale) == ["stale"]
+        assert await store.get(worker_a.key("prn", "P1")) is None
+        assert await worker_b.fetch("prn", "P1", fresh) == ["fresh"]
+        assert await worker_a.fetch("prn", "P1", stale) == ["fresh"]
@@ -0,0 +1,75 @@
+"""
+Tests for keyset pagination and NDJSON streaming of the public listings
+(/degrees/public and /credentials/public).
+"""
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest_asyncio
+from httpx import AsyncClient
+
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+@pytest_asyncio.fixture
+async def approved(make_credential):
+    """Five approved credentials under one PRN; two share a created_at so the
+    id breaks the tie. Returned in listing order (newest first)."""
+    prn = f"PAGE{uuid4().hex[:8]}"
+    base = datetime(2030, 1, 1)
+    offsets = [0, 1, 2, 2, 3]
+    creds = [
+        await make_credential(prn_number=prn, created_at=base + timedelta(minutes=minutes))
+        for minutes in offsets
+    ]
+    return prn, [str(c.id) for c in sorted(creds, key=lambda c: (c.created_at, c.id), reverse=True)]
+
+
+async def _walk(client: AsyncClient, url: str):
+    pages = []
+    while url:
+        r = await client.get(url)
+        assert r.status_code == 200
+        pages.append([row["id"] for row in r.json()])
+        url = r.headers.get("X-Next-Cursor") and r.headers["Link"].split(">")[0].lstrip("<")
+    return pages
+
+
+class TestPublicListing:
+    async def test_pages_follow_keyset_order(self, client: AsyncClient, approved):
+        prn, expected = approved
+        pages = await _walk(client, f"/api/v1/degrees/public?prn_number={prn}&limit=2")
+        assert pages == [expected[0:2], expected[2:4], expected[4:5]]
+
+        pages = await _walk(client, f"/api/v1/credentials/public?prn_number={prn}&limit=3")
+        assert pages == [expected[0:3], expected[3:5]]
+
+    async def test_unfiltered_listing_is_paged(self, client: AsyncClient, approved):
+        _, expected = approved
+        r = await client.get("/api/v1/degrees/public?limit=2")
+        assert [row["id"] for row in r.json()] == expected[:2]
+        assert "cursor=" in r.headers["Link"]
+
+    async def test_ndjson_stream(self, client: AsyncClient, approved):
+        prn, expected = approved
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}", headers=NDJSON)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in r.text.splitlines()]
+        assert [row["id"] for row in rows] == expected
+
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}&limit=2")
+        r = await client.get(
+            f"/api/v1/credentials/public?prn_number={prn}&cursor={r.headers['X-Next-Cursor']}",
+            headers=NDJSON,
+        )
+        assert [json.loads(line)["id"] for line in r.text.splitlines()] == expected[2:]
+
+    async def test_bad_cursor_and_page_size(self, client: AsyncClient, approved):
+        prn, _ = approved
+        r = await client.get(f"/api/v1/degrees/public?prn_number={prn}&cursor=not-a-cursor")
+        assert r.status_code == 400
+        r = await client.get("/api/v1/degrees/public?limit=100000")
+        assert r.status_code == 422
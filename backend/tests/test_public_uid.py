@@ -0,0 +1,69 @@
+"""
+Tests for GET /degrees/public/uid/{document_uid}: the signed verification
+payload, its HTTP caching, and the uniqueness of document_uid.
+"""
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from pymongo.errors import DuplicateKeyError
+
+from app.core.security import verify_receipt
+from app.schemas.schemas import CredentialStatus, CredentialUpdate
+from app.services.degree_service import DegreeService
+
+URL = "/api/v1/degrees/public/uid/"
+
+
+def _document_uid() -> str:
+    return f"DOC-{uuid4().hex[:12].upper()}"
+
+
+@pytest_asyncio.fixture
+async def approved(make_credential):
+    return await make_credential(
+        description="Computer Engineering",
+        prn_number=f"UID{uuid4().hex[:8]}",
+        college_name="Altrium University",
+        document_uid=_document_uid(),
+        document_sha256="ab" * 32,
+    )
+
+
+class TestPublicUidLookup:
+    async def test_signed_compact_payload(self, client: AsyncClient, approved):
+        r = await client.get(URL + approved.document_uid)
+        assert r.status_code == 200
+        body = r.json()
+        assert body["credential_id"] == str(approved.id)
+        assert body["document_sha256"] == approved.document_sha256
+        assert "description" not in body and "issued_to_id" not in body
+
+        receipt = body.pop("receipt")
+        assert verify_receipt(body, receipt["signature"])
+        assert not verify_receipt({**body, "revoked": True}, receipt["signature"])
+        assert r.headers["etag"] == f'"{receipt["signature"][:32]}"'
+        assert r.headers["cache-control"].startswith("public, max-age=")
+
+    async def test_revalidation_and_revocation(self, client: AsyncClient, approved):
+        etag = (await client.get(URL + approved.document_uid)).headers["etag"]
+        r = await client.get(URL + approved.document_uid, headers={"If-None-Match": etag})
+        assert r.status_code == 304 and r.headers["etag"] == etag
+
+        await DegreeService.update(approved.id, CredentialUpdate(revoked=True))
+        r = await client.get(URL + approved.document_uid, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.json()["revoked"] is True and r.headers["etag"] != etag
+
+    async def test_only_approved_degrees(self, client: AsyncClient, make_credential):
+        pending = await make_credential(document_uid=_document_uid(), status=CredentialStatus.PENDING)
+        assert (await client.get(URL + pending.document_uid)).status_code == 404
+        assert (await client.get(URL + "not-a-uid")).status_code == 422
+
+    async def test_document_uid_is_unique(self, approved, make_credential):
+        with pytest.raises(DuplicateKeyError):
+            await make_credential(document_uid=approved.document_uid)
+        # Credentials without a document yet are unaffected.
+        await make_credential(document_uid=None)
+        await make_credential(document_uid=None)
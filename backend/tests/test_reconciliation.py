@@ -0,0 +1,103 @@
+"""
+Tests for the chain-vs-database reconciliation (app/services/reconciliation.py)
+against the local JSON-RPC stand-in.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.models.models import Credential, IndexerCheckpoint
+from app.services.chain import ChainClient, HttpBackend
+from app.services.reconciliation import ChainReconciler
+from tests.rpc_stub import RpcStub, college_id_hash
+
+REGISTRY = "0x" + "5e" * 20
+TX_HASH = "0x" + "ab" * 32
+
+
+@pytest_asyncio.fixture
+async def reconcile(monkeypatch, initialized_db):
+    await IndexerCheckpoint.delete_all()
+    stub = RpcStub()
+    url = await stub.start()
+    client = ChainClient(HttpBackend(url, pool_size=4), call_timeout=2.0, max_batch_size=50)
+    monkeypatch.setattr(settings, "CONTRACT_REGISTRY_ADDRESS", REGISTRY)
+    # A college of its own, so credentials from other test modules stay out.
+    college = f"Reconcile University {uuid4().hex[:6]}"
+    yield stub, ChainReconciler(client, batch_size=20), college
+    await client.close()
+    await stub.stop()
+    await IndexerCheckpoint.delete_all()
+
+
+class TestChainReconciler:
+    async def test_reports_each_kind_of_drift(self, reconcile, make_credential):
+        stub, reconciler, college = reconcile
+        clean = await make_credential(prn_number="P1", college_name=college, tx_hash=TX_HASH, token_id=1)
+        stub.set_degree(college_id_hash("P1", college), 1)
+        missing = await make_credential(prn_number="P2", college_name=college, tx_hash=TX_HASH)
+        unrecorded = await make_credential(prn_number="P3", college_name=college)
+        stub.set_degree(college_id_hash("P3", college), 3)
+        wrong_token = await make_credential(prn_number="P4", college_name=college, tx_hash=TX_HASH, token_id=40)
+        stub.set_degree(college_id_hash("P4", college), 4)
+        chain_revoked = await make_credential(prn_number="P5", college_name=college, tx_hash=TX_HASH)
+        stub.set_degree(college_id_hash("P5", college), 5, revoked=True, revoked_at=1_700_000_000)
+        db_revoked = await make_credential(prn_number="P6", college_name=college, tx_hash=TX_HASH, revoked=True)
+        stub.set_degree(college_id_hash("P6", college), 6)
+
+        drifts = []
+        summary = await reconciler.run(on_drift=drifts.append, college_name=college)
+        assert summary.checked == 6
+        assert {(d.credential_id, d.kind) for d in drifts} == {
+            (missing.id, "missing_on_chain"),
+            (unrecorded.id, "not_recorded"),
+            (wrong_token.id, "token_id_mismatch"),
+            (chain_revoked.id, "revoked_on_chain_only"),
+            (db_revoked.id, "revoked_in_db_only"),
+        }
+        assert clean.id not in {d.credential_id for d in drifts}
+        assert not any(d.fixed for d in drifts)
+        assert (await Credential.get(chain_revoked.id)).revoked is False
+        # Six getDegree calls fit in one batch request.
+        assert stub.http_requests == 1
+
+    async def test_fix_copies_onchain_revocation(self, reconcile, make_credential):
+        stub, reconciler, college = reconcile
+        credential = await make_credential(prn_number="P1", college_name=college, tx_hash=TX_HASH)
+        stub.set_degree(college_id_hash("P1", college), 1, revoked=True, revoked_at=1_700_000_000)
+        db_only = await make_credential(prn_number="P2", college_name=college, tx_hash=TX_HASH, revoked=True)
+        stub.set_degree(college_id_hash("P2", college), 2)
+
+        summary = await reconciler.run(fix=True, college_name=college)
+        assert summary.fixed == 1
+        fixed = await Credential.get(credential.id)
+        assert fixed.revoked is True
+        assert fixed.revoked_at == datetime.utcfromtimestamp(1_700_000_000)
+        # Database-only revocations are reported, never undone.
+        assert (await Credential.get(db_only.id)).revoked is True
+
+    async def test_resumes_after_an_interrupted_run(self, reconcile, make_credential):
+        stub, reconciler, college = reconcile
+        credentials = [await make_credential(prn_number=f"P{i:02d}", college_name=college, tx_hash=TX_HASH) for i in range(45)]
+        seen = []
+
+        def crash_in_third_batch(drift):
+            seen.append(drift.credential_id)
+            if len(seen) == 41:
+                raise RuntimeError("worker killed")
+
+        with pytest.raises(RuntimeError):
+            await reconciler.run(on_drift=crash_in_third_batch, college_name=college)
+        checkpoint = await IndexerCheckpoint.find_one(IndexerCheckpoint.name == "reconciliation")
+        assert checkpoint.processed == 40
+
+        resumed = []
+        summary = await reconciler.run(resume=True, on_drift=resumed.append, college_name=college)
+        assert summary.checked == 5
+        assert seen[:40] + [d.credential_id for d in resumed] == sorted(
+            (c.id for c in credentials), key=lambda u: u.bytes
+        )
+        assert await IndexerCheckpoint.find_one(IndexerCheckpoint.name == "reconciliation") is None
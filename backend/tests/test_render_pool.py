@@ -0,0 +1,38 @@
+"""
+Tests for the render pool (app/services/render_pool.py): a job that times out
+keeps counting against the pool until it really finishes, and is cleaned up
+after then.
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.render_pool import RenderPool
+
+
+class TestRenderPoolTimeouts:
+    async def test_timed_out_job_counts_until_it_ends(self):
+        pool = RenderPool(max_workers=0, max_pending=1, job_timeout=0.05)
+        release = threading.Event()
+        cleaned = []
+
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(release.wait, 5, on_abandoned=lambda: cleaned.append(True))
+        assert exc.value.status_code == 504
+
+        # The thread is still busy: it holds the only slot.
+        assert pool.stats()["in_flight"] == 1 and cleaned == []
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(release.wait, 5)
+        assert exc.value.status_code == 503
+
+        release.set()
+        for _ in range(100):
+            if cleaned:
+                break
+            await asyncio.sleep(0.01)
+        assert cleaned == [True]
+        assert pool.stats()["in_flight"] == 0
+        assert await pool.run(sum, [1, 2]) == 3
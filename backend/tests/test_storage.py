@@ -0,0 +1,53 @@
+"""
+Unit tests for the async upload storage layer (app/services/storage.py).
+"""
+import hashlib
+
+import pytest
+
+from app.services.storage import AsyncStorage, FsyncPolicy
+
+
+class TestAsyncStorage:
+    @pytest.mark.parametrize("policy", list(FsyncPolicy))
+    async def test_temp_file_commits_atomically(self, tmp_path, policy):
+        storage = AsyncStorage(io_threads=2, policy=policy)
+        digest = hashlib.sha256()
+        tmp = await storage.create_temp(tmp_path, digests=(digest,))
+        await tmp.write(b"hello ")
+        await tmp.write(b"world")
+        dest = tmp_path / "final.bin"
+        assert not dest.exists()
+
+        await tmp.commit(dest)
+        assert dest.read_bytes() == b"hello world"
+        assert tmp.size == 11
+        assert digest.hexdigest() == hashlib.sha256(b"hello world").hexdigest()
+        assert [p.name for p in tmp_path.iterdir()] == ["final.bin"]
+        storage.shutdown()
+
+    async def test_discard_removes_temp_file(self, tmp_path):
+        storage = AsyncStorage(io_threads=1, policy="file")
+        tmp = await storage.create_temp(tmp_path)
+        await tmp.write(b"partial")
+        await tmp.discard()
+        assert list(tmp_path.iterdir()) == []
+        storage.shutdown()
+
+    async def test_latency_is_recorded_per_operation(self, tmp_path):
+        storage = AsyncStorage(io_threads=1, policy="file")
+        tmp = await storage.create_temp(tmp_path)
+        for _ in range(3):
+            await tmp.write(b"x" * 1024)
+        await tmp.commit(tmp_path / "out.bin")
+
+        latency = storage.stats()["latency"]
+        assert latency["write"]["count"] == 3
+        assert latency["fsync"]["count"] == 1
+        assert latency["commit"]["count"] == 1
+        assert latency["write"]["max_ms"] >= latency["write"]["p50_ms"] >= 0
+        storage.shutdown()
+
+    def test_rejects_unknown_policy(self):
+        with pytest.raises(ValueError):
+            AsyncStorage(io_threads=1, policy="sometimes")
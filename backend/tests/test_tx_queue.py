@@ -0,0 +1,150 @@
+"""
+Tests for the Registry transaction queue (app/services/tx_queue.py) against
+the local JSON-RPC stand-in.
+"""
+import asyncio
+
+import pytest_asyncio
+from eth_account import Account
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.models.models import ChainTxJob, ChainTxStatus
+from app.services.chain import UNIVERSITY_ROLE, ChainClient, HttpBackend
+from app.services.tx_queue import TxQueue
+from tests.rpc_stub import RpcStub
+
+REGISTRY = "0x" + "5e" * 20
+ROLE = "0x" + UNIVERSITY_ROLE.hex().removeprefix("0x")
+
+
+def _wallet(i: int) -> str:
+    return "0x" + f"{i:040x}"
+
+
+@pytest_asyncio.fixture
+async def queue(monkeypatch, initialized_db):
+    await ChainTxJob.delete_all()
+    stub = RpcStub()
+    url = await stub.start()
+    client = ChainClient(HttpBackend(url, pool_size=4), call_timeout=2.0)
+    monkeypatch.setattr(settings, "CONTRACT_REGISTRY_ADDRESS", REGISTRY)
+    monkeypatch.setattr(settings, "PRIVATE_KEY", Account.create().key.hex())
+    yield stub, TxQueue(client, gas_limit=200000, fee_ttl=60, poll_seconds=0.01, confirm_timeout=600)
+    await client.close()
+    await stub.stop()
+    await ChainTxJob.delete_all()
+
+
+class TestTxQueue:
+    async def test_pipelines_jobs_with_local_nonces(self, queue):
+        stub, tx_queue = queue
+        stub.nonce = 7
+        stub.auto_mine = False
+        jobs = await asyncio.gather(*(tx_queue.enqueue("grantRole", _wallet(i)) for i in range(1, 6)))
+
+        assert await tx_queue.submit_pending() == 5
+        assert [tx["nonce"] for tx in stub.sent] == [7, 8, 9, 10, 11]
+        assert all(tx["type"] == 2 and tx["maxFeePerGas"] == 2 * 10**9 + 10**8 for tx in stub.sent)
+        # Nonce, base fee and tip are read once; each job only costs its
+        # hasRole check and the send.
+        assert stub.methods.count("eth_getTransactionCount") == 1
+        assert stub.methods.count("eth_getBlockByNumber") == 1
+        assert stub.methods.count("eth_maxPriorityFeePerGas") == 1
+        assert stub.methods.count("eth_call") == 5
+        assert stub.methods.count("eth_sendRawTransaction") == 5
+
+        # Nothing mined yet: the jobs stay submitted.
+        requests = stub.http_requests
+        assert await tx_queue.track_submitted() == 0
+        for tx in stub.sent:
+            stub.mine(tx["hash"])
+        assert await tx_queue.track_submitted() == 5
+        # One batch request per tracking pass.
+        assert stub.http_requests - requests == 2
+        for job in jobs:
+            done = await ChainTxJob.get(job.id)
+            assert done.status == ChainTxStatus.CONFIRMED
+            assert done.block_number == stub.block_number
+
+    async def test_skips_wallets_that_already_hold_the_role(self, queue):
+        stub, tx_queue = queue
+        stub.roles.add((ROLE, _wallet(1)))
+        job = await tx_queue.enqueue("addUniversity", _wallet(1))
+        assert await tx_queue.submit_pending() == 0
+        assert (await ChainTxJob.get(job.id)).status == ChainTxStatus.SKIPPED
+        assert stub.sent == []
+
+    async def test_send_error_resyncs_the_nonce_and_retries(self, queue):
+        stub, tx_queue = queue
+        stub.reject_sends = 1
+        job = await tx_queue.enqueue("grantRole", _wallet(1))
+
+        assert await tx_queue.submit_pending() == 0
+        failed_once = await ChainTxJob.get(job.id)
+        assert failed_once.status == ChainTxStatus.QUEUED
+        assert "nonce too low" in failed_once.error
+        assert tx_queue._nonce is None
+
+        assert await tx_queue.submit_pending() == 1
+        assert (await ChainTxJob.get(job.id)).status == ChainTxStatus.SUBMITTED
+
+    async def test_reverted_transaction_fails_the_job(self, queue):
+        stub, tx_queue = queue
+        stub.auto_mine = False
+        job = await tx_queue.enqueue("grantRole", _wallet(1))
+        await tx_queue.submit_pending()
+        stub.mine(stub.sent[0]["hash"], status=0)
+        await tx_queue.track_submitted()
+        failed = await ChainTxJob.get(job.id)
+        assert failed.status == ChainTxStatus.FAILED
+        assert failed.error == "Transaction reverted"
+
+
+    async def test_stalled_job_is_replaced_and_still_confirms(self, queue):
+        stub, tx_queue = queue
+        stub.auto_mine = False
+        tx_queue.confirm_timeout = 0
+        job = await tx_queue.enqueue("grantRole", _wallet(1))
+        await tx_queue.submit_pending()
+        first = stub.sent[0]
+
+        assert await tx_queue.track_submitted() == 0
+        stalled = await ChainTxJob.get(job.id)
+        assert stalled.status == ChainTxStatus.STALLED
+        assert stalled.replaced_tx_hashes == [first["hash"]]
+        second = stub.sent[1]
+        assert second["nonce"] == first["nonce"]
+        assert second["maxFeePerGas"] >= first["maxFeePerGas"] * 1.25
+        assert second["maxPriorityFeePerGas"] >= first["maxPriorityFeePerGas"] * 1.25
+
+        # The original send may still be the one that gets mined.
+        stub.mine(first["hash"])
+        assert await tx_queue.track_submitted() == 1
+        confirmed = await ChainTxJob.get(job.id)
+        assert confirmed.status == ChainTxStatus.CONFIRMED
+        assert confirmed.tx_hash == first["hash"]
+
+    async def test_nonce_taken_by_another_transaction_fails_the_job(self, queue):
+        stub, tx_queue = queue
+        stub.auto_mine = False
+        job = await tx_queue.enqueue("grantRole", _wallet(1))
+        await tx_queue.submit_pending()
+        stub.mined_nonce = stub.nonce  # mined, but not one of ours
+        assert await tx_queue.track_submitted() == 1
+        failed = await ChainTxJob.get(job.id)
+        assert failed.status == ChainTxStatus.FAILED
+        assert "used by another transaction" in failed.error
+
+
+class TestChainJobEndpoint:
+    async def test_job_is_pollable_by_superadmin(self, client: AsyncClient, superadmin_token: str, queue):
+        _, tx_queue = queue
+        job = await tx_queue.enqueue("grantRole", _wallet(1))
+        r = await client.get(
+            f"/api/v1/users/chain-jobs/{job.id}",
+            headers={"Authorization": f"Bearer {superadmin_token}"},
+        )
+        assert r.status_code == 200
+        assert r.json()["status"] == "QUEUED"
+        assert r.json()["action"] == "grantRole"